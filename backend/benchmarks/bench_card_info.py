@@ -0,0 +1,218 @@
+"""
+Micro-benchmark of the card-info extraction done by ``Payment.mark_as_success``.
+
+Compares ``contacts.card_info.extract`` with the if/elif extraction it
+replaced (kept below, logging included, as it ran in production) over a
+corpus of Lahza-shaped verification payloads, after checking that both give
+the same fields for every payload.
+
+Usage: python benchmarks/bench_card_info.py [--payloads 2000] [--repeat 5] [--log-level INFO]
+"""
+import argparse
+import logging
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from contacts.card_info import CARD_FIELDS, extract  # noqa: E402
+
+logger = logging.getLogger('bench_card_info')
+
+BRANDS = ['visa', 'mastercard', 'Visa', 'MASTERCARD', 'amex']
+
+
+def _transaction(rng, i):
+    return {
+        'id': 4000000 + i,
+        'status': 'success',
+        'reference': f'CK-{i:012X}',
+        'amount': rng.choice([5000, 9900, 19900, 49]),
+        'currency': rng.choice(['USD', 'ILS']),
+        'gateway_response': 'Approved',
+        'paid_at': '2024-11-29T10:15:00.000Z',
+        'channel': 'card',
+        'customer': {'id': i, 'email': f'user{i}@example.com', 'name': 'Test User', 'phone': '+970599000000'},
+        'metadata': {'offer_type': 'black_friday', 'first_name': 'Test', 'last_name': 'User'},
+        'log': {'time_spent': rng.randint(5, 90), 'attempts': 1, 'history': [{'type': 'action', 'message': 'Attempted to pay'}]},
+    }
+
+
+def _card(rng, keys):
+    brand, last4, month, year = keys
+    card = {
+        'bin': '424242',
+        'bank': 'Bank of Palestine',
+        'country_code': 'PS',
+        'reusable': True,
+        'signature': 'SIG_' + str(rng.randint(10 ** 8, 10 ** 9)),
+    }
+    card[brand] = rng.choice(BRANDS)
+    card[last4] = f'{rng.randint(0, 9999):04d}'
+    card[month] = str(rng.randint(1, 12))
+    card[year] = rng.choice(['27', '2028', '29'])
+    return card
+
+
+# Payload shapes, weighted roughly as seen from Lahza (current format first)
+SHAPES = [
+    (60, lambda rng, t: t.update(authorization=dict(_card(rng, ('brand', 'last4', 'exp_month', 'exp_year')), authorization_code='AUTH_x', card_type='visa '))),
+    (10, lambda rng, t: t.update(authorization={'authorization_code': 'AUTH_y', 'card': _card(rng, ('card_type', 'last_4', 'expiry_month', 'expiry_year'))})),
+    (8, lambda rng, t: t.update(card=_card(rng, ('type', 'last_four', 'expMonth', 'expYear')))),
+    (6, lambda rng, t: t.update(payment_method={'type': 'card', 'card': _card(rng, ('brand', 'last4', 'exp_month', 'exp_year'))})),
+    (4, lambda rng, t: t.update(paymentDetails={'card': dict(_card(rng, ('brand', 'x', 'exp_month', 'exp_year')), cardNumber='4242424242424242')})),
+    (6, lambda rng, t: t.update(cardBrand='visa', cardType='credit', cardNumber='5555555555554444')),
+    (6, lambda rng, t: None),  # e.g. bank transfer: no card at all
+]
+
+
+def corpus(size, seed=1):
+    rng = random.Random(seed)
+    weights = [weight for weight, _shape in SHAPES]
+    payloads = []
+    for i in range(size):
+        transaction = _transaction(rng, i)
+        rng.choices(SHAPES, weights)[0][1](rng, transaction)
+        payloads.append(transaction)
+    return payloads
+
+
+class _Fields:
+    """Stand-in for the Payment card fields the legacy code assigned."""
+
+    def __init__(self):
+        for field in CARD_FIELDS:
+            setattr(self, field, None)
+
+    def values(self):
+        return {field: getattr(self, field) for field in CARD_FIELDS if getattr(self, field) is not None}
+
+
+def legacy_extract(transaction_data):
+    """The card extraction of ``mark_as_success`` before the table-driven normalizer."""
+    self = _Fields()
+    logger.info(f"[Payment] Extracting card info from transaction_data. Keys: {list(transaction_data.keys()) if isinstance(transaction_data, dict) else 'Not a dict'}")
+    card_info = None
+    if 'authorization' in transaction_data:
+        auth = transaction_data.get('authorization', {})
+        if isinstance(auth, dict):
+            if 'last4' in auth or 'brand' in auth or 'card_type' in auth:
+                card_info = auth
+                logger.info(f"[Payment] Found card info directly in 'authorization': {card_info}")
+            elif 'card' in auth:
+                card_info = auth.get('card', {})
+                logger.info(f"[Payment] Found card info in 'authorization.card': {card_info}")
+    elif 'card' in transaction_data:
+        card_info = transaction_data.get('card', {})
+        logger.info(f"[Payment] Found card info in 'card' key: {card_info}")
+    elif 'payment_method' in transaction_data:
+        pm = transaction_data.get('payment_method', {})
+        if isinstance(pm, dict) and 'card' in pm:
+            card_info = pm.get('card', {})
+            logger.info(f"[Payment] Found card info in 'payment_method.card': {card_info}")
+    elif 'paymentDetails' in transaction_data:
+        pd = transaction_data.get('paymentDetails', {})
+        if isinstance(pd, dict) and 'card' in pd:
+            card_info = pd.get('card', {})
+            logger.info(f"[Payment] Found card info in 'paymentDetails.card': {card_info}")
+    if not card_info:
+        if any(key in transaction_data for key in ['cardType', 'cardBrand', 'cardNumber', 'last4', 'last_4', 'lastFour']):
+            card_info = {}
+            if 'cardType' in transaction_data:
+                card_info['type'] = transaction_data.get('cardType')
+            if 'cardBrand' in transaction_data:
+                card_info['brand'] = transaction_data.get('cardBrand')
+            if 'last4' in transaction_data:
+                card_info['last4'] = transaction_data.get('last4')
+            elif 'last_4' in transaction_data:
+                card_info['last4'] = transaction_data.get('last_4')
+            elif 'lastFour' in transaction_data:
+                card_info['last4'] = transaction_data.get('lastFour')
+            elif 'cardNumber' in transaction_data:
+                card_num = str(transaction_data.get('cardNumber', ''))
+                if len(card_num) >= 4:
+                    card_info['last4'] = card_num[-4:]
+            logger.info(f"[Payment] Constructed card info from direct fields: {card_info}")
+    if card_info and isinstance(card_info, dict):
+        logger.info(f"[Payment] Processing card_info: {card_info}")
+        if 'brand' in card_info and card_info.get('brand'):
+            self.card_brand = str(card_info.get('brand', ''))[:50]
+            self.card_type = self.card_brand
+            logger.info(f"[Payment] Set card_brand: {self.card_brand}")
+        elif 'card_type' in card_info and card_info.get('card_type'):
+            self.card_type = str(card_info.get('card_type', ''))[:50]
+            self.card_brand = self.card_type
+            logger.info(f"[Payment] Set card_type: {self.card_type}")
+        elif 'type' in card_info and card_info.get('type'):
+            self.card_type = str(card_info.get('type', ''))[:50]
+            self.card_brand = self.card_type
+            logger.info(f"[Payment] Set card_type from type: {self.card_type}")
+        if 'last4' in card_info and card_info.get('last4'):
+            self.last_four_digits = str(card_info.get('last4', ''))[:4]
+            logger.info(f"[Payment] Set last_four_digits: {self.last_four_digits}")
+        elif 'last_4' in card_info and card_info.get('last_4'):
+            self.last_four_digits = str(card_info.get('last_4', ''))[:4]
+            logger.info(f"[Payment] Set last_four_digits from last_4: {self.last_four_digits}")
+        elif 'last_four' in card_info and card_info.get('last_four'):
+            self.last_four_digits = str(card_info.get('last_four', ''))[:4]
+            logger.info(f"[Payment] Set last_four_digits from last_four: {self.last_four_digits}")
+        elif 'cardNumber' in card_info:
+            card_num = str(card_info.get('cardNumber', ''))
+            if len(card_num) >= 4:
+                self.last_four_digits = card_num[-4:]
+                logger.info(f"[Payment] Set last_four_digits from cardNumber: {self.last_four_digits}")
+        for keys, field, fix in (
+            (('exp_month', 'expiry_month', 'expMonth'), 'card_expiry_month', lambda v: ('0' + v if len(v) == 1 else v)[:2]),
+            (('exp_year', 'expiry_year', 'expYear'), 'card_expiry_year', lambda v: ('20' + v if len(v) == 2 else v)[:4]),
+        ):
+            for key in keys:
+                if key in card_info and card_info.get(key):
+                    setattr(self, field, fix(str(card_info.get(key, ''))))
+                    logger.info(f"[Payment] Set {field} from {key}: {getattr(self, field)}")
+                    break
+    else:
+        logger.warning(f"[Payment] No card info found in transaction_data. Available keys: {list(transaction_data.keys()) if isinstance(transaction_data, dict) else 'Not a dict'}")
+    return self.values()
+
+
+def table_driven(transaction_data):
+    """``extract`` plus the single summary log line ``mark_as_success`` now emits."""
+    card = extract(transaction_data)
+    if card:
+        logger.info("[Payment] Card info for %s: %s %s, exp %s/%s", transaction_data.get('reference'), *(card.get(field) for field in CARD_FIELDS[1:]))
+    else:
+        logger.warning("[Payment] No card info found in transaction_data. Available keys: %s", list(transaction_data.keys()))
+    return card
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--payloads', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--log-level', default='INFO', help='Level of the (discarded) log output; INFO is what production runs')
+    options = parser.parse_args()
+
+    handler = logging.StreamHandler(open(os.devnull, 'w'))
+    handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(name)s %(message)s'))
+    logger.addHandler(handler)
+    logger.setLevel(options.log_level)
+    logger.propagate = False
+
+    payloads = corpus(options.payloads)
+    mismatches = [p['reference'] for p in payloads if legacy_extract(p) != extract(p)]
+    if mismatches:
+        sys.exit(f'Extraction differs for {len(mismatches)} payload(s), e.g. {mismatches[:3]}')
+    print(f'{len(payloads)} payloads, same fields from both implementations')
+
+    results = {}
+    for name, func in (('legacy if/elif', legacy_extract), ('table-driven', table_driven), ('extract() only', extract)):
+        best = min(timeit.repeat(lambda: [func(p) for p in payloads], number=1, repeat=options.repeat))
+        results[name] = best
+        print(f'{name:>16}: {best / len(payloads) * 1e6:7.2f} µs/payload')
+    print(f"speed-up: {results['legacy if/elif'] / results['table-driven']:.1f}x (logging at {options.log_level})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+"""
+Benchmark of the ReportLab instructions PDF rendered per receipt.
+
+Compares laying out the whole document for each order, as
+``generate_instructions_pdf`` used to, with ``config.instructions_pdf.stamp``
+(body laid out once per template version, only the footer written per order).
+The disk cache of ``render`` is left out: it only adds a file read for
+references rendered before.
+
+Usage: python benchmarks/bench_instructions_pdf.py [--orders 200] [--repeat 3]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from config import instructions_pdf  # noqa: E402
+
+
+def _per_order(render, references, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for reference in references:
+            render(reference)
+        best = min(best, (time.perf_counter() - started) / len(references))
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--orders', type=int, default=200)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    references = [f'PAY-{i:010X}' for i in range(args.orders)]
+
+    started = time.perf_counter()
+    instructions_pdf.body()
+    print(f'body build (once per template version): {(time.perf_counter() - started) * 1000:8.2f} ms')
+
+    full = _per_order(instructions_pdf._build_full, references, args.repeat)
+    stamped = _per_order(instructions_pdf.stamp, references, args.repeat)
+    print(f'full layout per order:                  {full * 1000:8.2f} ms')
+    print(f'stamped footer per order:               {stamped * 1000:8.3f} ms  ({full / stamped:.0f}x faster)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+"""
+Benchmark of rendering one payment receipt email.
+
+Compares what ``send_payment_receipt_email`` did per receipt before
+``config.receipts`` (``render_to_string`` of the HTML template, then
+``strip_tags`` over the result for a text version) with ``receipts.render``
+(cached HTML template plus the text template derived from it once).
+
+Usage: python benchmarks/bench_receipts.py [--receipts 2000] [--repeat 5]
+"""
+import argparse
+import os
+import sys
+import timeit
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.template.loader import render_to_string  # noqa: E402
+from django.utils import timezone  # noqa: E402
+from django.utils.html import strip_tags  # noqa: E402
+
+from config import receipts  # noqa: E402
+from contacts.models import Payment  # noqa: E402
+
+
+def _legacy(payment):
+    html_message = render_to_string(receipts.TEMPLATE_NAME, {'payment': payment})
+    return strip_tags(html_message), html_message
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--receipts', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    payment = Payment(
+        reference='PAY-0123456789', transaction_id='4000123', customer_name='Test Customer',
+        customer_email='customer@example.com', amount=Decimal('300.00'), currency='ILS',
+        offer_name='Live Trading + VIP Signals Bundle', status='success', paid_at=timezone.now(),
+        card_brand='visa', last_four_digits='4242', card_expiry_month='12', card_expiry_year='2029',
+    )
+    receipts.warm()
+    _legacy(payment)
+
+    for name, render in (('render_to_string + strip_tags', _legacy), ('receipts.render', receipts.render)):
+        best = min(timeit.repeat(lambda: render(payment), number=args.receipts, repeat=args.repeat))
+        print(f'{name:<30} {best / args.receipts * 1e6:8.1f} µs/receipt')
+
+
+if __name__ == '__main__':
+    main()
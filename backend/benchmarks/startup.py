@@ -0,0 +1,115 @@
+"""
+Worker startup benchmark with a budget.
+
+Each run starts a fresh interpreter that, like a daphne worker, imports
+``config.asgi`` (settings, apps, warm-ups) and the URLconf with all views, then
+answers one GET through the ASGI application. Reported per run:
+
+- ``import config.urls``: cumulative ``python -X importtime`` time of the
+  URLconf (every view module and what it imports);
+- ``first response``: wall time from spawning the process to the first
+  response (interpreter start included).
+
+The slowest imports of the last run are listed (``--top``) and the full
+``-X importtime`` log can be kept with ``--importtime-log``. Exits with status 1
+when the median of either number exceeds its budget, so CI can catch a heavy
+import creeping back onto the startup path.
+
+Usage: python benchmarks/startup.py [--runs 5] [--path /privacy-policy/] [--import-budget-ms 150] [--response-budget-ms 2000] [--importtime-log importtime.txt]
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_BUDGET_MS = 150
+RESPONSE_BUDGET_MS = 2000
+
+IMPORTTIME_RE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+CHILD = '''
+import asyncio, os, sys
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+from config.asgi import application
+import config.urls
+
+async def get(path):
+    sent = []
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+    async def send(message):
+        sent.append(message)
+    await application({
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET', 'scheme': 'http',
+        'path': path, 'raw_path': path.encode(), 'query_string': b'', 'root_path': '',
+        'headers': [(b'host', b'localhost')], 'client': ('127.0.0.1', 0), 'server': ('localhost', 80),
+    }, receive, send)
+    return next(m['status'] for m in sent if m['type'] == 'http.response.start')
+
+print('STATUS', asyncio.run(get(sys.argv[1])), flush=True)
+'''
+
+
+def _run(path):
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', CHILD, path],
+        cwd=BACKEND_DIR, capture_output=True, text=True,
+    )
+    elapsed = time.perf_counter() - started
+    status = re.search(r'^STATUS (\d+)$', result.stdout, re.MULTILINE)
+    if result.returncode != 0 or not status:
+        sys.stderr.write(result.stderr[-3000:])
+        raise SystemExit(f'Startup run failed (exit {result.returncode})')
+    imports = []
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_RE.match(line)
+        if match:
+            imports.append((match.group(4), int(match.group(1)), int(match.group(2)), len(match.group(3)) // 2))
+    return elapsed, int(status.group(1)), imports, result.stderr
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--path', default='/privacy-policy/', help='URL answered as the first response')
+    parser.add_argument('--import-budget-ms', type=float, default=IMPORT_BUDGET_MS)
+    parser.add_argument('--response-budget-ms', type=float, default=RESPONSE_BUDGET_MS)
+    parser.add_argument('--top', type=int, default=15, help='Slowest imports to list (cumulative)')
+    parser.add_argument('--importtime-log', default=None, help='Write the last run\'s -X importtime output here')
+    args = parser.parse_args()
+
+    urls_ms, response_ms = [], []
+    for run in range(1, args.runs + 1):
+        elapsed, status, imports, log = _run(args.path)
+        urls = next((cumulative for name, _self, cumulative, _depth in imports if name == 'config.urls'), 0) / 1000
+        urls_ms.append(urls)
+        response_ms.append(elapsed * 1000)
+        print(f'run {run}: import config.urls {urls:7.1f} ms, first response {elapsed * 1000:7.1f} ms (HTTP {status})')
+
+    if args.importtime_log:
+        with open(args.importtime_log, 'w', encoding='utf-8') as f:
+            f.write(log)
+    print('\nslowest imports (last run, cumulative ms):')
+    for name, _self, cumulative, depth in sorted(imports, key=lambda item: -item[2])[:args.top]:
+        print(f'   {cumulative / 1000:8.1f}  {"  " * min(depth, 6)}{name}')
+
+    failed = False
+    for label, samples, budget in (
+        ('import config.urls', urls_ms, args.import_budget_ms),
+        ('first response', response_ms, args.response_budget_ms),
+    ):
+        median = statistics.median(samples)
+        ok = median <= budget
+        failed |= not ok
+        print(f'{label:<18} median {median:7.1f} ms, budget {budget:7.1f} ms  {"OK" if ok else "OVER BUDGET"}')
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+"""
+In-memory registry of the static files the payment flow sends out.
+
+The instructions PDF is attached to every payment receipt and served by
+``download_instructions_pdf``. Both used to rebuild its Unicode-marked file
+name, call ``os.path.exists``, fall back to scanning ``BASE_DIR`` and read the
+whole file from disk, per payment. A ``FileAsset`` resolves its file once
+(``warm()`` runs at startup) and keeps the bytes in memory; the file is
+re-``stat``-ed at most every ``ASSET_RELOAD_CHECK_SECONDS`` and re-read only
+when its mtime or size changed, so replacing the PDF on disk still takes
+effect without a restart.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, NamedTuple, Optional
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+class AssetContent(NamedTuple):
+    content: bytes
+    path: Path
+    mtime: float
+    etag: str
+
+
+class FileAsset:
+    """
+    A file in ``directory`` named ``filename``, or else the first ``*suffix``
+    file whose name contains ``pattern`` (uploads carry varying direction
+    markers in their names).
+    """
+
+    def __init__(self, name: str, directory, filename: str, *, pattern: str, suffix: str, download_name: str, content_type: str):
+        self.name = name
+        self.directory = Path(directory)
+        self.filename = filename
+        self.pattern = pattern
+        self.suffix = suffix
+        self.download_name = download_name
+        self.content_type = content_type
+        self._lock = threading.Lock()
+        self._path: Optional[Path] = None
+        self._loaded: Optional[AssetContent] = None
+        self._signature = None
+        self._checked_at = 0.0
+
+    def _resolve(self) -> Optional[Path]:
+        path = self.directory / self.filename
+        if path.is_file():
+            return path
+        try:
+            for entry in os.scandir(self.directory):
+                if self.pattern in entry.name and entry.name.endswith(self.suffix) and entry.is_file():
+                    logger.info("[Assets] %s found via search: %s", self.name, entry.name)
+                    return Path(entry.path)
+        except OSError as exc:
+            logger.warning("[Assets] Could not search %s for %s: %s", self.directory, self.name, exc)
+        return None
+
+    def load(self) -> Optional[AssetContent]:
+        """The current content, or ``None`` when the file doesn't exist."""
+        check_seconds = getattr(settings, 'ASSET_RELOAD_CHECK_SECONDS', 2.0)
+        now = time.monotonic()
+        if self._loaded is not None and now - self._checked_at < check_seconds:
+            return self._loaded
+        with self._lock:
+            if self._loaded is not None and now - self._checked_at < check_seconds:
+                return self._loaded
+            self._checked_at = now
+            if self._path is None:
+                self._path = self._resolve()
+            try:
+                stat = self._path.stat() if self._path is not None else None
+            except FileNotFoundError:
+                # Renamed or replaced under another name: look for it again
+                self._path = self._resolve()
+                stat = self._path.stat() if self._path is not None else None
+            if stat is None:
+                if self._loaded is not None or self._signature is None:
+                    logger.warning("[Assets] %s not found in %s", self.name, self.directory)
+                self._loaded, self._signature = None, False
+                return None
+            signature = (self._path, stat.st_mtime_ns, stat.st_size)
+            if signature != self._signature:
+                content = self._path.read_bytes()
+                self._loaded = AssetContent(content, self._path, stat.st_mtime, f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"')
+                self._signature = signature
+                logger.info("[Assets] %s loaded: %s (%d bytes)", self.name, self._path.name, len(content))
+            return self._loaded
+
+
+_registry: Dict[str, FileAsset] = {}
+
+
+def register(asset: FileAsset) -> FileAsset:
+    _registry[asset.name] = asset
+    return asset
+
+
+def get(name: str) -> FileAsset:
+    return _registry[name]
+
+
+def warm() -> None:
+    """Resolve and load every registered asset (at worker startup)."""
+    for asset in _registry.values():
+        asset.load()
+
+
+INSTRUCTIONS_PDF = register(FileAsset(
+    'instructions_pdf',
+    settings.BASE_DIR,
+    '\u200e\u2068اهم التعليمات الصادره لقناة التلغرام (1)\u2069.pdf',  # with Unicode direction markers
+    pattern='اهم التعليمات الصادره لقناة التلغرام',
+    suffix='.pdf',
+    download_name='اهم_التعليمات_الصادرة_لقناة_التلغرام.pdf',
+    content_type='application/pdf',
+))
@@ -0,0 +1,99 @@
+"""
+System checks for static asset references in the project templates and for
+the deployment's cache.
+
+With the hashed static storage every asset URL must come from ``{% static %}``
+so it picks up the content-hashed name (and its immutable caching). The checks
+are tagged ``staticfiles``, so they also run as part of ``collectstatic``:
+
+- a template that hardcodes a ``/static/...`` URL, bypassing the manifest, is
+  an error and fails the build (``config.E001``);
+- a ``{% static %}`` reference to a file that doesn't exist is reported as a
+  warning (``config.W001``); it has no manifest entry and is emitted unhashed.
+
+Page cache versions, verification single-flight locks, idempotency claims and
+payment events all coordinate workers through the default cache. With more
+than one worker process (``WEB_CONCURRENCY``) on the per-process ``LocMemCache``
+(``REDIS_URL`` unset) they silently stop coordinating; that is an error
+(``config.E002``). It is tagged ``staticfiles`` as well, so ``collectstatic``
+fails and ``entrypoint.sh`` never starts the workers (its own ``REDIS_URL``
+guard stops it first).
+"""
+from __future__ import annotations
+
+import os
+import re
+from pathlib import Path
+from typing import Iterator, List, Tuple
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.core.checks import Error, Tags, Warning, register
+
+HARDCODED_STATIC_RE = re.compile(r'''(?:src|href|srcset|poster|url\()\s*=?\s*["']?(/static/[^"'\s)]+)''')
+STATIC_TAG_RE = re.compile(r'''\{%\s*(?:static|responsive_image)\s+(["'])([^"']+)\1''')
+
+
+def _project_template_dirs() -> List[Path]:
+    """Template directories that belong to this project (not to installed packages)."""
+    from django.template import engines
+
+    base_dir = Path(settings.BASE_DIR).resolve()
+    dirs = []
+    for engine in engines.all():
+        for directory in getattr(engine, 'template_dirs', []):
+            path = Path(directory).resolve()
+            if path.is_dir() and base_dir in path.parents:
+                dirs.append(path)
+    return dirs
+
+
+def _template_lines() -> Iterator[Tuple[str, int, str]]:
+    for directory in _project_template_dirs():
+        for root, _dirs, files in os.walk(directory):
+            for name in files:
+                if not name.endswith('.html'):
+                    continue
+                path = os.path.join(root, name)
+                with open(path, encoding='utf-8', errors='replace') as f:
+                    for number, line in enumerate(f, start=1):
+                        yield os.path.relpath(path, settings.BASE_DIR), number, line
+
+
+@register(Tags.staticfiles)
+def check_static_references(app_configs=None, **kwargs):
+    errors = []
+    missing_cache = {}
+    for path, number, line in _template_lines():
+        for url in HARDCODED_STATIC_RE.findall(line):
+            errors.append(Error(
+                f'{path}:{number} hardcodes the static URL {url!r}, which is never content-hashed.',
+                hint="Use {% static '...' %} so the hashed name (and immutable caching) is used.",
+                obj=path,
+                id='config.E001',
+            ))
+        for _quote, name in STATIC_TAG_RE.findall(line):
+            if name not in missing_cache:
+                missing_cache[name] = finders.find(name) is None
+            if missing_cache[name]:
+                errors.append(Warning(
+                    f'{path}:{number} references the missing static file {name!r}.',
+                    hint='It has no entry in staticfiles.json, so its URL is emitted unhashed (and 404s).',
+                    obj=path,
+                    id='config.W001',
+                ))
+    return errors
+
+
+# Also tagged staticfiles: collectstatic only runs those checks, and entrypoint.sh runs it before the workers
+@register(Tags.caches, Tags.staticfiles)
+def check_shared_cache(app_configs=None, **kwargs):
+    workers = getattr(settings, 'WEB_CONCURRENCY', 1)
+    backend = settings.CACHES.get('default', {}).get('BACKEND', '')
+    if workers > 1 and backend.endswith('.LocMemCache'):
+        return [Error(
+            f'WEB_CONCURRENCY is {workers} but the default cache is per-process memory ({backend}).',
+            hint='Set REDIS_URL so the workers share one cache, or run a single worker (WEB_CONCURRENCY=1).',
+            id='config.E002',
+        )]
+    return []
@@ -0,0 +1,172 @@
+"""
+Conditional GET support (ETag / Last-Modified / 304) for page and JSON views.
+
+Each view declares the inputs its response depends on with ``conditional_page``::
+
+    @conditional_page(template_files('packages.html'))
+    def packages_page(request): ...
+
+Every input is a callable ``(request, *args, **kwargs) -> (etag_part, last_modified)``.
+The validators are computed from those inputs without rendering anything, so an
+``If-None-Match`` / ``If-Modified-Since`` hit is answered with 304 before any
+template or serializer work happens. Database-backed inputs are memoized in
+the cache under the landing content version, so they cost no queries until
+a ``Video``, ``LandingPage`` or ``BlackFridaySettings`` change is committed
+(the signals bump the version from ``transaction.on_commit``); the memoized
+values also expire after ``LANDING_CONTEXT_CACHE_TIMEOUT`` seconds. The landing
+content version is part of every validator, so no input can miss a change.
+
+The view's URL arguments (e.g. the landing ``short_code``) and the query
+parameters it reads (``query_params``, as for ``cache_landing_page``) are part
+of the ETag too: pages that render differently never share a validator.
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import sys
+from datetime import datetime, timezone as dt_timezone
+from functools import lru_cache, wraps
+from typing import Callable, Iterable, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Max
+from django.template.loader import get_template
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+from .landing_cache import get_landing_version
+from .storage import manifest_version
+
+logger = logging.getLogger(__name__)
+
+Freshness = Tuple[str, Optional[datetime]]
+
+
+def _from_timestamp(timestamp: Optional[float]) -> Optional[datetime]:
+    if timestamp is None:
+        return None
+    return datetime.fromtimestamp(timestamp, tz=dt_timezone.utc)
+
+
+@lru_cache(maxsize=None)
+def _template_path(name: str) -> str:
+    return get_template(name).origin.name
+
+
+def template_files(*names: str) -> Callable[..., Freshness]:
+    """Depend on the modification time of the given template files."""
+    def freshness(request, *args, **kwargs) -> Freshness:
+        mtimes = [os.path.getmtime(_template_path(name)) for name in names]
+        return ','.join(f'{mtime:.0f}' for mtime in mtimes), _from_timestamp(max(mtimes))
+    return freshness
+
+
+def _cached_aggregate(name: str, queryset) -> Freshness:
+    key = f'landing:freshness:{name}:{get_landing_version()}'
+    value = cache.get(key)
+    if value is None:
+        aggregate = queryset.aggregate(updated=Max('updated_at'), count=Count('id'))
+        value = (f"{aggregate['count']}:{aggregate['updated']}", aggregate['updated'])
+        cache.set(key, value, getattr(settings, 'LANDING_CONTEXT_CACHE_TIMEOUT', 300))
+    return value
+
+
+def video_updates(request, *args, **kwargs) -> Freshness:
+    """Depend on ``Video.updated_at`` (and deletions, through the row count)."""
+    from videos.models import Video
+
+    return _cached_aggregate('videos', Video.objects.all())
+
+
+def black_friday_updates(request, *args, **kwargs) -> Freshness:
+    """Depend on ``BlackFridaySettings.updated_at``."""
+    from contacts.models import BlackFridaySettings
+
+    return _cached_aggregate('black_friday', BlackFridaySettings.objects.all())
+
+
+def landing_content(request, *args, **kwargs) -> Freshness:
+    """Depend on anything that bumps the landing content version (e.g. ``LandingPage`` edits)."""
+    return str(get_landing_version()), None
+
+
+def media_video_files(request, *args, **kwargs) -> Freshness:
+    """Depend on the media videos directory used as the landing page fallback."""
+    from videos import media_manifest
+
+    mtime = media_manifest.get_manifest().get('directory_mtime')
+    return str(mtime), _from_timestamp(mtime)
+
+
+def _request_identity(request, query_params: Iterable[str], args, kwargs) -> str:
+    """What selects the page: URL arguments and the query parameters the view reads."""
+    params = '&'.join(f'{name}={request.GET.get(name, "")}' for name in query_params)
+    view_args = '&'.join([str(arg) for arg in args] + [f'{k}={v}' for k, v in sorted(kwargs.items())])
+    return f'{params}#{view_args}'
+
+
+def _validators(view_func, inputs, request, args, kwargs, query_params=()) -> Tuple[str, Optional[int]]:
+    # Deploys change the view code and, through collectstatic, the hashed asset names
+    parts = [
+        _code_version(view_func), manifest_version(), str(get_landing_version()),
+        _request_identity(request, query_params, args, kwargs),
+    ]
+    latest = None
+    for freshness in inputs:
+        part, last_modified = freshness(request, *args, **kwargs)
+        parts.append(part)
+        if last_modified is not None and (latest is None or last_modified > latest):
+            latest = last_modified
+    digest = hashlib.md5('|'.join(parts).encode('utf-8')).hexdigest()
+    # Weak: pages embed a per-visitor CSRF token, so they are only semantically equivalent
+    return f'W/"{digest}"', int(latest.timestamp()) if latest else None
+
+
+@lru_cache(maxsize=None)
+def _code_version(view_func) -> str:
+    """Deploying new view code must change the validators too."""
+    try:
+        return f'{os.path.getmtime(sys.modules[view_func.__module__].__file__):.0f}'
+    except (AttributeError, KeyError, OSError, TypeError):
+        return ''
+
+
+def conditional_page(*inputs: Callable[..., Freshness], query_params: Iterable[str] = ()):
+    """
+    Emit ETag/Last-Modified from ``inputs`` and answer conditional GETs with 304.
+
+    ``query_params`` lists the GET parameters the view reads; all others are ignored.
+    """
+    query_params = tuple(query_params)
+
+    def decorator(func):
+        @wraps(func)
+        def _wrapped_view(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return func(request, *args, **kwargs)
+
+            try:
+                etag, last_modified = _validators(func, inputs, request, args, kwargs, query_params)
+            except Exception as exc:
+                logger.warning("[Conditional GET] Could not compute validators for %s: %s", request.path, exc)
+                return func(request, *args, **kwargs)
+
+            response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+            if response is not None:
+                return response
+
+            response = func(request, *args, **kwargs)
+            if response.status_code == 200:
+                if not response.has_header('ETag'):
+                    response.headers['ETag'] = etag
+                if last_modified and not response.has_header('Last-Modified'):
+                    response.headers['Last-Modified'] = http_date(last_modified)
+                if not response.has_header('Cache-Control'):
+                    # Let browsers keep the copy but revalidate it on every visit
+                    patch_cache_control(response, no_cache=True)
+            return response
+        return _wrapped_view
+    return decorator
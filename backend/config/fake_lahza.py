@@ -0,0 +1,218 @@
+"""
+Local stand-in for the Lahza API, for load tests and offline development.
+
+``FakeLahzaServer`` implements the two endpoints ``config.lahza_service``
+calls, ``POST /transaction/initialize`` and ``GET /transaction/verify/<ref>``,
+with Lahza's response envelope (``{'status': True, 'data': {...}}``):
+
+- every response is delayed by ``latency`` seconds (± ``jitter``), and a
+  share ``error_rate`` of them fails with a 503, to exercise the client's
+  retries and circuit breaker;
+- a transaction stays ``pending`` for ``settle_delay`` seconds after it is
+  initialized, then becomes ``success``, or ``failed`` for a share
+  ``decline_rate`` of them, with an ``authorization`` card like Lahza's;
+- with ``webhook_url`` set, the settled transaction is also POSTed there as a
+  ``charge.success``/``charge.failed`` webhook.
+
+Point ``LAHZA_BASE_URL`` at ``server.url`` (any ``LAHZA_SECRET_KEY`` is
+accepted). ``python manage.py run_fake_lahza`` runs one standalone and
+``python manage.py loadtest_payments`` starts one in-process.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import random
+import threading
+import time
+import urllib.request
+import uuid
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+CARD_BRANDS = ('visa', 'mastercard')
+
+
+class FakeLahzaServer:
+    def __init__(
+        self,
+        host: str = '127.0.0.1',
+        port: int = 0,
+        *,
+        latency: float = 0.1,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        decline_rate: float = 0.0,
+        settle_delay: float = 0.0,
+        webhook_url: Optional[str] = None,
+        seed: Optional[int] = None,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.decline_rate = decline_rate
+        self.settle_delay = settle_delay
+        self.webhook_url = webhook_url
+        self.transactions: Dict[str, Dict[str, Any]] = {}
+        self.stats: Counter = Counter()
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self) -> 'FakeLahzaServer':
+        """Serve from a background thread."""
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name='fake-lahza', daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        self._httpd.serve_forever()
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    # Simulation
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self.stats[name] += 1
+
+    def _sleep(self) -> None:
+        with self._lock:
+            delay = self.latency + self._random.uniform(-self.jitter, self.jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+    def _inject_error(self) -> bool:
+        with self._lock:
+            return self.error_rate > 0 and self._random.random() < self.error_rate
+
+    def initialize(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        reference = payload.get('ref') or f'FAKE-{uuid.uuid4().hex[:12].upper()}'
+        with self._lock:
+            declined = self._random.random() < self.decline_rate
+            card = {
+                'brand': self._random.choice(CARD_BRANDS),
+                'last4': f'{self._random.randint(0, 9999):04d}',
+                'exp_month': str(self._random.randint(1, 12)),
+                'exp_year': str(self._random.randint(2027, 2031)),
+            }
+            transaction = {
+                'id': len(self.transactions) + 1000000,
+                'reference': reference,
+                'amount': payload.get('amount', 0),
+                'currency': payload.get('currency', 'ILS'),
+                'customer': {
+                    'email': payload.get('email', ''),
+                    'name': f"{payload.get('firstName', '')} {payload.get('lastName', '')}".strip(),
+                },
+                'metadata': payload.get('metadata') or {},
+                'authorization': dict(card, authorization_code=f'AUTH_{uuid.uuid4().hex[:10]}', reusable=True),
+                '_outcome': 'failed' if declined else 'success',
+                '_settles_at': time.monotonic() + self.settle_delay,
+            }
+            self.transactions[reference] = transaction
+        if self.webhook_url:
+            timer = threading.Timer(self.settle_delay, self._send_webhook, args=(reference,))
+            timer.daemon = True
+            timer.start()
+        return {
+            'authorization_url': f'{self.url}/checkout/{reference}',
+            'access_code': uuid.uuid4().hex[:16],
+            'reference': reference,
+            'id': transaction['id'],
+        }
+
+    def transaction(self, reference: str) -> Optional[Dict[str, Any]]:
+        """The transaction as verify reports it now, ``None`` for an unknown reference."""
+        with self._lock:
+            transaction = self.transactions.get(reference)
+            if transaction is None:
+                return None
+            settled = time.monotonic() >= transaction['_settles_at']
+            data = {key: value for key, value in transaction.items() if not key.startswith('_')}
+            data['status'] = transaction['_outcome'] if settled else 'pending'
+            if data['status'] != 'success':
+                data.pop('authorization')
+            return data
+
+    def webhook_payload(self, reference: str) -> Optional[Dict[str, Any]]:
+        data = self.transaction(reference)
+        if data is None:
+            return None
+        return {'event': f"charge.{data['status']}", 'data': data}
+
+    def _send_webhook(self, reference: str) -> None:
+        body = json.dumps(self.webhook_payload(reference)).encode()
+        request = urllib.request.Request(self.webhook_url, data=body, headers={'Content-Type': 'application/json'})
+        try:
+            with urllib.request.urlopen(request, timeout=10) as response:
+                response.read()
+            self._count('webhooks_sent')
+        except OSError as exc:
+            self._count('webhooks_failed')
+            logger.warning("[Fake Lahza] Webhook for %s failed: %s", reference, exc)
+
+    # HTTP
+
+    def _handle(self, method: str, path: str, body: bytes, authorization: str) -> Tuple[int, Dict[str, Any]]:
+        if not authorization.startswith('Bearer '):
+            return 401, {'status': False, 'message': 'Invalid key'}
+        path = path.split('?', 1)[0].rstrip('/')
+        if method == 'POST' and path == '/transaction/initialize':
+            self._count('initialize')
+            try:
+                payload = json.loads(body or b'{}')
+            except ValueError:
+                return 400, {'status': False, 'message': 'Invalid JSON'}
+            if not payload.get('email') or not payload.get('amount'):
+                return 400, {'status': False, 'message': 'email and amount are required'}
+            return 200, {'status': True, 'message': 'Authorization URL created', 'data': self.initialize(payload)}
+        if method == 'GET' and path.startswith('/transaction/verify/'):
+            self._count('verify')
+            data = self.transaction(path.rsplit('/', 1)[-1])
+            if data is None:
+                return 404, {'status': False, 'message': 'Transaction reference not found'}
+            return 200, {'status': True, 'message': 'Verification successful', 'data': data}
+        return 404, {'status': False, 'message': 'Not found'}
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'  # keep-alive, like the real API behind its load balancer
+
+            def log_message(self, format, *args):
+                logger.debug("[Fake Lahza] " + format, *args)
+
+            def _respond(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                body = self.rfile.read(length) if length else b''
+                server._sleep()
+                if server._inject_error():
+                    server._count('injected_errors')
+                    status, data = 503, {'status': False, 'message': 'Service temporarily unavailable'}
+                else:
+                    status, data = server._handle(self.command, self.path, body, self.headers.get('Authorization', ''))
+                encoded = json.dumps(data).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(encoded)))
+                self.end_headers()
+                self.wfile.write(encoded)
+
+            do_GET = _respond
+            do_POST = _respond
+
+        return Handler
@@ -0,0 +1,311 @@
+"""
+Instructions PDF generated with ReportLab when the static file is missing.
+
+Every order's PDF is the same document except for the "Order Reference" line
+at the bottom, yet ``generate_instructions_pdf`` laid it out from scratch
+(styles, paragraphs, page breaking) for each receipt. Here the document is
+built once per ``TEMPLATE_VERSION`` with a fixed-size, blank slot where the
+footer goes; the PDF is written uncompressed so the slot's bytes can be found,
+and each order's PDF is that body with the slot overwritten by the footer's
+text operators, padded to the same length so the cross-reference table stays
+valid. Rendered PDFs are also kept on disk under
+``INSTRUCTIONS_PDF_CACHE_DIR/<version>/<reference>.pdf``.
+
+Bump ``TEMPLATE_VERSION`` whenever the content below changes.
+
+Benchmark: ``python benchmarks/bench_instructions_pdf.py``.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import re
+import threading
+from io import BytesIO
+from pathlib import Path
+from typing import Optional
+
+from django.conf import settings
+from reportlab.lib.enums import TA_CENTER, TA_RIGHT
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.lib.units import inch
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.platypus import Flowable, Paragraph, SimpleDocTemplate, Spacer
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_VERSION = '1'
+
+FOOTER_FONT = 'Helvetica-Oblique'
+FOOTER_SIZE = 10
+FOOTER_GRAY = 0.4  # #666666
+
+# A PDF comment, so the unstamped body is a valid document; padded to SLOT_SIZE bytes
+SLOT_MARKER = b'%%instructions-pdf-footer%%'
+SLOT_SIZE = 160
+
+# References are generated by us (contacts.models / lahza_service), anything else is laid out in full
+SAFE_REFERENCE_RE = re.compile(r'^[A-Za-z0-9_.:-]{1,64}$')
+
+_lock = threading.Lock()
+_bodies = {}
+
+
+class FooterSlot(Flowable):
+    """Reserves the footer line and writes the blank slot the stamp replaces."""
+
+    def wrap(self, available_width, available_height):
+        self.width = available_width
+        return available_width, FOOTER_SIZE * 1.2
+
+    def draw(self):
+        # Sets the font and color in the graphics state for the stamped text operators
+        self.canv.setFont(FOOTER_FONT, FOOTER_SIZE)
+        self.canv.setFillGray(FOOTER_GRAY)
+        self.canv.addLiteral((SLOT_MARKER + b' ' * (SLOT_SIZE - len(SLOT_MARKER))).decode('ascii'))
+
+
+def _flowables():
+    # Container for the 'Flowable' objects
+    elements = []
+
+    # Define styles
+    styles = getSampleStyleSheet()
+
+    # Title style
+    title_style = ParagraphStyle(
+        'CustomTitle',
+        parent=styles['Heading1'],
+        fontSize=24,
+        textColor='#6B46C1',
+        spaceAfter=30,
+        alignment=TA_CENTER,
+        fontName='Helvetica-Bold'
+    )
+
+    # Heading style
+    heading_style = ParagraphStyle(
+        'CustomHeading',
+        parent=styles['Heading2'],
+        fontSize=16,
+        textColor='#E91E8C',
+        spaceAfter=12,
+        spaceBefore=20,
+        fontName='Helvetica-Bold'
+    )
+
+    # Subheading style
+    subheading_style = ParagraphStyle(
+        'CustomSubheading',
+        parent=styles['Heading3'],
+        fontSize=14,
+        textColor='#6B46C1',
+        spaceAfter=8,
+        spaceBefore=12,
+        fontName='Helvetica-Bold'
+    )
+
+    # Normal text style (RTL for Arabic)
+    normal_style = ParagraphStyle(
+        'CustomNormal',
+        parent=styles['Normal'],
+        fontSize=12,
+        spaceAfter=10,
+        leading=18,
+        alignment=TA_RIGHT,
+        rightIndent=0,
+        leftIndent=0
+    )
+
+    # Bullet style (RTL for Arabic)
+    bullet_style = ParagraphStyle(
+        'CustomBullet',
+        parent=styles['Normal'],
+        fontSize=12,
+        spaceAfter=8,
+        leading=18,
+        rightIndent=20,
+        leftIndent=0,
+        alignment=TA_RIGHT
+    )
+
+    # Title
+    title = Paragraph("أهم التعليمات الصادرة لمساعدتك", title_style)
+    elements.append(title)
+    elements.append(Spacer(1, 0.2*inch))
+
+    subtitle = Paragraph("لحتى تقدر تبدأ معنا، يرجى اتباع الخطوات التالية بعد الدفع", normal_style)
+    elements.append(subtitle)
+    elements.append(Spacer(1, 0.3*inch))
+
+    # Section 1
+    heading1 = Paragraph("1. إرسال وثائق التسجيل", heading_style)
+    elements.append(heading1)
+
+    text1 = Paragraph("يرجى إرسال ما يلي على الرقم التالي: <b>+972593700806</b>", normal_style)
+    elements.append(text1)
+
+    items1 = [
+        "الاسم الكامل",
+        "صورة الهوية",
+        "الايميل",
+        "رقم الجوال",
+        "اشعار الدفع",
+        "اسم الخدمة التي تم التسجيل فيها"
+    ]
+
+    for item in items1:
+        bullet = Paragraph(f"• {item}", bullet_style)
+        elements.append(bullet)
+
+    elements.append(Spacer(1, 0.2*inch))
+
+    # Section 2
+    heading2 = Paragraph("2. الدخول إلى المنصة", heading_style)
+    elements.append(heading2)
+
+    text2 = Paragraph("بعد وصول بيانات الدخول:", normal_style)
+    elements.append(text2)
+
+    items2 = [
+        "اضغط على رابط المنصة: <b>https://discord.gg/t2J8ajgt</b> و سوف يتم تفعيلك في اقرب وقت.",
+        "سجل دخولك على منصة الديسكورد و ارسل لنا اسمك على التطبيق.",
+        "بعد التواصل مع القسم المختص سيتم اضافتك على السيرفر الخاص بنا و ستظهر لك الدورة علي الشاشة الرئيسية"
+    ]
+
+    for item in items2:
+        bullet = Paragraph(f"• {item}", bullet_style)
+        elements.append(bullet)
+
+    elements.append(Spacer(1, 0.2*inch))
+
+    # Section 3
+    heading3 = Paragraph("3. بدء الدراسة", heading_style)
+    elements.append(heading3)
+
+    items3 = [
+        "اختيار اليوم و الوقت المناسبين لك للدراسة.",
+        "يرجى الانضمام والمتابعه بمواعيد المحاضرات لديك.",
+        "بالأضافة يمكنك بدء مشاهدة الدروس المسجلة فورًا بعد تفعيل حسابك معنا.",
+        "المحتوى المسجل على التيليجرام متاح لك 24/7.",
+        "جميع الملفات والاختبارات موجودة داخل تطبيق الديسكورد."
+    ]
+
+    for item in items3:
+        bullet = Paragraph(f"• {item}", bullet_style)
+        elements.append(bullet)
+
+    elements.append(Spacer(1, 0.2*inch))
+
+    # Section 4
+    heading4 = Paragraph("4. لدعم الفني", heading_style)
+    elements.append(heading4)
+
+    text4 = Paragraph("إذا واجهتك أي مشكلة:", normal_style)
+    elements.append(text4)
+
+    bullet4 = Paragraph("• للتواصل والأستفسار معنا عبر واتساب: <b>+972593700806</b>", bullet_style)
+    elements.append(bullet4)
+
+    elements.append(Spacer(1, 0.3*inch))
+    elements.append(FooterSlot())
+    return elements
+
+
+def _build_body() -> bytes:
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(
+        buffer, pagesize=A4, rightMargin=72, leftMargin=72, topMargin=72, bottomMargin=72,
+        pageCompression=0,  # the slot must stay findable in the page stream
+        invariant=1,
+    )
+    doc.build(_flowables())
+    body = buffer.getvalue()
+    if body.count(SLOT_MARKER) != 1:
+        raise RuntimeError('instructions PDF footer slot not found exactly once')
+    return body
+
+
+def _frame_width() -> float:
+    # The width FooterSlot.wrap gets: page minus margins minus the frame's 6pt padding on each side
+    return A4[0] - 72 - 72 - 12
+
+
+def _footer_operators(reference: str) -> Optional[bytes]:
+    """The footer's text operators padded to ``SLOT_SIZE``, ``None`` when they can't be stamped."""
+    if not SAFE_REFERENCE_RE.match(reference):
+        return None
+    text = f'Order Reference: {reference}'
+    x = (_frame_width() - stringWidth(text, FOOTER_FONT, FOOTER_SIZE)) / 2
+    operators = f'BT 1 0 0 1 {x:.2f} 2 Tm ({text}) Tj ET'.encode('ascii')
+    if len(operators) > SLOT_SIZE:
+        return None
+    return operators.ljust(SLOT_SIZE)
+
+
+def body() -> bytes:
+    """The laid-out document with a blank footer slot, built once per template version."""
+    built = _bodies.get(TEMPLATE_VERSION)
+    if built is None:
+        with _lock:
+            built = _bodies.get(TEMPLATE_VERSION)
+            if built is None:
+                built = _bodies[TEMPLATE_VERSION] = _build_body()
+                logger.info("[PDF] Instructions body v%s built (%d bytes)", TEMPLATE_VERSION, len(built))
+    return built
+
+
+def stamp(reference: str) -> bytes:
+    """The instructions PDF for ``reference``: the cached body plus its footer."""
+    operators = _footer_operators(reference)
+    template = body()
+    if operators is None:
+        logger.warning("[PDF] Reference %r can't be stamped, laying out the full document", reference)
+        return _build_full(reference)
+    start = template.index(SLOT_MARKER)
+    return template[:start] + operators + template[start + SLOT_SIZE:]
+
+
+def _build_full(reference: str) -> bytes:
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=A4, rightMargin=72, leftMargin=72, topMargin=72, bottomMargin=72)
+    elements = _flowables()[:-1]
+    elements.append(Paragraph(f"<i>Order Reference: {reference}</i>", ParagraphStyle(
+        'Footer',
+        parent=getSampleStyleSheet()['Normal'],
+        fontSize=FOOTER_SIZE,
+        textColor='#666666',
+        alignment=TA_CENTER
+    )))
+    doc.build(elements)
+    return buffer.getvalue()
+
+
+def _cache_path(reference: str) -> Optional[Path]:
+    directory = getattr(settings, 'INSTRUCTIONS_PDF_CACHE_DIR', '')
+    if not directory or not SAFE_REFERENCE_RE.match(reference):
+        return None
+    return Path(directory) / TEMPLATE_VERSION / f'{reference}.pdf'
+
+
+def render(reference: str) -> bytes:
+    """The instructions PDF for ``reference``, from the disk cache when it was rendered before."""
+    path = _cache_path(reference)
+    if path is not None:
+        try:
+            return path.read_bytes()
+        except FileNotFoundError:
+            pass
+        except OSError as exc:
+            logger.warning("[PDF] Could not read cached %s: %s", path, exc)
+    pdf = stamp(reference)
+    if path is not None:
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(f'.{os.getpid()}.tmp')
+            tmp_path.write_bytes(pdf)
+            os.replace(tmp_path, path)  # Atomic: concurrent renders never see half a file
+        except OSError as exc:
+            logger.warning("[PDF] Could not cache %s: %s", path, exc)
+    return pdf
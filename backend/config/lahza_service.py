@@ -1,13 +1,34 @@
 """
 Utility helpers for interacting with the Lahza payment gateway.
+
+All calls go through one shared ``LahzaClient`` per process, which provides:
+
+- a keep-alive ``requests.Session`` connection pool, so payments don't pay a
+  new TLS handshake each time;
+- split connect/read timeouts (``LAHZA_CONNECT_TIMEOUT`` / ``LAHZA_READ_TIMEOUT``);
+- jittered exponential-backoff retries for idempotent calls (verify only);
+- a circuit breaker that fails fast while the gateway is unhealthy;
+- latency and breaker counters (``get_client().stats()``).
+
+The ``async`` views use ``AsyncLahzaClient`` (``get_async_client()``), the same
+policy on an ``httpx.AsyncClient``, through ``ainitialize_transaction`` and
+``averify_transaction``. Both clients share one circuit breaker and one set of
+counters, so either one opening the breaker makes the other fail fast too.
 """
 from __future__ import annotations
 
+import asyncio
 import logging
+import random
+import threading
+import time
+import weakref
 from typing import Any, Dict, Optional
 
+import httpx
 import requests
 from django.conf import settings
+from requests.adapters import HTTPAdapter
 
 logger = logging.getLogger(__name__)
 
@@ -16,6 +37,365 @@ class LahzaAPIError(Exception):
     """Raised when Lahza returns an error response."""
 
 
+class LahzaUnavailableError(LahzaAPIError):
+    """Raised without calling Lahza while the circuit breaker is open."""
+
+
+class _GatewayError(Exception):
+    """Transient failure (network error or 5xx/429) that counts against the breaker."""
+
+
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class CircuitBreaker:
+    """
+    Classic closed -> open -> half-open breaker.
+
+    After ``failure_threshold`` consecutive gateway failures the breaker opens
+    and calls fail immediately for ``reset_timeout`` seconds; then a single
+    trial call is let through (half-open) and its outcome closes or re-opens it.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self.short_circuited = 0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        return self.acquire() is not None
+
+    def acquire(self) -> Optional[bool]:
+        """``None`` when the call must fail fast, else whether it is the half-open trial."""
+        with self._lock:
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self._trial_in_flight = False
+                logger.info("[Lahza] Circuit breaker half-open, sending a trial request")
+            if self.state == self.CLOSED:
+                return False
+            if self.state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            self.short_circuited += 1
+            return None
+
+    def abort_trial(self) -> None:
+        """
+        The trial ended without a recorded outcome (cancelled, unexpected
+        error): count it as a failure, or the breaker would stay half-open
+        with a trial "in flight" forever and refuse every later call.
+        """
+        with self._lock:
+            pending = self.state == self.HALF_OPEN and self._trial_in_flight
+        if pending:
+            self.record_failure()
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self.state != self.CLOSED:
+                logger.info("[Lahza] Circuit breaker closed, gateway recovered")
+            self.state = self.CLOSED
+            self.consecutive_failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.consecutive_failures += 1
+            if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    self.times_opened += 1
+                    logger.error(
+                        "[Lahza] Circuit breaker opened after %d failure(s), failing fast for %.0fs",
+                        self.consecutive_failures, self.reset_timeout,
+                    )
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+                self._trial_in_flight = False
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "state": self.state,
+                "consecutive_failures": self.consecutive_failures,
+                "times_opened": self.times_opened,
+                "short_circuited": self.short_circuited,
+                "seconds_until_retry": (
+                    max(0.0, round(self.reset_timeout - (time.monotonic() - self.opened_at), 1))
+                    if self.state == self.OPEN else 0.0
+                ),
+            }
+
+
+class _OperationStats:
+    def __init__(self):
+        self.calls = 0
+        self.failures = 0
+        self.retries = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "failures": self.failures,
+            "retries": self.retries,
+            "avg_ms": round(self.total_ms / self.calls, 1) if self.calls else 0.0,
+            "max_ms": round(self.max_ms, 1),
+        }
+
+
+class _ClientStats:
+    """Per-operation counters, shared by the sync and async clients of a process."""
+
+    def __init__(self):
+        self._operations: Dict[str, _OperationStats] = {}
+        self._lock = threading.Lock()
+
+    def record(self, operation: str, elapsed_ms: float, *, failed: bool = False, retried: bool = False) -> None:
+        with self._lock:
+            stats = self._operations.setdefault(operation, _OperationStats())
+            if retried:
+                stats.retries += 1
+                return
+            stats.calls += 1
+            stats.failures += failed
+            stats.total_ms += elapsed_ms
+            stats.max_ms = max(stats.max_ms, elapsed_ms)
+
+    def as_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {name: stats.as_dict() for name, stats in self._operations.items()}
+
+
+class _BaseClient:
+    """Retry, breaker and stats policy shared by the sync and async clients."""
+
+    def __init__(
+        self,
+        *,
+        base_url: str,
+        connect_timeout: float = 3.05,
+        read_timeout: float = 15.0,
+        pool_size: int = 10,
+        verify_retries: int = 2,
+        backoff_base: float = 0.25,
+        backoff_max: float = 2.0,
+        breaker: Optional[CircuitBreaker] = None,
+        stats: Optional[_ClientStats] = None,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = (connect_timeout, read_timeout)
+        self.pool_size = pool_size
+        self.verify_retries = verify_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker = breaker or CircuitBreaker()
+        self._stats = stats or _ClientStats()
+
+    def _url(self, path: str) -> str:
+        return f"{self.base_url}/{path.lstrip('/')}"
+
+    def _attempts(self, idempotent: bool) -> int:
+        return 1 + (self.verify_retries if idempotent else 0)
+
+    def _check_breaker(self) -> bool:
+        """Raise when the breaker is open; returns whether this call is the half-open trial."""
+        trial = self.breaker.acquire()
+        if trial is None:
+            raise LahzaUnavailableError("Lahza is temporarily unavailable, please try again shortly")
+        return trial
+
+    def _on_failure(self, operation: str, exc: Exception, started: float, attempt: int, attempts: int) -> Optional[float]:
+        """Record a transient failure; return the backoff delay, or raise once attempts are exhausted."""
+        elapsed_ms = (time.monotonic() - started) * 1000
+        self.breaker.record_failure()
+        if attempt + 1 < attempts:
+            self._stats.record(operation, elapsed_ms, retried=True)
+            delay = self._backoff(attempt)
+            logger.warning("[Lahza] %s failed (%s), retry %d in %.2fs", operation, exc, attempt + 1, delay)
+            return delay
+        self._stats.record(operation, elapsed_ms, failed=True)
+        logger.error("[Lahza] %s failed: %s", operation, exc)
+        raise LahzaAPIError(str(exc)) from exc
+
+    def _on_success(self, operation: str, started: float) -> None:
+        self.breaker.record_success()
+        self._stats.record(operation, (time.monotonic() - started) * 1000)
+
+    def _backoff(self, attempt: int) -> float:
+        # Full jitter: spread retries from concurrent workers instead of hammering in lockstep
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "base_url": self.base_url,
+            "timeouts": {"connect": self.timeout[0], "read": self.timeout[1]},
+            "breaker": self.breaker.snapshot(),
+            "operations": self._stats.as_dict(),
+        }
+
+
+class LahzaClient(_BaseClient):
+    """Pooled HTTP client for the Lahza API; use the shared instance from ``get_client()``."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def _send(self, method: str, url: str, **kwargs) -> requests.Response:
+        try:
+            response = self.session.request(method, url, timeout=self.timeout, **kwargs)
+        except requests.RequestException as exc:
+            raise _GatewayError(str(exc)) from exc
+        if response.status_code in RETRYABLE_STATUS_CODES:
+            raise _GatewayError(f"Lahza returned HTTP {response.status_code}")
+        return response
+
+    def request(self, operation: str, method: str, path: str, *, idempotent: bool = False, **kwargs) -> requests.Response:
+        """
+        Send a request through the pool and the circuit breaker.
+
+        Only ``idempotent`` requests are retried; a transient failure on the last
+        attempt raises ``LahzaAPIError``.
+        """
+        url = self._url(path)
+        attempts = self._attempts(idempotent)
+        for attempt in range(attempts):
+            trial = self._check_breaker()
+            started = time.monotonic()
+            try:
+                try:
+                    response = self._send(method, url, **kwargs)
+                except _GatewayError as exc:
+                    delay = self._on_failure(operation, exc, started, attempt, attempts)
+                else:
+                    self._on_success(operation, started)
+                    return response
+            finally:
+                if trial:
+                    self.breaker.abort_trial()  # No-op once the outcome was recorded
+            time.sleep(delay)
+        raise LahzaAPIError("Lahza request failed")  # pragma: no cover - loop always returns or raises
+
+
+class AsyncLahzaClient(_BaseClient):
+    """
+    ``httpx.AsyncClient`` counterpart of ``LahzaClient`` for the async views.
+
+    A request waiting on Lahza only holds a coroutine, not a worker thread, so
+    one daphne process can keep hundreds of gateway calls in flight; they
+    share up to ``pool_size * 10`` keep-alive connections.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        connect_timeout, read_timeout = self.timeout
+        self.http = httpx.AsyncClient(
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+            limits=httpx.Limits(
+                max_connections=self.pool_size * 10,
+                max_keepalive_connections=self.pool_size,
+            ),
+        )
+
+    async def _send(self, method: str, url: str, **kwargs) -> httpx.Response:
+        try:
+            response = await self.http.request(method, url, **kwargs)
+        except httpx.HTTPError as exc:
+            # e.g. "ReadTimeout: timed out", which the views map to a user-facing message
+            raise _GatewayError(f"{exc.__class__.__name__}: {exc}") from exc
+        if response.status_code in RETRYABLE_STATUS_CODES:
+            raise _GatewayError(f"Lahza returned HTTP {response.status_code}")
+        return response
+
+    async def request(self, operation: str, method: str, path: str, *, idempotent: bool = False, **kwargs) -> httpx.Response:
+        """Async ``LahzaClient.request``: same retries, breaker and stats."""
+        url = self._url(path)
+        attempts = self._attempts(idempotent)
+        for attempt in range(attempts):
+            trial = self._check_breaker()
+            started = time.monotonic()
+            try:
+                try:
+                    response = await self._send(method, url, **kwargs)
+                except _GatewayError as exc:
+                    delay = self._on_failure(operation, exc, started, attempt, attempts)
+                else:
+                    self._on_success(operation, started)
+                    return response
+            finally:
+                if trial:
+                    # Also covers CancelledError (client went away) and unexpected errors
+                    self.breaker.abort_trial()  # No-op once the outcome was recorded
+            await asyncio.sleep(delay)
+        raise LahzaAPIError("Lahza request failed")  # pragma: no cover - loop always returns or raises
+
+    async def aclose(self) -> None:
+        await self.http.aclose()
+
+
+_client: Optional[LahzaClient] = None
+_client_lock = threading.Lock()
+_breaker: Optional[CircuitBreaker] = None
+_stats = _ClientStats()
+# httpx connections belong to the event loop that opened them: one async client per loop
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncLahzaClient]" = weakref.WeakKeyDictionary()
+
+
+def _client_options() -> Dict[str, Any]:
+    global _breaker
+    if _breaker is None:
+        _breaker = CircuitBreaker(
+            failure_threshold=getattr(settings, "LAHZA_BREAKER_THRESHOLD", 5),
+            reset_timeout=getattr(settings, "LAHZA_BREAKER_RESET_SECONDS", 30.0),
+        )
+    return {
+        "base_url": _base_url(),
+        "connect_timeout": getattr(settings, "LAHZA_CONNECT_TIMEOUT", 3.05),
+        "read_timeout": getattr(settings, "LAHZA_READ_TIMEOUT", 15.0),
+        "pool_size": getattr(settings, "LAHZA_POOL_SIZE", 10),
+        "verify_retries": getattr(settings, "LAHZA_VERIFY_RETRIES", 2),
+        "breaker": _breaker,
+        "stats": _stats,
+    }
+
+
+def get_client() -> LahzaClient:
+    """Shared client for this process, built from the ``LAHZA_*`` settings."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = LahzaClient(**_client_options())
+    return _client
+
+
+def get_async_client() -> AsyncLahzaClient:
+    """Shared async client for the running event loop (one per daphne worker)."""
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        with _client_lock:
+            client = _async_clients.get(loop)
+            if client is None:
+                client = _async_clients[loop] = AsyncLahzaClient(**_client_options())
+    return client
+
+
 def _base_url() -> str:
     return getattr(settings, "LAHZA_BASE_URL", "https://api.lahza.io").rstrip("/")
 
@@ -31,7 +411,7 @@ def _headers() -> Dict[str, str]:
     }
 
 
-def initialize_transaction(
+def _initialize_payload(
     *,
     email: str,
     amount_minor: int,
@@ -43,18 +423,6 @@ def initialize_transaction(
     metadata: Optional[Dict[str, Any]] = None,
     callback_url: Optional[str] = None,
 ) -> Dict[str, Any]:
-    """
-    Initialize a Lahza transaction and return the response payload.
-
-    According to the Lahza integration guide, we must:
-    - Send the amount in the lowest currency unit (multiply by 100).
-    - Provide identifying customer information (email/mobile).
-    - Optionally include metadata and callback URL.
-
-    Reference: https://docs.lahza.io/payments/accept-payments
-    """
-    url = f"{_base_url()}/transaction/initialize"
-
     payload: Dict[str, Any] = {
         "email": email,
         "amount": amount_minor,
@@ -73,63 +441,81 @@ def initialize_transaction(
         payload["metadata"] = metadata
     if callback_url:
         payload["callback_url"] = callback_url
+    return payload
 
-    logger.info("[Lahza] Initializing transaction for %s reference=%s", email, reference)
-
-    try:
-        response = requests.post(url, json=payload, headers=_headers(), timeout=30)
-    except requests.RequestException as exc:
-        logger.exception("[Lahza] Network error during initialize_transaction")
-        raise LahzaAPIError(str(exc)) from exc
 
+def _response_data(response, kind: str) -> Dict[str, Any]:
+    """Decode a ``requests``/``httpx`` response; raise ``LahzaAPIError`` unless Lahza reports success."""
     try:
         data = response.json()
     except ValueError as exc:
-        logger.error("[Lahza] Non-JSON response: %s", response.text)
+        logger.error("[Lahza] Non-JSON %s response: %s", kind, response.text)
         raise LahzaAPIError("Invalid response from Lahza") from exc
 
-    if not response.ok or not data.get("status"):
-        message = data.get("message") or "Failed to initialize Lahza transaction"
-        logger.error("[Lahza] Initialization failed: %s", message)
+    # According to Lahza docs: https://docs.lahza.io/payments/verify-payments
+    # The API response has 'status' (API call status) and 'data.status' (transaction status)
+    if response.status_code >= 400 or not data.get("status"):
+        message = data.get("message") or f"Failed to {kind} Lahza transaction"
+        logger.error("[Lahza] %s failed: %s", kind.capitalize(), message)
         raise LahzaAPIError(message)
 
-    logger.info("[Lahza] Transaction initialized reference=%s", data.get("data", {}).get("reference"))
+    # The transaction details (and the transaction status) are in 'data'
     return data.get("data") or data
 
 
+def initialize_transaction(**kwargs) -> Dict[str, Any]:
+    """
+    Initialize a Lahza transaction and return the response payload.
+
+    Takes ``email``, ``amount_minor`` and optionally ``currency``, ``reference``,
+    ``mobile``, ``first_name``, ``last_name``, ``metadata`` and ``callback_url``.
+    According to the Lahza integration guide, we must:
+    - Send the amount in the lowest currency unit (multiply by 100).
+    - Provide identifying customer information (email/mobile).
+    - Optionally include metadata and callback URL.
+
+    Reference: https://docs.lahza.io/payments/accept-payments
+    """
+    payload = _initialize_payload(**kwargs)
+    logger.info("[Lahza] Initializing transaction for %s reference=%s", payload["email"], payload.get("ref"))
+    # Not retried: a repeated initialize could create a second transaction
+    response = get_client().request("initialize", "POST", "transaction/initialize", json=payload, headers=_headers())
+    data = _response_data(response, "initialize")
+    logger.info("[Lahza] Transaction initialized reference=%s", data.get("reference"))
+    return data
+
+
+async def ainitialize_transaction(**kwargs) -> Dict[str, Any]:
+    """Async ``initialize_transaction``, through ``get_async_client()``."""
+    payload = _initialize_payload(**kwargs)
+    logger.info("[Lahza] Initializing transaction for %s reference=%s", payload["email"], payload.get("ref"))
+    response = await get_async_client().request(
+        "initialize", "POST", "transaction/initialize", json=payload, headers=_headers(),
+    )
+    data = _response_data(response, "initialize")
+    logger.info("[Lahza] Transaction initialized reference=%s", data.get("reference"))
+    return data
+
+
 def verify_transaction(reference: str) -> Dict[str, Any]:
     """
     Verify a Lahza transaction by reference.
 
     Reference: https://docs.lahza.io/payments/accept-payments (Verify Transaction section)
     """
-    url = f"{_base_url()}/transaction/verify/{reference}"
     logger.info("[Lahza] Verifying transaction reference=%s", reference)
+    response = get_client().request("verify", "GET", f"transaction/verify/{reference}", idempotent=True, headers=_headers())
+    transaction_data = _response_data(response, "verify")
+    logger.info("[Lahza] Verification success reference=%s transaction_status=%s", reference, transaction_data.get("status", ""))
+    return transaction_data
 
-    try:
-        response = requests.get(url, headers=_headers(), timeout=30)
-    except requests.RequestException as exc:
-        logger.exception("[Lahza] Network error during verify_transaction")
-        raise LahzaAPIError(str(exc)) from exc
-
-    try:
-        data = response.json()
-    except ValueError as exc:
-        logger.error("[Lahza] Non-JSON verification response: %s", response.text)
-        raise LahzaAPIError("Invalid response from Lahza") from exc
-
-    # According to Lahza docs: https://docs.lahza.io/payments/verify-payments
-    # The API response has 'status' (API call status) and 'data.status' (transaction status)
-    # We need to check 'data.status' for the actual transaction status
-    if not response.ok or not data.get("status"):
-        message = data.get("message") or "Failed to verify Lahza transaction"
-        logger.error("[Lahza] Verification failed: %s", message)
-        raise LahzaAPIError(message)
 
-    # Return the data object which contains the transaction details
-    # The transaction status is in data.status, not the API response status
-    transaction_data = data.get("data") or data
-    transaction_status = transaction_data.get("status", "")
-    logger.info("[Lahza] Verification success reference=%s transaction_status=%s", reference, transaction_status)
+async def averify_transaction(reference: str) -> Dict[str, Any]:
+    """Async ``verify_transaction``, through ``get_async_client()``."""
+    logger.info("[Lahza] Verifying transaction reference=%s", reference)
+    response = await get_async_client().request(
+        "verify", "GET", f"transaction/verify/{reference}", idempotent=True, headers=_headers(),
+    )
+    transaction_data = _response_data(response, "verify")
+    logger.info("[Lahza] Verification success reference=%s transaction_status=%s", reference, transaction_data.get("status", ""))
     return transaction_data
-
@@ -0,0 +1,62 @@
+"""
+Cache helpers for the landing page context.
+
+The resolved hero/featured/testimonial video set is stored per template and host
+under a version number. Saving or deleting a ``Video`` or ``LandingPage`` bumps
+the version (see ``videos/signals.py`` and ``contacts/signals.py``), so stale
+entries are simply never read again and expire on their own.
+"""
+from __future__ import annotations
+
+import logging
+import time
+from typing import Any, Callable, Dict
+
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+LANDING_VERSION_KEY = "landing:version"
+
+
+def _timeout() -> int:
+    return getattr(settings, "LANDING_CONTEXT_CACHE_TIMEOUT", 300)
+
+
+def get_landing_version() -> int:
+    """Return the current landing content version, initializing it if needed."""
+    version = cache.get(LANDING_VERSION_KEY)
+    if version is None:
+        # Seed with a timestamp so an evicted counter never reuses an old version
+        cache.add(LANDING_VERSION_KEY, int(time.time() * 1000), timeout=None)
+        version = cache.get(LANDING_VERSION_KEY) or int(time.time() * 1000)
+    return version
+
+
+def bump_landing_version() -> None:
+    """Invalidate every cached landing context."""
+    try:
+        cache.incr(LANDING_VERSION_KEY)
+    except ValueError:
+        cache.set(LANDING_VERSION_KEY, int(time.time() * 1000), timeout=None)
+    logger.info("[Landing Cache] Version bumped, cached landing context invalidated")
+
+
+def get_landing_videos(request, template_name: str, loader: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Return the resolved video set for ``template_name``, calling ``loader`` on a miss.
+
+    Serialized videos contain absolute URLs, so the scheme and host are part of the key.
+    """
+    key = "landing:videos:%s:%s:%s://%s" % (
+        get_landing_version(),
+        template_name,
+        request.scheme,
+        request.get_host(),
+    )
+    videos = cache.get(key)
+    if videos is None:
+        videos = loader()
+        cache.set(key, videos, _timeout())
+    return videos
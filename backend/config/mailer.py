@@ -0,0 +1,126 @@
+"""
+SMTP connection reuse for transactional email.
+
+``EmailMessage.send()`` opens a connection (TCP, STARTTLS, AUTH) per message
+and closes it again, and the receipt's retry without the PDF opened a second
+one. ``PooledMailer`` keeps one connection of the configured ``EMAIL_BACKEND``
+open across a batch of messages:
+
+- it reconnects after ``EMAIL_POOL_MAX_MESSAGES`` messages and when the
+  connection sat idle for ``EMAIL_POOL_IDLE_SECONDS`` (servers drop idle
+  clients, Gmail within a few minutes);
+- a message that fails because a reused connection was dropped is retried
+  once on a fresh one; other SMTP errors are raised as before.
+
+``pool`` hands a mailer to each outbox sender thread and keeps them open
+between rows; ``contacts.outbox.process_due`` closes them when the queue is
+drained. ``python manage.py resend_receipts`` sends a whole selection through
+one ``PooledMailer``.
+"""
+from __future__ import annotations
+
+import logging
+import smtplib
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, List, Optional
+
+from django.conf import settings
+from django.core.mail import get_connection
+
+logger = logging.getLogger(__name__)
+
+# Raised by a connection the server closed in the meantime
+RECONNECT_ERRORS = (smtplib.SMTPServerDisconnected, ConnectionError, TimeoutError)
+
+
+class PooledMailer:
+    """One mail backend connection reused across messages (``with PooledMailer() as mailer``)."""
+
+    def __init__(self, *, max_messages: Optional[int] = None, idle_seconds: Optional[float] = None):
+        self.max_messages = max_messages or getattr(settings, 'EMAIL_POOL_MAX_MESSAGES', 100)
+        self.idle_seconds = idle_seconds if idle_seconds is not None else getattr(settings, 'EMAIL_POOL_IDLE_SECONDS', 60)
+        self.connections_opened = 0
+        self.messages_sent = 0
+        self._connection = None
+        self._sent_on_connection = 0
+        self._last_used = 0.0
+
+    def __enter__(self) -> 'PooledMailer':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _open(self):
+        if self._connection is not None and (
+            self._sent_on_connection >= self.max_messages
+            or time.monotonic() - self._last_used > self.idle_seconds
+        ):
+            self.close()
+        if self._connection is None:
+            connection = get_connection(fail_silently=False)
+            connection.open()
+            self._connection = connection
+            self._sent_on_connection = 0
+            self.connections_opened += 1
+        return self._connection
+
+    def send(self, message) -> int:
+        """Send ``message`` over the shared connection; returns the number of messages sent."""
+        while True:
+            connection = self._open()
+            reused = self._sent_on_connection > 0
+            try:
+                sent = connection.send_messages([message])
+            except RECONNECT_ERRORS as exc:
+                self.close()
+                if not reused:
+                    raise
+                logger.info("[Mailer] Connection dropped after %d message(s), reconnecting: %s", self._sent_on_connection, exc)
+                continue
+            self._sent_on_connection += 1
+            self._last_used = time.monotonic()
+            self.messages_sent += sent
+            return sent
+
+    def close(self) -> None:
+        if self._connection is not None:
+            connection, self._connection = self._connection, None
+            try:
+                connection.close()
+            except Exception as exc:
+                logger.debug("[Mailer] Error closing connection: %s", exc)
+
+
+class MailerPool:
+    """Idle ``PooledMailer``s handed out to concurrent senders, one per thread at a time."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._idle: List[PooledMailer] = []
+
+    @contextmanager
+    def mailer(self) -> Iterator[PooledMailer]:
+        with self._lock:
+            mailer = self._idle.pop() if self._idle else PooledMailer()
+        try:
+            yield mailer
+        finally:
+            with self._lock:
+                self._idle.append(mailer)
+
+    def send(self, message) -> int:
+        with self.mailer() as mailer:
+            return mailer.send(message)
+
+    def close(self) -> None:
+        """Close the idle connections (mailers in use are closed by the next ``close()``)."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for mailer in idle:
+            mailer.close()
+
+
+pool = MailerPool()
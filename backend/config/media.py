@@ -0,0 +1,252 @@
+"""
+Serving of user-uploaded media (``/media/`` and ``/images/``).
+
+Drop-in replacement for ``django.views.static.serve`` that supports what video
+playback needs:
+
+- single ``Range`` requests answered with ``206 Partial Content`` (and
+  ``If-Range``), so seeking in a testimonial video doesn't re-download it;
+- ``ETag`` / ``Last-Modified`` validators, ``304`` responses and a public
+  ``Cache-Control``;
+- full-file responses through ``FileResponse`` (``wsgi.file_wrapper``/sendfile
+  when the server provides it) and ranges streamed in fixed-size chunks.
+
+``content_response`` gives in-memory content (``config.assets``) the same
+validators and range handling.
+
+With ``MEDIA_OFFLOAD`` set to ``'x-accel-redirect'`` or ``'x-sendfile'`` the
+view only resolves and validates the path, and the front server (Caddy, nginx,
+Apache) performs the transfer itself, ranges included.
+"""
+from __future__ import annotations
+
+import logging
+import mimetypes
+import os
+import re
+from pathlib import Path
+from typing import Iterator, Optional, Tuple
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import content_disposition_header, http_date, parse_http_date_safe
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+# HLS renditions (videos/transcoding.py); not known to every platform's mimetypes table
+mimetypes.add_type('application/vnd.apple.mpegurl', '.m3u8')
+mimetypes.add_type('video/mp2t', '.ts')
+
+
+def _etag(stat: os.stat_result) -> str:
+    return f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+
+
+def _parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Return the inclusive ``(start, end)`` of a single byte range.
+
+    Raises ``ValueError`` for unsatisfiable ranges; returns ``None`` when the
+    header should be ignored (malformed or multiple ranges), which means
+    sending the whole file.
+    """
+    match = RANGE_RE.match(header.strip())
+    if not match:
+        return None
+    start, end = match.groups()
+    if not start and not end:
+        return None
+    if not start:
+        # Suffix range: the last N bytes
+        length = int(end)
+        if length == 0:
+            raise ValueError('empty suffix range')
+        return max(size - length, 0), size - 1
+    start = int(start)
+    end = int(end) if end else size - 1
+    if start >= size or start > end:
+        raise ValueError('range not satisfiable')
+    return start, min(end, size - 1)
+
+
+def _if_range_matches(request, etag: str, mtime: float) -> bool:
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if not if_range:
+        return True
+    if if_range.startswith(('"', 'W/')):
+        return if_range == etag
+    if_range_date = parse_http_date_safe(if_range)
+    return if_range_date is not None and if_range_date >= int(mtime)
+
+
+def _read_range(path: Path, start: int, end: int) -> Iterator[bytes]:
+    with open(path, 'rb') as f:
+        f.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = f.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def _iter_chunks(content: bytes, start: int, end: int) -> Iterator[bytes]:
+    view = memoryview(content)
+    for offset in range(start, end + 1, CHUNK_SIZE):
+        yield bytes(view[offset:min(offset + CHUNK_SIZE, end + 1)])
+
+
+def _offload_headers(response, fullpath: Path, relative_path: Optional[str]) -> bool:
+    mode = (getattr(settings, 'MEDIA_OFFLOAD', '') or '').lower()
+    if mode == 'x-accel-redirect' and relative_path is not None:
+        prefix = getattr(settings, 'MEDIA_OFFLOAD_PREFIX', '/protected-media/')
+        response['X-Accel-Redirect'] = prefix.rstrip('/') + '/' + quote(relative_path)
+        return True
+    if mode == 'x-sendfile':
+        response['X-Sendfile'] = str(fullpath)
+        return True
+    return False
+
+
+def file_response(request, fullpath, *, relative_path: Optional[str] = None, cache_control: Optional[dict] = None):
+    """
+    Build a conditional, range-aware response for the file at ``fullpath``.
+
+    ``relative_path`` is the path below the media root; it is only needed for
+    ``X-Accel-Redirect`` offloading.
+    """
+    fullpath = Path(fullpath)
+    try:
+        stat = fullpath.stat()
+    except FileNotFoundError:
+        raise Http404('File not found')
+    if not fullpath.is_file():
+        raise Http404('Directory indexes are not allowed here.')
+
+    etag = _etag(stat)
+    content_type, encoding = mimetypes.guess_type(str(fullpath))
+    content_type = content_type or 'application/octet-stream'
+
+    def finalize(response):
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(stat.st_mtime)
+        response['Accept-Ranges'] = 'bytes'
+        patch_cache_control(response, **(cache_control or {
+            'public': True,
+            'max_age': getattr(settings, 'MEDIA_CACHE_MAX_AGE', 86400),
+        }))
+        return response
+
+    not_modified = get_conditional_response(request, etag=etag, last_modified=int(stat.st_mtime))
+    if not_modified is not None:
+        return finalize(not_modified)
+
+    offloaded = HttpResponse(content_type=content_type)
+    if _offload_headers(offloaded, fullpath, relative_path):
+        # The front server answers Range/If-Range itself from the real file
+        if encoding:
+            offloaded['Content-Encoding'] = encoding
+        return finalize(offloaded)
+
+    byte_range = None
+    range_header = request.META.get('HTTP_RANGE')
+    if range_header and _if_range_matches(request, etag, stat.st_mtime):
+        try:
+            byte_range = _parse_range(range_header, stat.st_size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{stat.st_size}'
+            return finalize(response)
+
+    if byte_range is None:
+        if request.method == 'HEAD':
+            response = HttpResponse(content_type=content_type)
+        else:
+            response = FileResponse(open(fullpath, 'rb'), content_type=content_type)
+        response['Content-Length'] = str(stat.st_size)
+    else:
+        start, end = byte_range
+        if request.method == 'HEAD':
+            response = HttpResponse(status=206, content_type=content_type)
+        else:
+            response = StreamingHttpResponse(_read_range(fullpath, start, end), status=206, content_type=content_type)
+        response['Content-Range'] = f'bytes {start}-{end}/{stat.st_size}'
+        response['Content-Length'] = str(end - start + 1)
+
+    if encoding:
+        response['Content-Encoding'] = encoding
+    return finalize(response)
+
+
+def content_response(
+    request,
+    content: bytes,
+    *,
+    etag: str,
+    last_modified: float,
+    content_type: str,
+    filename: Optional[str] = None,
+    as_attachment: bool = True,
+    cache_control: Optional[dict] = None,
+):
+    """
+    Like ``file_response`` for ``content`` already in memory: ``304``s,
+    single ranges and the body streamed in ``CHUNK_SIZE`` pieces.
+    """
+    size = len(content)
+
+    def finalize(response):
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        response['Accept-Ranges'] = 'bytes'
+        if filename:
+            response['Content-Disposition'] = content_disposition_header(as_attachment, filename)
+        patch_cache_control(response, **(cache_control or {
+            'public': True,
+            'max_age': getattr(settings, 'MEDIA_CACHE_MAX_AGE', 86400),
+        }))
+        return response
+
+    not_modified = get_conditional_response(request, etag=etag, last_modified=int(last_modified))
+    if not_modified is not None:
+        return finalize(not_modified)
+
+    start, end, status = 0, size - 1, 200
+    range_header = request.META.get('HTTP_RANGE')
+    if range_header and _if_range_matches(request, etag, last_modified):
+        try:
+            byte_range = _parse_range(range_header, size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return finalize(response)
+        if byte_range is not None:
+            (start, end), status = byte_range, 206
+
+    if request.method == 'HEAD':
+        response = HttpResponse(status=status, content_type=content_type)
+    else:
+        response = StreamingHttpResponse(_iter_chunks(content, start, end), status=status, content_type=content_type)
+    if status == 206:
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    response['Content-Length'] = str(end - start + 1)
+    return finalize(response)
+
+
+def serve(request, path, document_root=None, show_indexes=False):
+    """Serve ``path`` from ``document_root``; same signature as ``django.views.static.serve``."""
+    path = path.lstrip('/')
+    try:
+        fullpath = Path(safe_join(document_root, path))
+    except SuspiciousFileOperation:
+        raise Http404('File not found')
+    return file_response(request, fullpath, relative_path=path)
@@ -0,0 +1,40 @@
+"""
+Project middleware.
+
+``AsyncWhiteNoiseMiddleware`` is WhiteNoise's middleware made async-capable.
+WhiteNoise 6.6 only ships a sync middleware; being near the top of
+``MIDDLEWARE`` it forced Django to run every request, async views included,
+through a worker thread. This version keeps the whole chain on the event loop
+under daphne, so the async payment views really wait on Lahza without holding a
+thread.
+"""
+from __future__ import annotations
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+
+class AsyncWhiteNoiseMiddleware(WhiteNoiseMiddleware):
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, *args, **kwargs):
+        super().__init__(get_response, *args, **kwargs)
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = self.find_file(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            # Only stats/opens the file; the body is streamed by the server
+            return self.serve(static_file, request)
+        return await self.get_response(request)
@@ -0,0 +1,155 @@
+"""
+Full-page cache for anonymous landing page traffic.
+
+Landing pages render identically for every anonymous visitor of the same URL,
+so the rendered response is stored in the cache together with the landing
+content version (see ``config.landing_cache``). Entries are served:
+
+- fresh while younger than ``PAGE_CACHE_TIMEOUT`` and on the current version;
+- stale otherwise, while a single request (holding a short lock) re-renders the
+  page, so an ad-driven spike or an admin edit never stampedes the workers;
+- on a cold miss (nothing cached yet, e.g. after a restart or eviction) the
+  same lock lets one request render while the others wait up to
+  ``PAGE_CACHE_LOCK_WAIT`` seconds for its entry before rendering themselves.
+
+Only the query parameters a view actually reads are part of the key, so
+``utm_*``/``fbclid`` tracking parameters don't fragment the cache.
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+import time
+from functools import wraps
+from typing import Iterable
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.middleware.csrf import get_token
+
+from .landing_cache import get_landing_version
+
+logger = logging.getLogger(__name__)
+
+# Headers that are safe to replay to another visitor
+CACHED_HEADERS = ('Content-Type', 'Content-Language', 'X-Frame-Options')
+
+
+def _fresh_timeout() -> int:
+    return getattr(settings, 'PAGE_CACHE_TIMEOUT', 60)
+
+
+def _stale_timeout() -> int:
+    return getattr(settings, 'PAGE_CACHE_STALE_TIMEOUT', 600)
+
+
+def _lock_wait() -> float:
+    return getattr(settings, 'PAGE_CACHE_LOCK_WAIT', 5)
+
+
+def _wait_for_entry(key):
+    deadline = time.monotonic() + _lock_wait()
+    while time.monotonic() < deadline:
+        time.sleep(0.05)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry
+    return None
+
+
+def _cache_key(request, query_params: Iterable[str], view_kwargs) -> str:
+    params = '&'.join(f'{name}={request.GET.get(name, "")}' for name in query_params)
+    kwargs = '&'.join(f'{k}={v}' for k, v in sorted(view_kwargs.items()))
+    raw = f'{request.scheme}://{request.get_host()}{request.path}?{params}#{kwargs}'
+    return 'page:' + hashlib.md5(raw.encode('utf-8')).hexdigest()
+
+
+def _is_cacheable_request(request) -> bool:
+    if request.method not in ('GET', 'HEAD'):
+        return False
+    user = getattr(request, 'user', None)
+    return not (user is not None and user.is_authenticated)
+
+
+def _is_cacheable_response(response) -> bool:
+    if response.status_code != 200 or getattr(response, 'streaming', False):
+        return False
+    cache_control = response.get('Cache-Control', '')
+    return 'private' not in cache_control and 'no-store' not in cache_control
+
+
+def _build_response(entry, state: str) -> HttpResponse:
+    response = HttpResponse(entry['content'], status=entry['status'])
+    for header, value in entry['headers'].items():
+        response[header] = value
+    response['X-Page-Cache'] = state
+    return response
+
+
+def _render_and_store(view_func, request, key, version, args, kwargs):
+    response = view_func(request, *args, **kwargs)
+    if hasattr(response, 'render') and callable(response.render):
+        response = response.render()
+    if _is_cacheable_response(response):
+        entry = {
+            'content': response.content,
+            'status': response.status_code,
+            'headers': {h: response[h] for h in CACHED_HEADERS if response.has_header(h)},
+            'uses_csrf': bool(request.META.get('CSRF_COOKIE_NEEDS_UPDATE')),
+            'version': version,
+            'created': time.time(),
+        }
+        cache.set(key, entry, _fresh_timeout() + _stale_timeout())
+    response['X-Page-Cache'] = 'MISS'
+    return response
+
+
+def cache_landing_page(view_func=None, *, query_params: Iterable[str] = ()):
+    """
+    Cache the rendered page for anonymous visitors with stale-while-revalidate.
+
+    ``query_params`` lists the GET parameters the view reads; all others are ignored.
+    """
+    query_params = tuple(query_params)
+
+    def decorator(func):
+        @wraps(func)
+        def _wrapped_view(request, *args, **kwargs):
+            if not getattr(settings, 'PAGE_CACHE_ENABLED', True) or not _is_cacheable_request(request):
+                return func(request, *args, **kwargs)
+
+            key = _cache_key(request, query_params, kwargs)
+            version = get_landing_version()
+            entry = cache.get(key)
+
+            if entry is None:
+                # Cold miss: one request renders while the others wait for its entry
+                if not cache.add(f'{key}:lock', 1, 30):
+                    entry = _wait_for_entry(key)
+                if entry is None:
+                    try:
+                        return _render_and_store(func, request, key, version, args, kwargs)
+                    finally:
+                        cache.delete(f'{key}:lock')
+
+            is_fresh = (
+                entry['version'] == version
+                and time.time() - entry['created'] < _fresh_timeout()
+            )
+            # Exactly one request re-renders a stale page; everyone else gets the stale copy
+            if is_fresh or not cache.add(f'{key}:lock', 1, 30):
+                # Forms on these pages post to csrf-exempt endpoints, but keep handing out
+                # the CSRF cookie like a normal render would
+                if entry['uses_csrf']:
+                    get_token(request)
+                return _build_response(entry, 'HIT' if is_fresh else 'STALE')
+            try:
+                return _render_and_store(func, request, key, version, args, kwargs)
+            finally:
+                cache.delete(f'{key}:lock')
+        return _wrapped_view
+
+    if view_func is not None:
+        return decorator(view_func)
+    return decorator
@@ -0,0 +1,197 @@
+"""
+Responsive derivatives of the landing page images.
+
+During ``collectstatic`` (see ``config.storage``) every PNG/JPEG under
+``RESPONSIVE_IMAGE_DIRS`` is re-encoded to AVIF (when Pillow supports it) and
+WebP at each of ``RESPONSIVE_IMAGE_WIDTHS`` narrower than the original, next to
+the source file::
+
+    new_assets/56dd16b6....png -> new_assets/56dd16b6....640w.webp, ....640w.avif, ...
+
+The derivatives are listed in ``responsive-images.json`` in ``STATIC_ROOT``,
+which the ``{% responsive_image %}`` template tag reads to emit ``<picture>``
+sources with ``srcset``/``sizes``. Sources are fingerprinted, so unchanged
+images are not re-encoded on the next deploy.
+"""
+from __future__ import annotations
+
+import hashlib
+import io
+import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = 'responsive-images.json'
+MANIFEST_VERSION = 1
+
+SOURCE_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+
+# Format name -> (MIME type, Pillow save options)
+FORMATS = {
+    'avif': ('image/avif', {'quality': 50, 'speed': 6}),
+    'webp': ('image/webp', {'quality': 80, 'method': 6}),
+}
+
+try:  # AVIF support for Pillow < 11.3
+    import pillow_avif  # noqa: F401
+except ImportError:
+    pass
+
+
+def configured_dirs() -> List[str]:
+    return list(getattr(settings, 'RESPONSIVE_IMAGE_DIRS', []))
+
+
+def configured_widths() -> List[int]:
+    return sorted(getattr(settings, 'RESPONSIVE_IMAGE_WIDTHS', [320, 640, 960, 1280, 1920]))
+
+
+def supported_formats() -> List[str]:
+    from PIL import features
+
+    formats = []
+    for name in getattr(settings, 'RESPONSIVE_IMAGE_FORMATS', ['avif', 'webp']):
+        try:
+            if name in FORMATS and features.check(name):
+                formats.append(name)
+        except ValueError:
+            pass
+    return formats
+
+
+def is_source_image(name: str) -> bool:
+    """Whether ``name`` (a static path) should get derivatives."""
+    if not name.lower().endswith(SOURCE_EXTENSIONS):
+        return False
+    return any(name.startswith(directory.rstrip('/') + '/') for directory in configured_dirs())
+
+
+def derivative_name(name: str, width: int, fmt: str) -> str:
+    stem, _ext = os.path.splitext(name)
+    return f'{stem}.{width}w.{fmt}'
+
+
+def _target_widths(original_width: int) -> List[int]:
+    widths = [w for w in configured_widths() if w < original_width]
+    if original_width <= max(configured_widths(), default=0) or not widths:
+        # Full-width re-encode, except for oversized originals that no layout needs
+        widths.append(original_width)
+    return widths
+
+
+def _encode(image, width: int, fmt: str) -> bytes:
+    from PIL import Image
+
+    if width < image.width:
+        height = round(image.height * width / image.width)
+        image = image.resize((width, height), Image.LANCZOS)
+    buffer = io.BytesIO()
+    image.save(buffer, format=fmt.upper(), **FORMATS[fmt][1])
+    return buffer.getvalue()
+
+
+def _build_entry(storage, name: str, data: bytes, formats: List[str]) -> Dict[str, Any]:
+    from PIL import Image
+
+    with Image.open(io.BytesIO(data)) as source:
+        source.load()
+        image = source if source.mode in ('RGB', 'RGBA') else source.convert('RGBA' if 'A' in source.getbands() else 'RGB')
+        widths = _target_widths(image.width)
+        sources: Dict[str, List[Tuple[str, int]]] = {}
+        for fmt in formats:
+            variants = []
+            for width in widths:
+                target = derivative_name(name, width, fmt)
+                if storage.exists(target):
+                    storage.delete(target)
+                storage.save(target, ContentFile(_encode(image, width, fmt)))
+                variants.append((target, width))
+            sources[FORMATS[fmt][0]] = variants
+        return {
+            'hash': hashlib.sha1(data).hexdigest(),
+            'width': image.width,
+            'height': image.height,
+            'sources': sources,
+        }
+
+
+def load_manifest(storage) -> Dict[str, Any]:
+    try:
+        with storage.open(MANIFEST_NAME) as f:
+            manifest = json.loads(f.read().decode('utf-8'))
+    except (OSError, ValueError):
+        return {}
+    if manifest.get('version') != MANIFEST_VERSION:
+        return {}
+    return manifest.get('images', {})
+
+
+def generate(storage, names: Iterable[str]) -> Dict[str, Any]:
+    """
+    Create the derivatives for ``names`` in ``storage`` and write the manifest.
+
+    Returns the manifest entries; images whose content did not change since the
+    previous run keep their existing derivatives.
+    """
+    previous = load_manifest(storage)
+    formats = supported_formats()
+    if not formats:
+        logger.warning("[Responsive Images] Pillow supports neither AVIF nor WebP, skipping derivatives")
+        return {}
+
+    def process(name: str) -> Tuple[str, Optional[Dict[str, Any]], bool]:
+        with storage.open(name) as f:
+            data = f.read()
+        entry = previous.get(name)
+        formats_done = set(entry['sources']) if entry else set()
+        if (
+            entry
+            and entry['hash'] == hashlib.sha1(data).hexdigest()
+            and formats_done == {FORMATS[fmt][0] for fmt in formats}
+            and all(storage.exists(target) for variants in entry['sources'].values() for target, _ in variants)
+        ):
+            return name, entry, False
+        try:
+            return name, _build_entry(storage, name, data, formats), True
+        except Exception as exc:
+            logger.warning("[Responsive Images] Could not process %s: %s", name, exc)
+            return name, None, False
+
+    images: Dict[str, Any] = {}
+    encoded = 0
+    with ThreadPoolExecutor(max_workers=os.cpu_count() or 2) as executor:
+        for name, entry, was_encoded in executor.map(process, sorted(set(names))):
+            if entry is not None:
+                images[name] = entry
+                encoded += was_encoded
+
+    if storage.exists(MANIFEST_NAME):
+        storage.delete(MANIFEST_NAME)
+    payload = json.dumps({'version': MANIFEST_VERSION, 'images': images}, indent=2, sort_keys=True)
+    storage.save(MANIFEST_NAME, ContentFile(payload.encode('utf-8')))
+    logger.info("[Responsive Images] %d image(s) indexed, %d re-encoded", len(images), encoded)
+    return images
+
+
+_state: Dict[str, Any] = {'images': None, 'mtime': None}
+
+
+def get_entry(name: str) -> Optional[Dict[str, Any]]:
+    """Manifest entry for the static path ``name``, reloaded when ``collectstatic`` rewrites it."""
+    from django.contrib.staticfiles.storage import staticfiles_storage
+
+    try:
+        mtime = os.path.getmtime(staticfiles_storage.path(MANIFEST_NAME))
+    except (OSError, NotImplementedError):
+        return None
+    if _state['mtime'] != mtime:
+        _state['images'] = load_manifest(staticfiles_storage)
+        _state['mtime'] = mtime
+    return _state['images'].get(name)
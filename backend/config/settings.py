@@ -12,6 +12,9 @@ https://docs.djangoproject.com/en/4.2/ref/settings/
 
 from pathlib import Path
 import os
+import tempfile
+
+from corsheaders.defaults import default_headers
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -57,7 +60,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',  # Serve static files in production
+    'config.middleware.AsyncWhiteNoiseMiddleware',  # Serve static files in production (async-capable WhiteNoise)
     'corsheaders.middleware.CorsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -84,6 +87,9 @@ TEMPLATES = [
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
             ],
+            'libraries': {
+                'responsive_images': 'config.templatetags.responsive_images',
+            },
         },
     },
 ]
@@ -98,6 +104,9 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite4',
+        # SQLite has one writer at a time: wait for the lock instead of failing with "database is locked".
+        # The email outbox and webhook inbox have a single claimer on SQLite (contacts/work_queue.py).
+        'OPTIONS': {'timeout': int(os.getenv('SQLITE_TIMEOUT', 20))},
     }
 }
 
@@ -143,15 +152,135 @@ STATICFILES_DIRS = [
 ]
 PROJECT_PATH = os.path.join(BASE_DIR, 'staticfiles')
 # WhiteNoise configuration for serving static files
-STATICFILES_STORAGE = 'whitenoise.storage.CompressedStaticFilesStorage'
+# WhiteNoise compression (gzip + brotli) plus responsive AVIF/WebP derivatives of landing images (config/storage.py).
+# Hashed mode: {% static %} emits content-hashed names from staticfiles.json, served with Cache-Control: immutable;
+# collectstatic must run on every deploy. STATIC_HASHED=False falls back to plain names.
+STATIC_HASHED = os.getenv('STATIC_HASHED', 'True').lower() == 'true'
+if STATIC_HASHED:
+    STATICFILES_STORAGE = 'config.storage.ResponsiveCompressedManifestStaticFilesStorage'
+else:
+    STATICFILES_STORAGE = 'config.storage.ResponsiveCompressedStaticFilesStorage'
+# Static directories whose PNG/JPEG images get responsive derivatives during collectstatic
+RESPONSIVE_IMAGE_DIRS = ['new_assets', 'new_pac', 'ramadan', 'web']
+RESPONSIVE_IMAGE_WIDTHS = [320, 640, 960, 1280, 1920]
+RESPONSIVE_IMAGE_FORMATS = ['avif', 'webp']  # AVIF only when Pillow supports it
 # In production (DEBUG=False), WhiteNoise serves from STATIC_ROOT (staticfiles/)
 # In development (DEBUG=True), set to True to auto-refresh when files change
 WHITENOISE_AUTOREFRESH = DEBUG  # Auto-refresh in development, disabled in production
 WHITENOISE_USE_FINDERS = DEBUG  # Use finders in development, disabled in production
 WHITENOISE_ROOT = None  # Don't serve root files
+# AVIF/WebP derivatives are already compressed; don't write .gz/.br copies of them
+WHITENOISE_SKIP_COMPRESS_EXTENSIONS = [
+    'jpg', 'jpeg', 'png', 'gif', 'webp', 'avif', 'zip', 'gz', 'tgz', 'bz2', 'tbz', 'xz', 'br', 'swf', 'flv',
+    'woff', 'woff2', '3gp', '3gpp', 'asf', 'avi', 'm4v', 'mov', 'mp4', 'mpeg', 'mpg', 'webm', 'wmv',
+]
 
 MEDIA_URL = 'media/'
 MEDIA_ROOT = BASE_DIR / 'media'
+# Index of MEDIA_ROOT/videos used as the landing page fallback (python manage.py build_video_manifest)
+VIDEO_MANIFEST_PATH = MEDIA_ROOT / 'video_manifest.json'
+VIDEO_MANIFEST_CHECK_INTERVAL = 30  # seconds between directory mtime checks
+
+# Adaptive HLS renditions of uploaded videos (python manage.py transcode_videos [--loop], needs ffmpeg/ffprobe)
+# Off: uploads are marked pending for the transcode-worker service instead of running ffmpeg inside a web worker
+HLS_TRANSCODE_ON_SAVE = os.getenv('HLS_TRANSCODE_ON_SAVE', 'False').lower() == 'true'
+HLS_TRANSCODE_TIMEOUT = int(os.getenv('HLS_TRANSCODE_TIMEOUT', 3600))  # seconds per video
+# hls.js for browsers without native HLS, loaded with Subresource Integrity; without HLS_JS_INTEGRITY
+# (openssl dgst -sha384 -binary hls.min.js | openssl base64 -A, prefixed 'sha384-') those browsers play the MP4
+HLS_JS_URL = os.getenv('HLS_JS_URL', 'https://cdn.jsdelivr.net/npm/hls.js@1.5.7/dist/hls.min.js')
+HLS_JS_INTEGRITY = os.getenv('HLS_JS_INTEGRITY', '')
+FFMPEG_BINARY = os.getenv('FFMPEG_BINARY', 'ffmpeg')
+FFPROBE_BINARY = os.getenv('FFPROBE_BINARY', 'ffprobe')
+
+# /media/ and /images/ responses (config/media.py): Range support, caching and front-server offload
+MEDIA_CACHE_MAX_AGE = int(os.environ.get('MEDIA_CACHE_MAX_AGE', 86400))
+# '' (stream from Django), 'x-accel-redirect' (nginx/Caddy) or 'x-sendfile' (Apache/lighttpd)
+MEDIA_OFFLOAD = os.environ.get('MEDIA_OFFLOAD', '')
+# Internal location the front server maps onto MEDIA_ROOT for X-Accel-Redirect
+MEDIA_OFFLOAD_PREFIX = os.environ.get('MEDIA_OFFLOAD_PREFIX', '/protected-media/')
+
+# Payment receipt outbox (contacts/outbox.py, python manage.py process_email_outbox --loop)
+EMAIL_OUTBOX_INLINE_WORKER = os.getenv('EMAIL_OUTBOX_INLINE_WORKER', 'True').lower() == 'true'  # send right after commit
+EMAIL_OUTBOX_CONCURRENCY = int(os.getenv('EMAIL_OUTBOX_CONCURRENCY', 4))  # parallel SMTP sends per worker
+EMAIL_OUTBOX_MAX_ATTEMPTS = int(os.getenv('EMAIL_OUTBOX_MAX_ATTEMPTS', 8))  # then dead-lettered
+EMAIL_OUTBOX_RETRY_BASE_SECONDS = int(os.getenv('EMAIL_OUTBOX_RETRY_BASE_SECONDS', 30))
+EMAIL_OUTBOX_RETRY_MAX_SECONDS = int(os.getenv('EMAIL_OUTBOX_RETRY_MAX_SECONDS', 3600))
+EMAIL_OUTBOX_LEASE_SECONDS = int(os.getenv('EMAIL_OUTBOX_LEASE_SECONDS', 300))  # a crashed worker's rows are retried after this
+
+# Reused SMTP connections (config/mailer.py) for the outbox and resend_receipts
+EMAIL_POOL_MAX_MESSAGES = int(os.getenv('EMAIL_POOL_MAX_MESSAGES', 100))  # then reconnect
+EMAIL_POOL_IDLE_SECONDS = int(os.getenv('EMAIL_POOL_IDLE_SECONDS', 60))  # reconnect instead of reusing a connection idle this long
+
+# Lahza webhook inbox (contacts/webhooks.py, python manage.py process_webhook_events --loop)
+WEBHOOK_INBOX_INLINE_WORKER = os.getenv('WEBHOOK_INBOX_INLINE_WORKER', 'True').lower() == 'true'  # process right after the ack
+WEBHOOK_INBOX_MAX_ATTEMPTS = int(os.getenv('WEBHOOK_INBOX_MAX_ATTEMPTS', 8))  # then dead-lettered
+WEBHOOK_INBOX_RETRY_BASE_SECONDS = int(os.getenv('WEBHOOK_INBOX_RETRY_BASE_SECONDS', 10))
+
+# Idempotent payment initialization (contacts/idempotency.py)
+PAYMENT_IDEMPOTENCY_TTL = int(os.getenv('PAYMENT_IDEMPOTENCY_TTL', 600))  # repeats within this get the original payment
+PAYMENT_IDEMPOTENCY_LOCK_SECONDS = int(os.getenv('PAYMENT_IDEMPOTENCY_LOCK_SECONDS', 30))  # repeats wait this long for the first request
+
+# Lahza verification single-flight (contacts/verification.py)
+PAYMENT_VERIFY_LOCK_SECONDS = int(os.getenv('PAYMENT_VERIFY_LOCK_SECONDS', 30))  # cross-worker lock; followers verify themselves after this
+PAYMENT_VERIFY_RESULT_TTL = int(os.getenv('PAYMENT_VERIFY_RESULT_TTL', 3))  # pending results, absorbs polling bursts
+PAYMENT_VERIFY_TERMINAL_TTL = int(os.getenv('PAYMENT_VERIFY_TERMINAL_TTL', 86400))  # paid/failed results
+
+# Pending payment reconciliation (python manage.py reconcile_payments)
+PAYMENT_RECONCILE_MIN_AGE_MINUTES = float(os.getenv('PAYMENT_RECONCILE_MIN_AGE_MINUTES', 15))  # leave recent ones to the webhook
+PAYMENT_RECONCILE_MAX_AGE_HOURS = float(os.getenv('PAYMENT_RECONCILE_MAX_AGE_HOURS', 72))
+PAYMENT_RECONCILE_CONCURRENCY = int(os.getenv('PAYMENT_RECONCILE_CONCURRENCY', 4))
+PAYMENT_RECONCILE_RATE = float(os.getenv('PAYMENT_RECONCILE_RATE', 5))  # Lahza verifications per second
+PAYMENT_RECONCILE_CHECKPOINT_FILE = os.getenv('PAYMENT_RECONCILE_CHECKPOINT_FILE', str(BASE_DIR / '.reconcile_payments.json'))
+
+# Payment status streams (contacts/payment_events.py), replacing checkout polling
+PAYMENT_EVENTS_CHECK_SECONDS = float(os.getenv('PAYMENT_EVENTS_CHECK_SECONDS', 2))  # cache check for events published by other processes
+PAYMENT_EVENTS_MAX_SECONDS = int(os.getenv('PAYMENT_EVENTS_MAX_SECONDS', 300))  # then the page verifies right away (it also verifies every 20s meanwhile)
+PAYMENT_EVENTS_CACHE_TTL = int(os.getenv('PAYMENT_EVENTS_CACHE_TTL', 600))
+PAYMENT_EVENTS_RETRY_MS = int(os.getenv('PAYMENT_EVENTS_RETRY_MS', 3000))  # EventSource reconnect delay
+
+# In-memory file assets such as the instructions PDF (config/assets.py)
+ASSET_RELOAD_CHECK_SECONDS = float(os.getenv('ASSET_RELOAD_CHECK_SECONDS', 2))  # how often the file is re-stat-ed for changes
+
+# ReportLab instructions PDFs rendered when the static file is missing (config/instructions_pdf.py); '' disables the disk cache
+# Outside the source tree and MEDIA_ROOT: the files carry customer order references
+INSTRUCTIONS_PDF_CACHE_DIR = os.getenv('INSTRUCTIONS_PDF_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'fxglobals', 'instructions_pdf'))
+
+# Short code map of active landing pages (contacts/short_codes.py)
+SHORT_CODE_MAP_TIMEOUT = int(os.getenv('SHORT_CODE_MAP_TIMEOUT', 300))  # reloaded after this even without a save
+
+# Static HTML snapshots of landing pages served directly by Caddy (python manage.py export_landing_snapshots)
+SNAPSHOT_ROOT = BASE_DIR / 'snapshots'
+SNAPSHOT_HOST = os.getenv('SNAPSHOT_HOST', 'info.fxglobals.co')
+SNAPSHOT_SECURE = True
+SNAPSHOT_EXPORT_ON_SAVE = os.getenv('SNAPSHOT_EXPORT_ON_SAVE', 'True').lower() == 'true'  # Caddy serves whatever is on disk
+
+# Cache
+# Shared Redis cache when REDIS_URL is set (docker-compose), per-process memory otherwise
+REDIS_URL = os.getenv('REDIS_URL', '')
+# Worker processes serving this deployment (gunicorn -w, entrypoint.sh); more than one requires REDIS_URL (config.E002)
+WEB_CONCURRENCY = int(os.getenv('WEB_CONCURRENCY', 1))
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Seconds a resolved landing video set stays cached (also invalidated on Video/LandingPage save)
+LANDING_CONTEXT_CACHE_TIMEOUT = int(os.getenv('LANDING_CONTEXT_CACHE_TIMEOUT', '300'))
+
+# Full-page cache for anonymous landing page visits (config/page_cache.py)
+PAGE_CACHE_ENABLED = os.getenv('PAGE_CACHE_ENABLED', 'True').lower() == 'true'
+PAGE_CACHE_TIMEOUT = int(os.getenv('PAGE_CACHE_TIMEOUT', '60'))  # served as fresh
+PAGE_CACHE_STALE_TIMEOUT = int(os.getenv('PAGE_CACHE_STALE_TIMEOUT', '600'))  # served stale while one request re-renders
+PAGE_CACHE_LOCK_WAIT = float(os.getenv('PAGE_CACHE_LOCK_WAIT', '5'))  # cold misses wait this long for the rendering request
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
@@ -178,6 +307,8 @@ CORS_ALLOWED_ORIGINS = [
 ]
 
 CORS_ALLOW_CREDENTIALS = True
+CORS_ALLOW_HEADERS = (*default_headers, 'idempotency-key')
+CORS_EXPOSE_HEADERS = ['Idempotent-Replayed']
 # Frontend URL for password reset links
 FRONTEND_URL = os.getenv('FRONTEND_URL', 'http://localhost:8009')
 
@@ -189,6 +320,14 @@ LAHZA_PUBLIC_KEY = os.getenv('LAHZA_PUBLIC_KEY','pk_live_RufakeN2n1jkqTBnZ0OXr3e
 if not LAHZA_PUBLIC_KEY:
     raise ValueError("LAHZA_PUBLIC_KEY environment variable is required")
 LAHZA_BASE_URL = os.getenv('LAHZA_BASE_URL', 'https://api.lahza.io')
+# Shared Lahza HTTP client (config/lahza_service.py): pooled connections, split timeouts,
+# retries for verify calls and a circuit breaker that fails fast while the gateway is down
+LAHZA_CONNECT_TIMEOUT = float(os.getenv('LAHZA_CONNECT_TIMEOUT', 3.05))
+LAHZA_READ_TIMEOUT = float(os.getenv('LAHZA_READ_TIMEOUT', 15))
+LAHZA_POOL_SIZE = int(os.getenv('LAHZA_POOL_SIZE', 10))
+LAHZA_VERIFY_RETRIES = int(os.getenv('LAHZA_VERIFY_RETRIES', 2))
+LAHZA_BREAKER_THRESHOLD = int(os.getenv('LAHZA_BREAKER_THRESHOLD', 5))  # consecutive failures before opening
+LAHZA_BREAKER_RESET_SECONDS = float(os.getenv('LAHZA_BREAKER_RESET_SECONDS', 30))
 LAHZA_CALLBACK_URL = os.getenv(
     'LAHZA_CALLBACK_URL',
     f"{FRONTEND_URL.rstrip('/')}/payments/lahza-callback"
@@ -0,0 +1,233 @@
+"""
+Static HTML snapshots of the landing and marketing pages.
+
+Every active ``LandingPage`` short code and the fixed marketing pages are
+rendered through the regular views and written to ``SNAPSHOT_ROOT`` as
+``<path>/index.html`` so Caddy can serve them without reaching Django. The
+views are called undecorated: through ``cache_landing_page`` an export could
+write out a stale page-cache entry.
+
+Exports are incremental: each page has a fingerprint of its inputs (templates,
+videos, Black Friday settings, media videos manifest, landing page fields) and
+only pages whose fingerprint changed since the last run are re-rendered.
+
+Run with ``python manage.py export_landing_snapshots`` (the web container
+runs it on every start, after ``collectstatic``). With ``SNAPSHOT_EXPORT_ON_SAVE``
+(on by default), admin edits of a ``LandingPage``, ``Video`` or
+``BlackFridaySettings`` trigger a background re-export once committed.
+"""
+from __future__ import annotations
+
+import hashlib
+import inspect
+import json
+import logging
+import os
+import shutil
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import Count, Max
+from django.urls import Resolver404, resolve
+
+from .storage import manifest_version
+
+logger = logging.getLogger(__name__)
+
+STATE_FILENAME = '.snapshot-state.json'
+
+# Fixed pages that render the same for every visitor (no query string or per-user data)
+MARKETING_PATHS = [
+    '/',
+    '/vip-signals/',
+    '/sales/',
+    '/packages/',
+    '/web/',
+    '/new-land/',
+    '/feedback/',
+    '/feedback/videos/',
+    '/ramadan/',
+    '/ramadan/phase1/',
+    '/ramadan/phase2/',
+    '/checkout/',
+    '/privacy-policy/',
+    '/terms-of-service/',
+    '/return-exchange-policy/',
+]
+
+
+def snapshot_root() -> Path:
+    return Path(getattr(settings, 'SNAPSHOT_ROOT', Path(settings.BASE_DIR) / 'snapshots'))
+
+
+def _template_mtimes() -> List[Tuple[str, float]]:
+    mtimes = []
+    for directory in settings.TEMPLATES[0]['DIRS']:
+        for root, _dirs, files in os.walk(directory):
+            for name in files:
+                if name.endswith('.html'):
+                    path = os.path.join(root, name)
+                    mtimes.append((path, os.path.getmtime(path)))
+    return sorted(mtimes)
+
+
+def _shared_inputs() -> str:
+    """Fingerprint of the inputs every page depends on."""
+    from contacts.models import BlackFridaySettings
+    from videos import media_manifest
+    from videos.models import Video
+
+    videos = Video.objects.aggregate(updated=Max('updated_at'), count=Count('id'))
+    black_friday = BlackFridaySettings.objects.aggregate(updated=Max('updated_at'), count=Count('id'))
+    inputs = {
+        'templates': _template_mtimes(),
+        'videos': [str(videos['updated']), videos['count']],
+        'black_friday': [str(black_friday['updated']), black_friday['count']],
+        'media_videos': media_manifest.get_manifest().get('directory_mtime'),
+        'host': getattr(settings, 'SNAPSHOT_HOST', 'localhost'),
+        'static_manifest': manifest_version(),
+    }
+    return json.dumps(inputs, sort_keys=True, default=str)
+
+
+def _page_specs() -> Dict[str, str]:
+    """Map every exported path to its page-specific fingerprint input."""
+    from contacts.models import LandingPage
+
+    specs = {path: '' for path in MARKETING_PATHS}
+    for page in LandingPage.objects.filter(is_active=True).only('short_code', 'template', 'name', 'description'):
+        path = f'/{page.short_code}/'
+        if not _is_short_code_route(path):
+            # e.g. the Elite program's NOKHBEH01, only reached through ?code=
+            logger.debug("[Snapshots] %s is not a short-code URL, not exported", path)
+            continue
+        specs[path] = json.dumps([page.template, page.name, page.description])
+    return specs
+
+
+def _is_short_code_route(path: str) -> bool:
+    try:
+        return resolve(path).url_name == 'landing_page_short'
+    except Resolver404:
+        return False
+
+
+def _render(path: str) -> Optional[bytes]:
+    from django.test import RequestFactory
+
+    factory = RequestFactory()
+    request = factory.get(
+        path,
+        HTTP_HOST=getattr(settings, 'SNAPSHOT_HOST', 'localhost'),
+        secure=getattr(settings, 'SNAPSHOT_SECURE', True),
+    )
+    match = resolve(path)
+    # Skip the page cache (and conditional GET) layers: render from the current data
+    view = inspect.unwrap(match.func)
+    response = view(request, *match.args, **match.kwargs)
+    if hasattr(response, 'render') and callable(response.render):
+        response = response.render()
+    if response.status_code != 200:
+        logger.warning("[Snapshots] %s returned %s, not exported", path, response.status_code)
+        return None
+    return response.content
+
+
+def _output_dir(root: Path, path: str) -> Path:
+    return root.joinpath(*[part for part in path.split('/') if part])
+
+
+def _load_state(root: Path) -> Dict[str, str]:
+    try:
+        return json.loads((root / STATE_FILENAME).read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_atomic(path: Path, content: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + '.tmp')
+    tmp_path.write_bytes(content)
+    os.replace(tmp_path, path)
+
+
+def export_snapshots(force: bool = False, root: Optional[Path] = None) -> Dict[str, List[str]]:
+    """
+    Render changed pages to ``root`` and remove snapshots of deactivated landing pages.
+
+    Returns the exported, skipped, removed and failed paths.
+    """
+    root = Path(root) if root else snapshot_root()
+    root.mkdir(parents=True, exist_ok=True)
+    state = {} if force else _load_state(root)
+    shared = _shared_inputs()
+    specs = _page_specs()
+    result: Dict[str, List[str]] = {'exported': [], 'skipped': [], 'removed': [], 'failed': []}
+    new_state: Dict[str, str] = {}
+
+    for path, page_input in specs.items():
+        fingerprint = hashlib.sha256(f'{shared}|{path}|{page_input}'.encode('utf-8')).hexdigest()
+        index_file = _output_dir(root, path) / 'index.html'
+        if state.get(path) == fingerprint and index_file.exists():
+            new_state[path] = fingerprint
+            result['skipped'].append(path)
+            continue
+        try:
+            content = _render(path)
+        except Exception as exc:
+            logger.error("[Snapshots] Error rendering %s: %s", path, exc, exc_info=True)
+            content = None
+        if content is None:
+            result['failed'].append(path)
+            continue
+        _write_atomic(index_file, content)
+        new_state[path] = fingerprint
+        result['exported'].append(path)
+
+    # Landing pages that were deactivated or deleted must stop being served
+    for path in set(state) - set(specs):
+        directory = _output_dir(root, path)
+        if directory != root and directory.exists():
+            shutil.rmtree(directory, ignore_errors=True)
+        result['removed'].append(path)
+
+    _write_atomic(root / STATE_FILENAME, json.dumps(new_state, indent=2).encode('utf-8'))
+    logger.info(
+        "[Snapshots] Exported %d, skipped %d, removed %d, failed %d page(s)",
+        len(result['exported']), len(result['skipped']), len(result['removed']), len(result['failed']),
+    )
+    return result
+
+
+_export_lock = threading.Lock()
+_export_pending = threading.Event()
+
+
+def _export_worker() -> None:
+    try:
+        # Drain requests that arrive while exporting (e.g. bulk list_editable saves)
+        while _export_pending.is_set():
+            _export_pending.clear()
+            try:
+                export_snapshots()
+            except Exception as exc:
+                logger.error("[Snapshots] Background export failed: %s", exc, exc_info=True)
+    finally:
+        close_old_connections()
+        _export_lock.release()
+    if _export_pending.is_set():
+        # A save landed between the last export and releasing the lock
+        schedule_export()
+
+
+def schedule_export() -> None:
+    """Re-export snapshots in a background thread, coalescing bursts of saves."""
+    _export_pending.set()
+    if not _export_lock.acquire(blocking=False):
+        return  # The running export picks up the pending request
+    thread = threading.Thread(target=_export_worker, name='snapshot-export')
+    thread.daemon = True
+    thread.start()
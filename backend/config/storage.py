@@ -0,0 +1,63 @@
+"""
+Static files storage used by ``collectstatic``.
+"""
+import logging
+import os
+
+from django.conf import settings
+from whitenoise.storage import CompressedManifestStaticFilesStorage, CompressedStaticFilesStorage
+
+from . import responsive_images
+
+logger = logging.getLogger(__name__)
+
+# Written by collectstatic; rendered pages embed the names they map to
+MANIFEST_FILES = ('staticfiles.json', responsive_images.MANIFEST_NAME)
+
+
+def manifest_version() -> str:
+    """Changes whenever collectstatic rewrites the hashed-name or responsive image manifests."""
+    mtimes = []
+    for name in MANIFEST_FILES:
+        try:
+            mtimes.append(f'{os.path.getmtime(os.path.join(settings.STATIC_ROOT, name)):.0f}')
+        except (OSError, TypeError):
+            mtimes.append('-')
+    return ':'.join(mtimes)
+
+
+class ResponsiveImagesMixin:
+    """Generate the responsive image derivatives (``config.responsive_images``) after collecting."""
+
+    def post_process(self, paths, dry_run=False, **options):
+        if not dry_run:
+            generated = responsive_images.generate(
+                self, [name for name in paths if responsive_images.is_source_image(name)]
+            )
+            # Hand the derivatives to the parent post-processing like any collected file
+            for entry in generated.values():
+                for variants in entry['sources'].values():
+                    for target, _width in variants:
+                        paths[target] = (self, target)
+        yield from super().post_process(paths, dry_run=dry_run, **options)
+
+
+class ResponsiveCompressedStaticFilesStorage(ResponsiveImagesMixin, CompressedStaticFilesStorage):
+    pass
+
+
+class ResponsiveCompressedManifestStaticFilesStorage(ResponsiveImagesMixin, CompressedManifestStaticFilesStorage):
+    """
+    Content-hashed names (``staticfiles.json``) plus gzip/brotli copies.
+
+    WhiteNoise serves the hashed names with ``Cache-Control: immutable``.
+    """
+
+    def stored_name(self, name):
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            # A missing asset (reported by the config.W001 check) 404s on its own instead of failing the
+            # page. Debug level: WhiteNoise probes unhashed candidates for every file at startup.
+            logger.debug("[Static] No staticfiles.json entry for %r, using the unhashed name", name)
+            return name
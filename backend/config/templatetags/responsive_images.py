@@ -0,0 +1,36 @@
+from django import template
+from django.templatetags.static import static
+from django.utils.html import format_html, format_html_join
+
+from config import responsive_images
+
+register = template.Library()
+
+
+@register.simple_tag
+def responsive_image(name, alt='', sizes='100vw', **attrs):
+    """
+    Render ``<picture>`` with AVIF/WebP ``srcset`` sources for the static image ``name``.
+
+    Usage: ``{% responsive_image 'new_assets/x.png' alt='...' sizes='(min-width: 768px) 24rem, 90vw' class='w-96' loading='lazy' %}``
+
+    Falls back to a plain ``<img>`` when ``collectstatic`` has not generated derivatives.
+    """
+    img = format_html(
+        '<img src="{}" alt="{}"{}>',
+        static(name),
+        alt,
+        format_html_join('', ' {}="{}"', ((key.replace('_', '-'), value) for key, value in attrs.items())),
+    )
+    entry = responsive_images.get_entry(name)
+    if not entry:
+        return img
+    sources = format_html_join(
+        '',
+        '<source type="{}" srcset="{}" sizes="{}">',
+        (
+            (mime_type, ', '.join(f'{static(target)} {width}w' for target, width in variants), sizes)
+            for mime_type, variants in entry['sources'].items()
+        ),
+    )
+    return format_html('<picture>{}{}</picture>', sources, img)
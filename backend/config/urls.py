@@ -3,10 +3,12 @@ URL configuration for config project.
 """
 from django.contrib import admin
 from django.conf import settings
-from django.conf.urls.static import static
-from .views import landing_page, landing_page_no_contact, elite_program, black_friday, lahza_checkout, initialize_lahza_payment, verify_lahza_payment, lahza_webhook, test_email, privacy_policy, terms_of_service, return_exchange_policy, get_black_friday_end_date, get_pre_black_friday_date, download_instructions_pdf, packages_page, payment_success, pricing_page, pricing_contact, payment_page, submit_vip_learning_request, new_land_page, web_page, feedback_landing_page, feedback_videos_page, ramadan_phase1, ramadan_phase2
+from .views.landing import landing_page, landing_page_no_contact, elite_program, black_friday, ramadan_phase1, ramadan_phase2, get_black_friday_end_date, get_pre_black_friday_date
+from .views.pages import lahza_checkout, privacy_policy, terms_of_service, return_exchange_policy, packages_page, pricing_page, pricing_contact, payment_page, submit_vip_learning_request, new_land_page, web_page, feedback_landing_page, feedback_videos_page
+from .views.payments import initialize_lahza_payment, verify_lahza_payment, lahza_webhook, lahza_client_stats, payment_status_stream, payment_success
+from .views.instructions import test_email, download_instructions_pdf
 from django.urls import path, include, re_path
-from django.views.static import serve
+from .media import serve as serve_media
 import logging
 
 logger = logging.getLogger(__name__)
@@ -56,38 +58,30 @@ urlpatterns = [
     path('checkout/payment/initialize/', initialize_lahza_payment, name='initialize_checkout_payment'),
     path('checkout/payment/verify/', verify_lahza_payment, name='verify_checkout_payment'),
     path('api/lahza/webhook/', lahza_webhook, name='lahza_webhook'),
+    path('api/lahza/stats/', lahza_client_stats, name='lahza_client_stats'),
+    path('api/payments/<str:reference>/events/', payment_status_stream, name='payment_status_stream'),
     path('test-email/', test_email, name='test_email'),
     path('instructions/<str:reference>/download/', download_instructions_pdf, name='download_instructions_pdf'),
     path('privacy-policy/', privacy_policy, name='privacy_policy'),
     path('terms-of-service/', terms_of_service, name='terms_of_service'),
     path('return-exchange-policy/', return_exchange_policy, name='return_exchange_policy'),
-    re_path(r'^images/(?P<path>.*)$', serve, {'document_root': settings.MEDIA_ROOT}),
+    re_path(r'^images/(?P<path>.*)$', serve_media, {'document_root': settings.MEDIA_ROOT}),
     re_path(r'^(?P<short_code>[A-Za-z0-9]{8})/$', landing_page, name='landing_page_short'),
     path('', landing_page, name='landing_page'),
 ]
 
 # Serve media files - always enabled regardless of DEBUG setting
+# Range-aware (video seeking); with MEDIA_OFFLOAD the front server does the transfer
 urlpatterns += [
-    re_path(r'^media/(?P<path>.*)$', serve, {
+    re_path(r'^media/(?P<path>.*)$', serve_media, {
         'document_root': settings.MEDIA_ROOT,
         'show_indexes': False,
     }),
 ]
 
-urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
-
-# Static files: serve from STATIC_ROOT (collectstatic output) or STATICFILES_DIRS
-# WhiteNoise serves from STATIC_ROOT when DEBUG=False
+# Static files: WhiteNoise serves STATIC_ROOT (hashed names with immutable caching) from middleware,
+# so production never routes /static/ through a view
 if settings.DEBUG:
     # In development, serve from STATICFILES_DIRS for live editing
     from django.contrib.staticfiles.urls import staticfiles_urlpatterns
     urlpatterns += staticfiles_urlpatterns()
-else:
-    # In production, explicitly serve from STATIC_ROOT
-    # The static() helper doesn't work when DEBUG=False, so we use serve directly
-    urlpatterns += [
-        re_path(r'^static/(?P<path>.*)$', serve, {
-            'document_root': settings.STATIC_ROOT,
-            'show_indexes': False,
-        }),
-    ]
\ No newline at end of file
@@ -0,0 +1,23 @@
+"""
+Site views, split by URL group so a worker only imports what it serves:
+
+- ``landing``: landing pages, Elite and the seasonal campaign pages;
+- ``pages``: static marketing pages, packages/pricing assets and contact forms;
+- ``payments``: Lahza checkout (initialize, verify, webhook, status stream, success page);
+- ``instructions``: receipt emails and the instructions PDF download.
+
+Heavy optional dependencies (ReportLab) are imported on first use. Names are
+still importable from ``config.views`` for existing callers, resolved lazily
+so that importing one group doesn't import the others.
+"""
+import importlib
+
+_MODULES = ('landing', 'pages', 'payments', 'instructions')
+
+
+def __getattr__(name):
+    for module_name in _MODULES:
+        module = importlib.import_module(f'{__name__}.{module_name}')
+        if hasattr(module, name):
+            return getattr(module, name)
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
@@ -0,0 +1,269 @@
+"""Payment receipt emails and the instructions PDF (static file, ReportLab fallback loaded on first use)."""
+from django.shortcuts import get_object_or_404
+from django.conf import settings
+from contacts.models import Payment
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from rest_framework import status
+from django.views.decorators.csrf import csrf_exempt
+from django.core.mail import send_mail
+import importlib.util
+import logging
+
+from .. import assets
+from ..mailer import pool as mail_pool
+from .. import receipts
+from ..media import content_response
+
+logger = logging.getLogger(__name__)
+
+# ReportLab is only needed when the static PDF is missing: config.instructions_pdf
+# (which imports it) is loaded on first use rather than at worker startup
+REPORTLAB_AVAILABLE = importlib.util.find_spec('reportlab') is not None
+
+if not REPORTLAB_AVAILABLE:
+    logger.warning("[PDF] reportlab not available. PDF generation fallback will not work.")
+
+
+def generate_instructions_pdf(payment):
+    """Generate PDF file with instructions for the customer (fallback if PDF file not found)"""
+    if not REPORTLAB_AVAILABLE:
+        raise ImportError("reportlab is not installed. Cannot generate PDF dynamically.")
+    
+    try:
+        from .. import instructions_pdf
+
+        # Shared body laid out once, only the order reference footer is stamped (cached on disk)
+        return instructions_pdf.render(payment.reference)
+    except Exception as e:
+        logger.error(f"[PDF] Error generating instructions PDF: {str(e)}", exc_info=True)
+        raise
+
+
+def send_payment_receipt_email(payment, mailer=None):
+    """
+    Send payment receipt email to customer with PDF instructions
+
+    Sent over ``mailer`` (a ``config.mailer.PooledMailer``) when given, else
+    over a pooled connection shared with the other receipt senders.
+    """
+    sender = mailer or mail_pool
+    try:
+        # Text and HTML parts from the precompiled receipt templates
+        receipt = receipts.render(payment)
+        
+        # The instructions PDF is held in memory by config.assets (no per-payment disk access)
+        pdf_content = None
+        pdf_filename = None
+        try:
+            pdf_asset = assets.INSTRUCTIONS_PDF.load()
+            if pdf_asset is not None:
+                pdf_content = pdf_asset.content
+                pdf_filename = assets.INSTRUCTIONS_PDF.download_name
+            elif REPORTLAB_AVAILABLE:
+                # Try to generate PDF dynamically as fallback
+                try:
+                    pdf_content = generate_instructions_pdf(payment)
+                    pdf_filename = f'instructions_{payment.reference}.pdf'
+                    logger.info(f"[Email] Generated PDF dynamically as fallback")
+                except Exception as e:
+                    logger.warning(f"[Email] Could not generate PDF dynamically: {str(e)}")
+                    pdf_content = None
+            else:
+                logger.warning(f"[Email] Instructions PDF missing and reportlab not available, sending email without PDF")
+        except Exception as e:
+            logger.warning(f"[Email] Could not attach PDF: {str(e)}, sending email without PDF")
+            pdf_content = None
+            pdf_filename = None
+        
+        # Validate email address
+        if not payment.customer_email or '@' not in payment.customer_email:
+            logger.error(f"[Email] Invalid email address: {payment.customer_email}")
+            raise ValueError(f"Invalid email address: {payment.customer_email}")
+        
+        # Create email message (multipart text/HTML), with the PDF if available
+        email = receipts.build_message(
+            payment, receipt, attachment=(pdf_filename, pdf_content, 'application/pdf') if pdf_content else None,
+        )
+        if pdf_content:
+            logger.info(f"[Email] PDF attached: {pdf_filename}")
+        
+        # Send email with detailed logging
+        logger.info(f"[Email] Attempting to send receipt email to {payment.customer_email} for payment {payment.reference}")
+        logger.info(f"[Email] From: {settings.DEFAULT_FROM_EMAIL}, SMTP: {settings.EMAIL_HOST}:{settings.EMAIL_PORT}")
+        
+        try:
+            sender.send(email)
+            logger.info(f"[Email] ✓ Receipt sent successfully to {payment.customer_email} for payment {payment.reference}")
+        except Exception as send_error:
+            logger.error(f"[Email] ✗ Failed to send email to {payment.customer_email}: {str(send_error)}", exc_info=True)
+            # Try to send without PDF as fallback
+            if pdf_content:
+                logger.info(f"[Email] Retrying without PDF attachment...")
+                try:
+                    email_without_pdf = receipts.build_message(payment, receipt)
+                    sender.send(email_without_pdf)
+                    logger.info(f"[Email] ✓ Receipt sent successfully (without PDF) to {payment.customer_email}")
+                except Exception as retry_error:
+                    logger.error(f"[Email] ✗ Failed to send email even without PDF: {str(retry_error)}")
+                    raise
+            else:
+                raise
+        
+    except Exception as e:
+        logger.error(f"[Email] Error sending receipt email: {str(e)}", exc_info=True)
+        raise
+
+
+@csrf_exempt
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def download_instructions_pdf(request, reference):
+    """Download instructions PDF for a payment"""
+    try:
+        payment = get_object_or_404(Payment, reference=reference)
+        
+        pdf_asset = assets.INSTRUCTIONS_PDF.load()
+        if pdf_asset is not None:
+            # Streamed from memory with ETag/Last-Modified and Range support
+            return content_response(
+                request,
+                pdf_asset.content,
+                etag=pdf_asset.etag,
+                last_modified=pdf_asset.mtime,
+                content_type=assets.INSTRUCTIONS_PDF.content_type,
+                filename=assets.INSTRUCTIONS_PDF.download_name,
+                cache_control={'private': True, 'max_age': 3600},
+            )
+        
+        # Fallback to generating PDF if file doesn't exist (only if reportlab is available)
+        if REPORTLAB_AVAILABLE:
+            try:
+                pdf_content = generate_instructions_pdf(payment)
+                from django.http import HttpResponse
+                response = HttpResponse(pdf_content, content_type='application/pdf')
+                response['Content-Disposition'] = f'attachment; filename="instructions_{reference}.pdf"'
+                logger.info(f"[PDF] Generated PDF dynamically as fallback")
+                return response
+            except Exception as e:
+                logger.error(f"[PDF] Could not generate PDF dynamically: {str(e)}")
+                return Response({
+                    'success': False,
+                    'error': 'PDF file not found and could not be generated'
+                }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        else:
+            logger.error(f"[PDF] reportlab not available, cannot generate PDF dynamically")
+            return Response({
+                'success': False,
+                'error': 'PDF file not found'
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        
+    except Exception as e:
+        logger.error(f"[PDF] Error downloading instructions PDF: {str(e)}", exc_info=True)
+        return Response({
+            'success': False,
+            'error': 'Could not load PDF file'
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@csrf_exempt
+@api_view(['POST', 'GET'])
+@permission_classes([AllowAny])
+def test_email(request):
+    """Test email sending functionality"""
+    try:
+        # Get test email from request or use default
+        test_email_address = request.data.get('email') or request.GET.get('email') or 'test@example.com'
+        
+        # Create a test payment object for the template
+        from contacts.models import Payment
+        from django.utils import timezone
+        from decimal import Decimal
+        
+        # Try to get the most recent payment, or create a mock one
+        try:
+            test_payment = Payment.objects.filter(status='success').order_by('-paid_at').first()
+            if not test_payment:
+                # Create a mock payment for testing
+                test_payment = Payment(
+                    reference='TEST-1234567890',
+                    transaction_id='TEST-TXN-123',
+                    customer_name='Test Customer',
+                    customer_email=test_email_address,
+                    amount=Decimal('300.00'),
+                    currency='ILS',
+                    offer_type='bundle',
+                    offer_name='Design Package + VIP Tips',
+                    status='success',
+                    source='checkout',
+                    paid_at=timezone.now(),
+                )
+        except Exception:
+            # Create a mock payment for testing
+            test_payment = Payment(
+                reference='TEST-1234567890',
+                transaction_id='TEST-TXN-123',
+                customer_name='Test Customer',
+                customer_email=test_email_address,
+                amount=Decimal('300.00'),
+                currency='ILS',
+                offer_type='bundle',
+                offer_name='Live Trading + VIP Signals Bundle',
+                status='success',
+                source='checkout',
+                paid_at=timezone.now(),
+            )
+        
+        # Send test email
+        subject = 'Test Email - FX Global Payment Receipt'
+        
+        # Render the receipt like send_payment_receipt_email does
+        receipt = receipts.render(test_payment)
+        plain_message = receipt.text
+        html_message = receipt.html
+        
+        # Send email
+        try:
+            send_mail(
+                subject=subject,
+                message=plain_message,
+                from_email=settings.DEFAULT_FROM_EMAIL,
+                recipient_list=[test_email_address],
+                html_message=html_message,
+                fail_silently=False,
+            )
+        except Exception as email_error:
+            error_msg = str(email_error)
+            # Provide helpful error messages
+            if 'BadCredentials' in error_msg or 'Username and Password not accepted' in error_msg:
+                raise Exception(
+                    "Gmail authentication failed. Please:\n"
+                    "1. Enable 2-Factor Authentication on your Google account\n"
+                    "2. Generate an App Password at: https://myaccount.google.com/apppasswords\n"
+                    "3. Use the App Password (16 characters) as EMAIL_HOST_PASSWORD environment variable\n"
+                    f"Current EMAIL_HOST_USER: {settings.EMAIL_HOST_USER}"
+                )
+            elif 'Connection refused' in error_msg or 'Connection timed out' in error_msg:
+                raise Exception(
+                    f"Cannot connect to email server ({settings.EMAIL_HOST}:{settings.EMAIL_PORT}). "
+                    "Check your network connection and email server settings."
+                )
+            else:
+                raise
+        
+        logger.info(f"[Email] Test email sent successfully to {test_email_address}")
+        
+        return Response({
+            'success': True,
+            'message': f'Test email sent successfully to {test_email_address}',
+            'from_email': settings.DEFAULT_FROM_EMAIL,
+        })
+        
+    except Exception as e:
+        logger.error(f"[Email] Error sending test email: {str(e)}", exc_info=True)
+        return Response({
+            'success': False,
+            'error': str(e),
+            'message': 'Failed to send test email. Check email configuration in settings.',
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
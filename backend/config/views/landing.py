@@ -0,0 +1,373 @@
+"""Landing pages (short-code variants, Elite) and the seasonal campaign pages and their date APIs."""
+from django.conf import settings as django_settings
+from django.shortcuts import render
+from django.http import Http404
+from videos.models import Video
+from videos.serializers import VideoPublicSerializer
+from videos import media_manifest
+import urllib.parse
+from contacts.models import BlackFridaySettings
+from contacts import short_codes
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from django.utils import timezone
+import logging
+
+from ..landing_cache import get_landing_videos
+from ..page_cache import cache_landing_page
+from ..conditional import conditional_page, template_files, video_updates, media_video_files, landing_content, black_friday_updates
+
+logger = logging.getLogger(__name__)
+
+# Landing page the Elite page attributes its leads to without a ?code=
+ELITE_DEFAULT_CODE = 'NOKHBEH01'
+
+GALLERY_ITEMS = [
+    {'image': '56dd16b6d65c4d41f0d9a9cd4b57de9ae9b04c5e.png', 'title': 'بيع الذهب محققة 210 نقاط'},
+    {'image': '4142fea57f52452fd1f6de101cac3449d1dc4dc9.png', 'title': 'شراء الذهب محققة أكثر من 140 نقطة'},
+    {'image': '4603fadcba072d3df40e3e708bef37ab7fd6e7b8.png', 'title': 'شراء الذهب 345 نقطة'},
+    {'image': 'f86196d3c7a8e29e657208b6266a43fa8bfc228e.png', 'title': 'شراء الذهب أكثر من 160 نقطة'},
+    {'image': 'ec12bbb161af6a280f4298b272279d1c82ad0888.png', 'title': 'بيع الذهب محققة 480 نقطة'},
+    {'image': '7b4055b6d55bda1ee23426926dcd6e239e34eee1.png', 'title': 'بيع مؤشر US100 محققة أكثر من 220 نقطة'},
+    {'image': 'f23d2c9717d18ede6764b0d41d6044362cacbc26.png', 'title': 'صفقة على مؤشر US30 محققة 480 نقطة'},
+    {'image': '12f17d57cee8ed3f2355e80c9f6465f46b788cd9.png', 'title': 'صفقة شراء على مؤشر US30 محققة 280 نقطة'},
+    {'image': '2856211882732aca919ab964e8b18e4d63dfa9fa.png', 'title': 'صفقة على مؤشر US100 محققة 218 نقطة'},
+    {'image': 'a29b6cceed5b6ab9b4f4c4b8516e270bd1b394f0.png', 'title': 'اهداف امتدادية على الصفقة السابقة محققة 380 نقطة'},
+    {'image': '58cd5e5e53854f0dd77e9cdfcbae196a833ea19d.png', 'title': 'صفقة شراء على الذهب 665 نقاط'},
+    {'image': '2185841c3a4f8e56848be16e8039a2122f53bb72.png', 'title': 'صفقة بيع على الذهب محققة 140 نقطة'},
+    {'image': 'fccaf05a945e1e276f746ccb3f7aba1d94f0d038.png', 'title': 'صفقة شراء على الذهب محققة 280 نقطة'},
+    {'image': '7bd3d230ab9f25666ce34ef88fcf4447505bc3c4.png', 'title': 'صفقة تعزيز للشراء السابق محققة 100 نقطة'},
+    {'image': 'c989ee307d820e5e34418aad04d6fe8c6a10c2cf.png', 'title': 'صفقة بيع الذهب محققة 300 نقطة'},
+    {'image': '22400b65695bfb7deebf7980f30740b37d53845d.png', 'title': 'صفقة شراء على الذهب محققة 290 نقطة'},
+]
+
+TIMELINE_STEPS = [
+    {
+        'icon': '📊',
+        'title': 'تحليل يومي متكامل',
+        'description': 'تحليل فني + أساسي لتكون فاهم السوق قبل ما تدخل أي صفقة.'
+    },
+    {
+        'icon': '🎯',
+        'title': 'إرسال توصية جاهزة للتنفيذ',
+        'description': 'سعر الدخول، الأهداف، وقف الخسارة، وإدارة الصفقة — كل شي جاهز لك.'
+    },
+    {
+        'icon': '🛡️',
+        'title': 'وقف خسارة واضح ومدروس',
+        'description': 'حماية رأس مالك أولويتنا — وقف خسارة مناسب لكل صفقة.'
+    },
+    {
+        'icon': '🔔',
+        'title': 'أهداف متعددة حسب السوق',
+        'description': 'مرونة في جني الأرباح حسب حركة السوق، مع تحديثات فورية.'
+    },
+    {
+        'icon': '📈',
+        'title': 'تحديثات فورية ومتابعة حية',
+        'description': 'إشعارات Telegram مباشرة مع كل تعديل أو إدارة للصفقة.'
+    },
+    {
+        'icon': '📝',
+        'title': 'تقرير أسبوعي موثّق بالأداء',
+        'description': 'شفافية كاملة عبر تقرير أسبوعي يوضح المكاسب والتحديثات القادمة.'
+    },
+]
+
+
+def _resolve_landing_videos(request):
+    """Resolve the hero video and testimonials (DB first, media videos manifest as fallback)."""
+    # Get hero video for the page
+    hero_video = None
+    try:
+        video = Video.objects.filter(is_active=True, position='hero').order_by('order', '-created_at').first()
+        if video:
+            serializer = VideoPublicSerializer(video, context={'request': request})
+            hero_video = dict(serializer.data)
+    except Exception:
+        pass
+    
+    # If no hero video in database, fall back to the media videos manifest
+    if not hero_video:
+        try:
+            entry = media_manifest.get_hero_video()
+            if entry:
+                video_url = request.build_absolute_uri(f'/media/videos/{urllib.parse.quote(entry["name"])}')
+                hero_video = {
+                    'video_file_url': video_url,
+                    'video_url': video_url,
+                    'title': entry['title'],
+                    'description': '',
+                    'vimeo_id': None,
+                }
+        except Exception:
+            pass
+    
+    # Get testimonials videos
+    testimonials_videos = []
+    try:
+        videos = Video.objects.filter(is_active=True, position='testimonials').order_by('order', '-created_at')[:3]
+        for video in videos:
+            serializer = VideoPublicSerializer(video, context={'request': request})
+            testimonials_videos.append(dict(serializer.data))
+    except Exception:
+        pass
+    
+    # If not enough testimonials in database, add videos from the media videos manifest
+    if len(testimonials_videos) < 3:
+        try:
+            for entry in media_manifest.get_testimonial_videos(3 - len(testimonials_videos)):
+                video_url = request.build_absolute_uri(f'/media/videos/{urllib.parse.quote(entry["name"])}')
+                testimonials_videos.append({
+                    'video_file_url': video_url,
+                    'video_url': video_url,
+                    'title': entry['title'],
+                    'description': '',
+                    'badge_label': entry['badge_label'],
+                    'vimeo_id': None,
+                })
+        except Exception:
+            pass
+    
+    featured_testimonial_video = None
+    featured_index = None
+    for idx, video in enumerate(testimonials_videos):
+        label = (video.get('badge_label') or '').lower()
+        if 'وحش' in label or 'beast' in label or 'month' in label or 'الشهر' in label:
+            featured_testimonial_video = video
+            featured_index = idx
+            break
+
+    if featured_testimonial_video is None and testimonials_videos:
+        featured_testimonial_video = testimonials_videos[0]
+        featured_index = 0
+
+    other_testimonials_videos = testimonials_videos
+    if featured_index is not None:
+        other_testimonials_videos = [
+            video for idx, video in enumerate(testimonials_videos) if idx != featured_index
+        ]
+
+    return {
+        'hero_video': hero_video,
+        'featured_testimonial_video': featured_testimonial_video,
+        'testimonials_videos': other_testimonials_videos,
+    }
+
+
+def _render_landing_page(request, short_code=None, force_template=None, extra_context=None):
+    """Shared implementation of the landing page views."""
+    landing_page_obj = None
+    if short_code:
+        # Resolved from the in-memory short code map; unknown codes 404 without a query
+        landing_page_obj = short_codes.resolve(short_code)
+        if landing_page_obj is None:
+            raise Http404('No LandingPage matches the given query.')
+
+    template_name = 'landing_page.html'
+    if (
+        force_template == 'neon'
+        or (landing_page_obj and landing_page_obj.template == 'neon')
+    ):
+        template_name = 'landing_page_neon.html'
+
+    # Video resolution is cached per template and invalidated by Video/LandingPage signals
+    videos = get_landing_videos(request, template_name, lambda: _resolve_landing_videos(request))
+
+    context = {
+        **videos,
+        'landing_page': landing_page_obj,
+        'gallery_items': GALLERY_ITEMS,
+        'timeline_steps': TIMELINE_STEPS,
+        'hls_js_url': getattr(django_settings, 'HLS_JS_URL', ''),
+        'hls_js_integrity': getattr(django_settings, 'HLS_JS_INTEGRITY', ''),
+    }
+    if extra_context:
+        context.update(extra_context)
+
+    return render(request, template_name, context)
+
+
+@conditional_page(template_files('landing_page.html', 'landing_page_neon.html'), video_updates, media_video_files, landing_content)
+@cache_landing_page
+def landing_page(request, short_code=None, force_template=None):
+    """Render the landing page"""
+    return _render_landing_page(request, short_code, force_template)
+
+
+@conditional_page(template_files('landing_page.html', 'landing_page_neon.html'), video_updates, media_video_files, landing_content)
+@cache_landing_page
+def landing_page_no_contact(request, short_code=None, force_template=None):
+    """Render the landing page without the contact form"""
+    return _render_landing_page(
+        request,
+        short_code,
+        force_template,
+        extra_context={'hide_contact_form': True},  # Flag to hide contact form
+    )
+
+
+@conditional_page(template_files('elite.html'), landing_content, query_params=('code',))
+@cache_landing_page(query_params=('code',))
+def elite_program(request):
+    """Render Elite landing page with working form submission."""
+    from contacts.models import LandingPage
+    # Ensure a LandingPage exists for the requested code (Elite links rely on it for lead
+    # attribution). The page cache is keyed on ?code=, so only a code's first visit writes
+    desired_code = (request.GET.get('code') or ELITE_DEFAULT_CODE).upper()
+    landing_page_obj = LandingPage.objects.filter(short_code=desired_code).first()
+    if landing_page_obj is None:
+        # Explicit code on create so the model doesn't auto-generate a random one
+        landing_page_obj, _ = LandingPage.objects.get_or_create(
+            short_code=desired_code,
+            defaults={'name': 'Elite Program Landing', 'template': 'neon', 'is_active': True},
+        )
+    return render(request, 'elite.html', {'landing_code': landing_page_obj.short_code})
+
+
+@conditional_page(template_files('black_friday.html'), black_friday_updates)
+@cache_landing_page
+def black_friday(request):
+    """Render Black Friday landing page."""
+    settings = BlackFridaySettings.get_active_settings()
+    context = {
+        'show_pay_button': settings.show_pay_button if settings else True,
+    }
+    return render(request, 'black_friday.html', context)
+
+
+@conditional_page(template_files('ramadan_phase1.html'))
+@cache_landing_page
+def ramadan_phase1(request):
+    """Render Ramadan Phase 1 landing page (teasing)."""
+    return render(request, 'ramadan_phase1.html')
+
+
+@conditional_page(template_files('ramadan_phase2.html'))
+@cache_landing_page
+def ramadan_phase2(request):
+    """Render Ramadan Phase 2 landing page (main campaign)."""
+    return render(request, 'ramadan_phase2.html')
+
+
+@conditional_page(black_friday_updates)
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def get_black_friday_end_date(request):
+    """Get the Black Friday sale end date from database. End date is calculated as 24 hours from start date."""
+    try:
+        settings = BlackFridaySettings.get_active_settings()
+        
+        # Get start date (pre-BF start date is when BF actually starts)
+        start_date = settings.pre_black_friday_start_date
+        if timezone.is_naive(start_date):
+            start_date = timezone.make_aware(start_date)
+        
+        # Calculate end date as 24 hours from start date
+        from datetime import timedelta
+        end_date = start_date + timedelta(hours=24)
+        
+        # Return end date as ISO format timestamp (in milliseconds for JavaScript)
+        # Use timestamp() which handles timezone conversion correctly
+        end_date_timestamp = int(end_date.timestamp() * 1000)
+        start_date_timestamp = int(start_date.timestamp() * 1000)
+        
+        # Format dates for display (Palestine timezone - GMT+2)
+        from datetime import datetime
+        try:
+            import pytz
+            palestine_tz = pytz.timezone('Asia/Gaza')  # Palestine timezone
+        except ImportError:
+            # Fallback if pytz is not installed - use UTC offset
+            from datetime import timedelta
+            palestine_tz = timezone.get_fixed_timezone(120)  # GMT+2
+        
+        # Convert to Palestine timezone for display
+        start_date_palestine = start_date.astimezone(palestine_tz)
+        end_date_palestine = end_date.astimezone(palestine_tz)
+        
+        return Response({
+            'success': True,
+            'end_date': end_date.isoformat(),
+            'end_date_timestamp': end_date_timestamp,
+            'start_date': start_date.isoformat(),
+            'start_date_timestamp': start_date_timestamp,
+            'start_date_display': start_date_palestine.strftime('%B %d, %Y at %I:%M %p'),
+            'end_date_display': end_date_palestine.strftime('%B %d, %Y at %I:%M %p'),
+            'timezone': 'Palestine Time (GMT+2)',
+            'is_active': settings.is_active,
+        })
+    except Exception as e:
+        logger.error(f"[Black Friday] Error getting end date: {str(e)}", exc_info=True)
+        # Return default (24 hours from now) if error
+        from datetime import timedelta
+        try:
+            import pytz
+            palestine_tz = pytz.timezone('Asia/Gaza')
+        except ImportError:
+            palestine_tz = timezone.get_fixed_timezone(120)  # GMT+2
+        now = timezone.now()
+        # Default: 24 hours from now
+        start_date = now
+        end_date = now + timedelta(hours=24)
+        if timezone.is_naive(end_date):
+            end_date = timezone.make_aware(end_date)
+        end_date_timestamp = int(end_date.timestamp() * 1000)
+        start_date_timestamp = int(start_date.timestamp() * 1000)
+        
+        start_date_palestine = start_date.astimezone(palestine_tz)
+        end_date_palestine = end_date.astimezone(palestine_tz)
+        
+        return Response({
+            'success': True,
+            'end_date': end_date.isoformat(),
+            'end_date_timestamp': end_date_timestamp,
+            'start_date': start_date.isoformat(),
+            'start_date_timestamp': start_date_timestamp,
+            'start_date_display': start_date_palestine.strftime('%B %d, %Y at %I:%M %p'),
+            'end_date_display': end_date_palestine.strftime('%B %d, %Y at %I:%M %p'),
+            'timezone': 'Palestine Time (GMT+2)',
+            'is_active': True,
+        })
+
+
+@conditional_page(black_friday_updates)
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def get_pre_black_friday_date(request):
+    """Get the Pre-Black Friday start date from database."""
+    try:
+        settings = BlackFridaySettings.get_active_settings()
+        # Ensure the datetime is timezone-aware
+        pre_bf_date = settings.pre_black_friday_start_date
+        if timezone.is_naive(pre_bf_date):
+            pre_bf_date = timezone.make_aware(pre_bf_date)
+        
+        # Return date as ISO format timestamp (in milliseconds for JavaScript)
+        pre_bf_timestamp = int(pre_bf_date.timestamp() * 1000)
+        
+        return Response({
+            'success': True,
+            'pre_black_friday_start_date': pre_bf_date.isoformat(),
+            'pre_black_friday_start_timestamp': pre_bf_timestamp,
+            'is_active': settings.is_active,
+        })
+    except Exception as e:
+        logger.error(f"[Black Friday] Error getting pre-BF date: {str(e)}", exc_info=True)
+        # Return default (November 26th of current year) if error
+        from datetime import timedelta
+        now = timezone.now()
+        pre_bf_date = now.replace(month=11, day=26, hour=0, minute=0, second=0, microsecond=0)
+        if pre_bf_date < now:
+            pre_bf_date = pre_bf_date.replace(year=now.year + 1)
+        if timezone.is_naive(pre_bf_date):
+            pre_bf_date = timezone.make_aware(pre_bf_date)
+        pre_bf_timestamp = int(pre_bf_date.timestamp() * 1000)
+        
+        return Response({
+            'success': True,
+            'pre_black_friday_start_date': pre_bf_date.isoformat(),
+            'pre_black_friday_start_timestamp': pre_bf_timestamp,
+            'is_active': True,
+        })
@@ -0,0 +1,324 @@
+"""Static marketing pages, the packages/pricing assets and their contact forms."""
+from django.shortcuts import render, redirect
+from django.conf import settings
+import urllib.parse
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import AllowAny
+from django.views.decorators.csrf import csrf_exempt
+import logging
+
+from ..conditional import conditional_page, template_files
+
+logger = logging.getLogger(__name__)
+
+
+@conditional_page(template_files('lahza_checkout.html'))
+def lahza_checkout(request):
+    """Render standalone Lahza checkout page."""
+    return render(request, 'lahza_checkout.html')
+
+
+@conditional_page(template_files('privacy_policy.html'))
+def privacy_policy(request):
+    """Render Privacy Policy page."""
+    return render(request, 'privacy_policy.html')
+
+
+@conditional_page(template_files('terms_of_service.html'))
+def terms_of_service(request):
+    """Render Terms of Service page."""
+    return render(request, 'terms_of_service.html')
+
+
+@conditional_page(template_files('return_exchange_policy.html'))
+def return_exchange_policy(request):
+    """Render Return and Exchange Policy page."""
+    return render(request, 'return_exchange_policy.html')
+
+
+@conditional_page(template_files('packages.html'))
+def packages_page(request):
+    """Render Packages landing page."""
+    return render(request, 'packages.html')
+
+
+@conditional_page(template_files('new_land.html'))
+def new_land_page(request):
+    """Render New Land (FX Globals - مؤسسة التعليم والتدريب) landing page."""
+    return render(request, 'new_land.html')
+
+
+@conditional_page(template_files('web.html'))
+def web_page(request):
+    """Render Web (FX Globals – أكاديمية تعليم و تدريب معتمدة) landing page."""
+    return render(request, 'web.html')
+
+
+@conditional_page(template_files('newfeedback/index.html'))
+def feedback_landing_page(request):
+    """Render Feedback (FX GLOBAL - عرض محدود) landing page."""
+    return render(request, 'newfeedback/index.html')
+
+
+@conditional_page(template_files('newfeedback/feedback_videos.html'))
+def feedback_videos_page(request):
+    """Render Feedback videos (نتائج سابقة) page."""
+    return render(request, 'newfeedback/feedback_videos.html')
+
+
+def payment_page(request):
+    """Render Payment page."""
+    # Check for success/error messages from VIP Learning form submission
+    success_message = request.GET.get('success', None)
+    error_message = request.GET.get('error', None)
+    
+    context = {
+        'success_message': success_message,
+        'error_message': error_message,
+    }
+    return render(request, 'payment.html', context)
+
+
+def submit_vip_learning_request(request):
+    """Handle VIP Learning contact form submission."""
+    if request.method != 'POST':
+        return render(request, 'payment.html', {'error_message': 'Invalid request method'})
+    
+    try:
+        # Get form data
+        name = request.POST.get('name', '').strip()
+        phone_raw = request.POST.get('phone', '').strip()
+        experience = request.POST.get('experience', '').strip()
+        goal = request.POST.get('goal', '').strip()
+        available_time = request.POST.get('available_time', '').strip()
+        
+        # Validate required fields
+        errors = []
+        if not name or len(name) < 2:
+            errors.append('يرجى إدخال اسم صحيح')
+        
+        if not phone_raw:
+            errors.append('يرجى إدخال رقم هاتف')
+        
+        # Clean phone number - remove all non-digit characters
+        phone = ''.join(filter(str.isdigit, phone_raw)) if phone_raw else ''
+        if len(phone) < 8:
+            errors.append('يرجى إدخال رقم هاتف صحيح (8 أرقام على الأقل)')
+        
+        if not experience:
+            errors.append('يرجى اختيار مستوى الخبرة')
+        
+        if not goal or len(goal) < 10:
+            errors.append('يرجى إدخال هدف التدريب (10 أحرف على الأقل)')
+        
+        if errors:
+            error_msg = ' | '.join(errors)
+            return render(request, 'payment.html', {'error_message': error_msg})
+        
+        # Build message with all form data
+        experience_labels = {
+            'beginner': 'مبتدئ',
+            'intermediate': 'متوسط',
+            'advanced': 'متقدم',
+            'expert': 'خبير'
+        }
+        
+        experience_label = experience_labels.get(experience, experience)
+        
+        message = f"""طلب VIP Learning (1-on-1)
+
+الخبرة بالتداول: {experience_label}
+الهدف من التدريب: {goal}"""
+        
+        if available_time:
+            message += f"\nالوقت المتاح للمتابعة: {available_time}"
+        
+        # Build structured notes with all form fields for better data organization
+        notes_parts = [
+            f"نوع الطلب: VIP Learning (1-on-1)",
+            f"الخبرة بالتداول: {experience_label} ({experience})",
+            f"الهدف من التدريب: {goal}",
+        ]
+        if available_time:
+            notes_parts.append(f"الوقت المتاح للمتابعة: {available_time}")
+        
+        notes = "\n".join(notes_parts)
+        
+        # Prepare data for serializer
+        from contacts.serializers import CustomerContactCreateSerializer
+        
+        serializer_data = {
+            'name': name,
+            'phone': phone,
+            'whatsapp': phone,  # Use same cleaned phone as WhatsApp
+            'message': message,
+            'city': '',
+            'address': available_time if available_time else '',  # Store available time in address field
+            'notes': notes,  # Store structured data in notes field
+            # 'goal' field is not included - it requires specific choices that don't apply here
+        }
+        
+        serializer = CustomerContactCreateSerializer(data=serializer_data)
+        
+        if serializer.is_valid():
+            contact = serializer.save()
+            logger.info(f"VIP Learning request submitted successfully: {contact.id} - {name} - {phone}")
+            # Redirect with success message (URL-encoded)
+            success_msg = urllib.parse.quote('تم إرسال طلبك بنجاح! سنتواصل معك قريباً.')
+            return redirect(f'/payment/?success={success_msg}')
+        else:
+            # Handle serializer validation errors
+            error_messages = []
+            for field, field_errors in serializer.errors.items():
+                if isinstance(field_errors, list):
+                    error_messages.extend(field_errors)
+                else:
+                    error_messages.append(str(field_errors))
+            
+            error_msg = ' | '.join(error_messages) if error_messages else 'حدث خطأ أثناء الإرسال'
+            logger.error(f"VIP Learning form validation errors: {serializer.errors}")
+            return render(request, 'payment.html', {'error_message': error_msg})
+            
+    except Exception as e:
+        logger.exception(f"Error processing VIP Learning request: {str(e)}")
+        return render(request, 'payment.html', {'error_message': 'حدث خطأ أثناء الإرسال. يرجى المحاولة مرة أخرى.'})
+
+
+def serve_packages_file(request, filename):
+    """Serve CSS or JS files from the packages directory."""
+    # Get the packages directory path (one level up from backend)
+    packages_dir = settings.BASE_DIR.parent / 'packages'
+    file_path = packages_dir / filename
+    
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            content = f.read()
+        
+        # Determine content type based on file extension
+        if filename.endswith('.css'):
+            content_type = 'text/css'
+        elif filename.endswith('.js'):
+            content_type = 'application/javascript'
+        else:
+            content_type = 'text/plain'
+        
+        from django.http import HttpResponse
+        response = HttpResponse(content, content_type=content_type)
+        response['Cache-Control'] = 'public, max-age=3600'  # Cache for 1 hour
+        return response
+    except FileNotFoundError:
+        from django.http import HttpResponseNotFound
+        return HttpResponseNotFound(f'{filename} not found')
+    except Exception as e:
+        logger.error(f"[Packages] Error serving {filename}: {str(e)}", exc_info=True)
+        from django.http import HttpResponseServerError
+        return HttpResponseServerError(f'Error loading {filename}')
+
+
+@conditional_page(template_files('new_pac/pricing.html'))
+def pricing_page(request):
+    """Render Pricing page from templates/new_pac directory."""
+    return render(request, 'new_pac/pricing.html')
+
+
+@csrf_exempt
+@api_view(['POST'])
+@permission_classes([AllowAny])
+def pricing_contact(request):
+    """Handle contact form submission from pricing page."""
+    from django.http import JsonResponse
+    from contacts.models import CustomerContact
+    
+    try:
+        data = request.data
+        
+        # Extract form data
+        name = data.get('name', '').strip()
+        mobile = data.get('mobile', '').strip()
+        email = data.get('email', '').strip()
+        address = data.get('address', '').strip()
+        message = data.get('message', '').strip()
+        
+        # Validate required fields
+        if not name:
+            return JsonResponse({
+                'success': False,
+                'error': 'الاسم مطلوب'
+            }, status=400)
+        
+        if not mobile:
+            return JsonResponse({
+                'success': False,
+                'error': 'رقم الجوال مطلوب'
+            }, status=400)
+        
+        if not email:
+            return JsonResponse({
+                'success': False,
+                'error': 'البريد الإلكتروني مطلوب'
+            }, status=400)
+        
+        if not message:
+            return JsonResponse({
+                'success': False,
+                'error': 'الرسالة مطلوبة'
+            }, status=400)
+        
+        # Create contact record
+        # Store email in message field if needed, or use notes field
+        full_message = f"البريد الإلكتروني: {email}\n\n{message}"
+        
+        contact = CustomerContact.objects.create(
+            name=name,
+            phone=mobile,
+            whatsapp=mobile,  # Use mobile as whatsapp if not provided separately
+            address=address,
+            message=full_message,
+            notes=f"Email: {email}",  # Store email in notes field
+            landing_page=None  # Not associated with a specific landing page
+        )
+        
+        logger.info(f"[Pricing Contact] New contact created: {name} - {mobile}")
+        
+        return JsonResponse({
+            'success': True,
+            'message': 'تم إرسال رسالتك بنجاح. فريقنا رح يتواصل معك قريباً.'
+        })
+        
+    except Exception as e:
+        logger.error(f"[Pricing Contact] Error processing contact form: {str(e)}", exc_info=True)
+        return JsonResponse({
+            'success': False,
+            'error': 'حدث خطأ أثناء إرسال الرسالة. يرجى المحاولة مرة أخرى.'
+        }, status=500)
+
+
+def serve_new_pac_file(request, filename):
+    """Serve CSS or JS files from the new-pac directory."""
+    # Get the new-pac directory path (one level up from backend)
+    new_pac_dir = settings.BASE_DIR.parent / 'new-pac'
+    file_path = new_pac_dir / filename
+    
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            content = f.read()
+        
+        # Determine content type based on file extension
+        if filename.endswith('.css'):
+            content_type = 'text/css'
+        elif filename.endswith('.js'):
+            content_type = 'application/javascript'
+        else:
+            content_type = 'text/plain'
+        
+        from django.http import HttpResponse
+        response = HttpResponse(content, content_type=content_type)
+        response['Cache-Control'] = 'public, max-age=3600'  # Cache for 1 hour
+        return response
+    except FileNotFoundError:
+        from django.http import HttpResponseNotFound
+        return HttpResponseNotFound(f'{filename} not found')
+    except Exception as e:
+        logger.error(f"[New-Pac] Error serving {filename}: {str(e)}", exc_info=True)
+        from django.http import HttpResponseServerError
+        return HttpResponseServerError(f'Error loading {filename}')
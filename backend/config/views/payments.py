@@ -0,0 +1,654 @@
+"""Lahza checkout: payment initialization, verification, webhook, status stream and success page."""
+from django.shortcuts import render
+from django.core.handlers.asgi import ASGIRequest
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from contacts.models import Payment
+from contacts import idempotency, outbox, payment_events, verification, webhooks
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from django.utils import timezone
+import json
+import logging
+
+from ..lahza_service import ainitialize_transaction, get_client as get_lahza_client, LahzaAPIError, LahzaUnavailableError
+
+logger = logging.getLogger(__name__)
+
+
+def async_csrf_exempt(view_func):
+    """``csrf_exempt`` for coroutine views (Django 4.2's decorator only wraps sync views)."""
+    view_func.csrf_exempt = True
+    return view_func
+
+
+def _json(data, status=200):
+    # Same rendering as DRF's Response: unescaped (Arabic) text
+    return JsonResponse(data, status=status, json_dumps_params={'ensure_ascii': False})
+
+
+def _method_not_allowed(request, allowed):
+    response = _json({'detail': f'Method "{request.method}" not allowed.'}, status=405)
+    response['Allow'] = ', '.join(allowed)
+    return response
+
+
+def _request_data(request):
+    """Body of a JSON or form-encoded request as a dict (what ``request.data`` gave the DRF views)."""
+    content_type = request.META.get('CONTENT_TYPE', '')
+    if content_type.startswith('application/json') or not content_type:
+        try:
+            body = request.body.decode('utf-8')
+            data = json.loads(body) if body else {}
+            return data if isinstance(data, dict) else {}
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            pass
+    return request.POST.dict() if request.method == 'POST' else {}
+
+
+@async_csrf_exempt
+async def initialize_lahza_payment(request):
+    """Initialize a Lahza payment transaction for Black Friday."""
+    if request.method != 'POST':
+        return _method_not_allowed(request, ['POST'])
+    data = _request_data(request)
+    
+    # Repeated submissions (double-clicks, mobile retries) get the original payment back
+    key, explicit = idempotency.request_key(request, data)
+    replay, token = await idempotency.aclaim(key, explicit=explicit)
+    if replay is not None:
+        logger.info(f"[Payment Init] Repeated submission, returning payment {replay.get('reference')}")
+        response = _json(replay)
+        response['Idempotent-Replayed'] = 'true'
+        return response
+    if token is None:
+        user_error = "طلب الدفع السابق ما زال قيد المعالجة. يرجى الانتظار قليلاً."
+        return _json({'success': False, 'error': user_error, 'message': user_error}, status=409)
+    
+    try:
+        response = await _initialize_lahza_payment(request, data)
+    except BaseException:
+        await idempotency.arelease(key, token)
+        raise
+    if response.status_code == 200:
+        await idempotency.astore(key, token, json.loads(response.content))
+    else:
+        await idempotency.arelease(key, token)
+    return response
+
+
+async def _initialize_lahza_payment(request, data):
+    try:
+        # Log incoming data for debugging
+        logger.info(f"[Payment Init] Received data: {data}")
+        
+        email = data.get('email', '').strip()
+        try:
+            amount = float(data.get('amount', 0))
+        except (ValueError, TypeError):
+            amount = 0
+        currency = data.get('currency', 'ILS').strip().upper()  # Default to ILS for backward compatibility
+        first_name = data.get('firstName', '').strip()
+        last_name = data.get('lastName', '').strip()
+        mobile = data.get('mobile', '').strip()
+        # Format mobile number - ensure it starts with + if it doesn't already
+        if mobile and not mobile.startswith('+'):
+            # If it starts with 0, replace with country code (assume Palestine/Israel +970 or +972)
+            if mobile.startswith('0'):
+                mobile = '+970' + mobile[1:]
+            else:
+                # If no country code, assume Palestine
+                mobile = '+970' + mobile
+        
+        # Support legacy fullName field for backward compatibility
+        full_name = data.get('fullName', '').strip()
+        offer_type = data.get('offerType', 'bundle')
+        # Determine source from URL path if not provided in data
+        source = data.get('source', None)
+        if not source:
+            # Try to determine from request path
+            if 'ramadan' in request.path:
+                source = 'ramadan'
+            elif 'packages' in request.path:
+                source = 'packages'
+            elif 'checkout' in request.path:
+                source = 'checkout'
+            elif 'pricing' in request.path:
+                source = 'pricing'
+            elif 'payment' in request.path:
+                source = 'payment'
+            else:
+                source = 'black_friday'  # Default fallback
+        offer_name = data.get('offerName', '').strip()
+        
+        # Validate required fields
+        if not email:
+            return _json({
+                'success': False,
+                'error': 'البريد الإلكتروني مطلوب'
+            }, status=400)
+        
+        if not amount or amount <= 0:
+            return _json({
+                'success': False,
+                'error': 'المبلغ مطلوب ويجب أن يكون أكبر من الصفر'
+            }, status=400)
+        
+        # If firstName/lastName not provided, try to split fullName (backward compatibility)
+        if not first_name and not last_name and full_name:
+            name_parts = full_name.split(' ', 1)
+            first_name = name_parts[0] if name_parts else ''
+            last_name = name_parts[1] if len(name_parts) > 1 else ''
+        
+        # Use full_name for customer_name if first_name and last_name are empty
+        customer_name = f"{first_name} {last_name}".strip() if (first_name or last_name) else full_name
+        
+        # Convert amount to minor units (cents for USD)
+        amount_minor = int(amount * 100)
+        
+        # Get recaptcha token if provided (before using it)
+        recaptcha_token = data.get('recaptchaToken', '')
+        
+        # Generate reference
+        import uuid
+        if source == 'packages':
+            prefix = 'PK'
+        elif source == 'checkout':
+            prefix = 'CK'
+        elif source == 'pricing':
+            prefix = 'PR'
+        elif source == 'payment':
+            prefix = 'PM'
+        elif source == 'ramadan':
+            prefix = 'RM'
+        else:
+            prefix = 'BF'
+        reference = f"{prefix}-{uuid.uuid4().hex[:12].upper()}"
+        
+        # Create payment record FIRST (before initializing with Lahza)
+        from contacts.models import Payment
+        
+        # Use full_name for customer_name if first_name and last_name are empty
+        if not customer_name or customer_name.strip() == '':
+            customer_name = f"{first_name} {last_name}".strip() if (first_name or last_name) else full_name
+        if not customer_name or customer_name.strip() == '':
+            customer_name = 'Unknown'
+        
+        # Get address from form data
+        address = data.get('address', '').strip() if data.get('address') else None
+        
+        # Create payment record with pending status
+        try:
+            payment = await Payment.objects.acreate(
+                reference=reference,
+                customer_name=customer_name,
+                customer_email=email,
+                first_name=first_name if first_name else None,
+                last_name=last_name if last_name else None,
+                mobile=mobile if mobile else None,
+                address=address,
+                amount=amount,
+                currency=currency.upper(),
+                offer_type=offer_type,
+                offer_name=offer_name,
+                source=source,
+                status='pending',
+                metadata={
+                    'offer_type': offer_type,
+                    'source': source,
+                    'offer_name': offer_name,
+                    'recaptcha_token': recaptcha_token if recaptcha_token else None,
+                    'form_data': {
+                        'firstName': first_name,
+                        'lastName': last_name,
+                        'mobile': mobile,
+                        'email': email,
+                        'address': address or '',
+                    }
+                }
+            )
+        except Exception as payment_error:
+            logger.error(f"[Payment] Error creating payment record: {str(payment_error)}", exc_info=True)
+            raise
+        
+        logger.info(f"[Payment] Payment record created: {reference} for {email}, amount: {amount} {currency}")
+        
+        # Build callback URL based on source
+        if source == 'checkout':
+            callback_url = request.build_absolute_uri(f'/checkout/payment/verify/?reference={reference}')
+        elif source == 'packages':
+            callback_url = request.build_absolute_uri(f'/packages/payment/verify/?reference={reference}')
+        elif source == 'pricing':
+            callback_url = request.build_absolute_uri(f'/pricing/payment/verify/?reference={reference}')
+        elif source == 'payment':
+            callback_url = request.build_absolute_uri(f'/payment/payment/verify/?reference={reference}')
+        elif source == 'ramadan':
+            callback_url = request.build_absolute_uri(f'/ramadan/payment/verify/?reference={reference}')
+        else:
+            callback_url = request.build_absolute_uri(f'/black-friday/payment/callback/?reference={reference}')
+        
+        # Initialize transaction with Lahza FIRST (don't wait for reCAPTCHA)
+        transaction_data = await ainitialize_transaction(
+            email=email,
+            amount_minor=amount_minor,
+            currency=currency.upper(),  # Use the currency from the plan
+            reference=reference,
+            first_name=first_name,
+            last_name=last_name,
+            mobile=mobile if mobile else None,
+            metadata={
+                'offer_type': offer_type,
+                'source': source,
+                'offer_name': offer_name,
+            },
+            callback_url=callback_url,
+        )
+        
+        # Update payment record with transaction ID if available
+        if transaction_data.get('id'):
+            payment.transaction_id = str(transaction_data.get('id'))
+            await payment.asave(update_fields=['transaction_id', 'updated_at'])
+        
+        # Return payment URL immediately (reCAPTCHA verification is now skipped to speed up payment initialization)
+        return _json({
+            'success': True,
+            'reference': reference,
+            'authorization_url': transaction_data.get('authorization_url'),
+            'access_code': transaction_data.get('access_code'),
+        })
+        
+    except LahzaUnavailableError as e:
+        # Circuit breaker is open: fail fast instead of waiting on a degraded gateway
+        logger.error(f"[Lahza] Payment initialization skipped: {e}")
+        user_error = "خدمة الدفع غير متاحة مؤقتاً. يرجى المحاولة مرة أخرى بعد قليل."
+        return _json({
+            'success': False,
+            'error': user_error,
+            'message': user_error
+        }, status=503)
+    except LahzaAPIError as e:
+        error_message = str(e)
+        logger.error(f"[Lahza] Payment initialization error: {error_message}")
+        
+        # Provide user-friendly error messages in Arabic
+        if "Network is unreachable" in error_message or "Failed to establish" in error_message:
+            user_error = "تعذر الاتصال بخدمة الدفع. يرجى التحقق من اتصالك بالإنترنت والمحاولة مرة أخرى."
+        elif "timeout" in error_message.lower():
+            user_error = "انتهت مهلة طلب خدمة الدفع. يرجى المحاولة مرة أخرى."
+        elif "Connection" in error_message or "connection" in error_message.lower():
+            user_error = "تعذر الاتصال بخدمة الدفع. يرجى المحاولة لاحقاً."
+        else:
+            # For other errors, show a generic message (don't expose technical details)
+            user_error = "تعذر تهيئة الدفع. يرجى المحاولة مرة أخرى أو التواصل مع الدعم إذا استمرت المشكلة."
+        
+        return _json({
+            'success': False,
+            'error': user_error,
+            'message': user_error
+        }, status=400)
+    except Exception as e:
+        error_message = str(e)
+        logger.exception(f"[Lahza] Unexpected error during payment initialization: {error_message}")
+        # Log the full traceback for debugging
+        import traceback
+        logger.error(f"[Lahza] Full traceback: {traceback.format_exc()}")
+        # Provide user-friendly error message in Arabic
+        user_error = "حدث خطأ أثناء معالجة الدفع. يرجى المحاولة مرة أخرى."
+        if settings.DEBUG:
+            user_error = f"حدث خطأ: {error_message}"
+        
+        return _json({
+            'success': False,
+            'error': user_error,
+            'message': user_error
+        }, status=500)
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def lahza_client_stats(request):
+    """Latency, retry and circuit breaker counters of this worker's Lahza client (staff only)"""
+    return Response(get_lahza_client().stats())
+
+
+@async_csrf_exempt
+async def lahza_webhook(request):
+    """
+    Webhook endpoint for Lahza to send payment status updates.
+
+    The event is stored in the webhook inbox and acknowledged immediately;
+    verification, the payment update and the receipt happen in the background
+    (contacts/webhooks.py). Redeliveries are acknowledged without reprocessing.
+    """
+    try:
+        # Get webhook data from request body (JSON, or form data if JSON parsing fails)
+        webhook_data = _request_data(request)
+        reference, status_value = webhooks.parse_event(webhook_data)
+        
+        if not reference:
+            logger.warning(f"[Lahza Webhook] No reference found in webhook data: {webhook_data}")
+            return JsonResponse({
+                'success': False,
+                'error': 'Reference is required'
+            }, status=400)
+        
+        event, created = await webhooks.record_event(webhook_data, reference, status_value)
+        logger.info(f"[Lahza Webhook] {'Received' if created else 'Duplicate'} webhook for reference: {reference}, status: {status_value}")
+        
+        return JsonResponse({
+            'success': True,
+            'message': 'Webhook received' if created else 'Webhook already received',
+            'reference': reference,
+            'status': status_value,
+        })
+        
+    except Exception as e:
+        error_message = str(e)
+        logger.exception(f"[Lahza Webhook] Error recording webhook: {error_message}")
+        return JsonResponse({
+            'success': False,
+            'error': error_message if settings.DEBUG else 'Error processing webhook'
+        }, status=500)
+
+
+@async_csrf_exempt
+async def verify_lahza_payment(request):
+    """Verify a Lahza payment transaction."""
+    if request.method not in ('GET', 'POST', 'HEAD', 'OPTIONS'):
+        return _method_not_allowed(request, ['GET', 'POST'])
+    data = _request_data(request)
+    # Get reference from query params or request data
+    reference = request.GET.get('reference') or data.get('reference')
+    try:
+        if not reference:
+            logger.warning("[Payment] No reference provided in verification request")
+            return _json({
+                'success': False,
+                'status': 'error',
+                'error': 'Payment reference is required',
+                'message': 'Payment reference is required'
+            }, status=400)
+        
+        # Get or create payment record
+        try:
+            payment = await Payment.objects.aget(reference=reference)
+        except Payment.DoesNotExist:
+            # If payment doesn't exist, create it (might happen if verification is called before initialization)
+            logger.warning(f"[Payment] Payment record not found for reference: {reference}, creating new record")
+            try:
+                # Try to get form data from request if available
+                first_name = data.get('firstName', '')
+                last_name = data.get('lastName', '')
+                email = data.get('email', 'unknown@example.com')
+                mobile = data.get('mobile', '')
+                customer_name = f"{first_name} {last_name}".strip() if (first_name or last_name) else 'Unknown'
+                
+                payment = await Payment.objects.acreate(
+                    reference=reference,
+                    customer_name=customer_name,
+                    customer_email=email,
+                    first_name=first_name if first_name else None,
+                    last_name=last_name if last_name else None,
+                    mobile=mobile if mobile else None,
+                    amount=0,
+                    currency='ILS',
+                    status='pending'
+                )
+            except Exception as e:
+                logger.error(f"[Payment] Error creating payment record: {str(e)}")
+                return _json({
+                    'success': False,
+                    'error': f'Error creating payment record: {str(e)}'
+                }, status=500)
+        
+        # Already settled (by an earlier verification or the webhook): answer from the database
+        settled = payment_events.event_payload(payment)
+        if settled is not None:
+            return _json(settled)
+        
+        # Verify transaction with Lahza (coalesced with concurrent checks of this reference)
+        try:
+            transaction_data = await verification.averify(reference)
+            logger.info(f"[Payment] Lahza verification response received for {reference}")
+        except LahzaAPIError as e:
+            logger.warning(f"[Lahza] LahzaAPIError verifying transaction (reference: {reference}): {str(e)}")
+            # Don't mark as failed immediately - might be a temporary network issue or transaction not ready
+            # Return pending status so frontend can retry
+            return _json({
+                'success': False,
+                'status': 'pending',
+                'message': 'Payment is still being processed. Please wait...',
+                'reference': reference,
+            })
+        except Exception as e:
+            logger.error(f"[Lahza] Unexpected error verifying transaction (reference: {reference}): {str(e)}", exc_info=True)
+            # Return pending status so frontend can retry
+            return _json({
+                'success': False,
+                'status': 'pending',
+                'message': 'Unable to verify payment status. Please try again.',
+                'reference': reference,
+            })
+        
+        # Check transaction status - Lahza may return different status values
+        transaction_status = transaction_data.get('status', '').lower()
+        
+        # Log the full transaction data for debugging
+        logger.info(f"[Payment] Transaction status check - reference: {reference}, status: {transaction_status}")
+        logger.info(f"[Payment] Full transaction_data keys: {list(transaction_data.keys()) if isinstance(transaction_data, dict) else 'Not a dict'}")
+        
+        # Also check if status is nested in 'data' object (some API responses have nested structure)
+        if not transaction_status and isinstance(transaction_data, dict):
+            nested_status = transaction_data.get('data', {}).get('status', '') if isinstance(transaction_data.get('data'), dict) else ''
+            if nested_status:
+                transaction_status = str(nested_status).lower()
+                logger.info(f"[Payment] Found nested status: {transaction_status}")
+        
+        # Update payment record with Lahza response (ensure it's JSON serializable)
+        try:
+            # Convert to dict if it's not already, and ensure it's JSON serializable
+            if isinstance(transaction_data, dict):
+                # Test JSON serialization
+                json.dumps(transaction_data)
+                payment.lahza_response = transaction_data
+            else:
+                payment.lahza_response = {'data': str(transaction_data)}
+        except (TypeError, ValueError) as e:
+            logger.warning(f"[Payment] Error serializing transaction_data: {str(e)}")
+            payment.lahza_response = {'error': 'Could not serialize transaction data', 'raw': str(transaction_data)}
+        
+        # Check for success status - Lahza may return: 'success', 'completed', 'paid', 'approved', 'successful'
+        success_statuses = ['success', 'completed', 'paid', 'approved', 'successful']
+        is_success = transaction_status in success_statuses
+        
+        if is_success:
+            # Update payment details from transaction data if available
+            try:
+                if 'amount' in transaction_data:
+                    # Amount might be in cents or dollars, check the value
+                    amount_value = transaction_data.get('amount', 0)
+                    if isinstance(amount_value, (int, float)):
+                        if amount_value > 1000:  # Likely in cents
+                            payment.amount = amount_value / 100
+                        else:
+                            payment.amount = amount_value
+                
+                if 'currency' in transaction_data:
+                    currency_value = transaction_data.get('currency', 'ILS')
+                    if currency_value:
+                        payment.currency = str(currency_value)[:3]  # Ensure max 3 chars
+                
+                if 'customer' in transaction_data:
+                    customer_data = transaction_data.get('customer', {})
+                    if isinstance(customer_data, dict):
+                        if 'email' in customer_data:
+                            payment.customer_email = customer_data.get('email', payment.customer_email)
+                        if 'name' in customer_data:
+                            payment.customer_name = customer_data.get('name', payment.customer_name)
+            except Exception as e:
+                logger.warning(f"[Payment] Error updating payment details: {str(e)}", exc_info=True)
+            
+            # Mark payment as successful (this saves the payment and extracts card info)
+            try:
+                # Log transaction_data structure before processing
+                logger.info(f"[Payment] Transaction data structure: {list(transaction_data.keys()) if isinstance(transaction_data, dict) else type(transaction_data)}")
+                logger.info(f"[Payment] Full transaction_data: {transaction_data}")
+                
+                # The receipt is queued in the same transaction (sent by the email outbox worker)
+                if await Payment.objects.filter(pk=payment.pk, status='success').aexists():
+                    # A concurrent verification or the webhook got there first
+                    await payment.arefresh_from_db()
+                else:
+                    # Only changed fields are written: pass on the details set above
+                    await sync_to_async(outbox.mark_success_and_enqueue_receipt)(
+                        payment, transaction_data,
+                        extra_fields=('amount', 'currency', 'customer_email', 'customer_name'),
+                    )
+            except Exception as e:
+                logger.error(f"[Payment] Error marking payment as success: {str(e)}", exc_info=True)
+                # Try to save manually (and still queue the receipt)
+                payment.status = 'success'
+                if not payment.paid_at:
+                    payment.paid_at = timezone.now()
+                await sync_to_async(outbox.save_and_enqueue_receipt)(payment)
+            
+            logger.info(f"[Payment] Payment verified successfully: {reference}")
+            
+            # Safely get amount - handle None or Decimal
+            try:
+                amount_value = float(payment.amount) if payment.amount else 0.0
+            except (TypeError, ValueError):
+                amount_value = 0.0
+            
+            return _json({
+                'success': True,
+                'status': 'success',
+                'message': 'Payment verified successfully',
+                'transaction_id': transaction_data.get('id') or payment.transaction_id or '',
+                'reference': reference,
+                'amount': amount_value,
+                'currency': payment.currency or 'USD',
+                'email': payment.customer_email or '',
+            })
+        elif transaction_status == 'pending':
+            # Payment is still pending
+            return _json({
+                'success': False,
+                'status': 'pending',
+                'message': 'Payment is still being processed',
+                'reference': reference,
+            })
+        else:
+            # Mark payment as failed
+            await sync_to_async(payment.mark_as_failed)(f'Payment status: {transaction_status}')
+            
+            logger.warning(f"[Payment] Payment verification failed: {reference}, status: {transaction_status}")
+            
+            return _json({
+                'success': False,
+                'status': transaction_status,
+                'error': f'Payment status: {transaction_status}',
+                'reference': reference,
+            })
+        
+    except LahzaAPIError as e:
+        logger.error(f"[Lahza] Payment verification error: {str(e)}")
+        
+        # Try to update payment record if it exists
+        try:
+            payment = await Payment.objects.aget(reference=reference)
+            await sync_to_async(payment.mark_as_failed)(str(e))
+        except Exception:
+            pass
+        
+        return _json({
+            'success': False,
+            'error': str(e)
+        }, status=400)
+    except Exception as e:
+        error_message = str(e)
+        logger.exception(f"[Lahza] Unexpected error during payment verification: {error_message}")
+        
+        # Try to update payment record if it exists
+        try:
+            payment = await Payment.objects.aget(reference=reference)
+            await sync_to_async(payment.mark_as_failed)(f'Unexpected error: {error_message}')
+        except Payment.DoesNotExist:
+            pass
+        except Exception as update_error:
+            logger.warning(f"[Payment] Error updating payment record: {str(update_error)}")
+        
+        # Return more detailed error in development, generic in production
+        error_detail = error_message if settings.DEBUG else 'An error occurred while verifying payment'
+        
+        return _json({
+            'success': False,
+            'status': 'error',
+            'error': error_detail,
+            'message': 'An error occurred while verifying payment. Please try again or contact support.',
+        }, status=500)
+
+
+async def payment_status_stream(request, reference):
+    """
+    Server-Sent Events stream that pushes the verification result of a payment
+    as soon as it settles (replaces polling the verify endpoint).
+    """
+    if request.method != 'GET':
+        return _method_not_allowed(request, ['GET'])
+    if not isinstance(request, ASGIRequest):
+        # Under WSGI Django reads the whole stream before sending any of it: refuse, so the
+        # page closes its EventSource and polls the verify endpoint instead
+        return _json({'detail': 'Payment events need the ASGI application.'}, status=503)
+    try:
+        payment = await Payment.objects.aget(reference=reference)
+    except Payment.DoesNotExist:
+        raise Http404('Payment not found')
+    
+    response = StreamingHttpResponse(
+        payment_events.stream(reference, initial=payment_events.event_payload(payment)),
+        content_type='text/event-stream',
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # nginx: flush each event instead of buffering
+    return response
+
+
+def payment_success(request, reference=None):
+    """Display payment success page"""
+    from contacts.models import Payment
+    
+    payment = None
+    customer_name = None
+    
+    if reference:
+        try:
+            payment = Payment.objects.get(reference=reference)
+            # Get customer name from payment
+            if payment.first_name and payment.last_name:
+                customer_name = f"{payment.first_name} {payment.last_name}"
+            elif payment.customer_name:
+                customer_name = payment.customer_name
+        except Payment.DoesNotExist:
+            pass
+    
+    # If no reference provided, try to get from query params
+    if not payment:
+        reference = request.GET.get('reference')
+        if reference:
+            try:
+                payment = Payment.objects.get(reference=reference)
+                if payment.first_name and payment.last_name:
+                    customer_name = f"{payment.first_name} {payment.last_name}"
+                elif payment.customer_name:
+                    customer_name = payment.customer_name
+            except Payment.DoesNotExist:
+                pass
+    
+    context = {
+        'payment': payment,
+        'customer_name': customer_name,
+    }
+    
+    return render(request, 'payment_success.html', context)
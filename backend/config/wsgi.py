@@ -14,3 +14,20 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 
 application = get_wsgi_application()
+
+# Load the landing page short codes once per worker instead of on the first visit
+try:
+    from contacts import short_codes
+    short_codes.warm()
+except Exception as exc:  # e.g. database not migrated yet
+    import logging
+    logging.getLogger(__name__).warning("[Short Codes] Warm-up skipped: %s", exc)
+
+# Resolve and load the instructions PDF and compile the receipt templates once per worker
+try:
+    from config import assets, receipts
+    assets.warm()
+    receipts.warm()
+except Exception as exc:
+    import logging
+    logging.getLogger(__name__).warning("[Receipts] Warm-up skipped: %s", exc)
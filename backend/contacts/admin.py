@@ -7,7 +7,7 @@ import csv
 import json
 import requests
 
-from .models import CustomerContact, Payment, BlackFridaySettings, BlackFridayContact, LandingPage, RamadanContact
+from .models import CustomerContact, Payment, BlackFridaySettings, BlackFridayContact, LandingPage, RamadanContact, EmailOutbox, WebhookEvent
 
 # Set admin site name to fxglobal
 admin.site.site_header = "FX Global Administration"
@@ -343,20 +343,26 @@ class PaymentAdmin(admin.ModelAdmin):
     
     def mark_as_success(self, request, queryset):
         """Mark selected payments as successful"""
+        from . import verification
+        
         count = 0
         for payment in queryset:
             if payment.status != 'success':
                 payment.mark_as_success()
+                verification.forget(payment.reference)
                 count += 1
         self.message_user(request, f'{count} payment(s) marked as successful.')
     mark_as_success.short_description = "Mark selected payments as successful"
     
     def mark_as_failed(self, request, queryset):
         """Mark selected payments as failed"""
+        from . import verification
+        
         count = 0
         for payment in queryset:
             if payment.status != 'failed':
                 payment.mark_as_failed('Manually marked as failed by admin')
+                verification.forget(payment.reference)
                 count += 1
         self.message_user(request, f'{count} payment(s) marked as failed.')
     mark_as_failed.short_description = "Mark selected payments as failed"
@@ -627,3 +633,73 @@ class RamadanContactAdmin(admin.ModelAdmin):
         if obj:  # editing an existing object
             return self.readonly_fields + ['id']
         return self.readonly_fields
+
+
+@admin.register(EmailOutbox)
+class EmailOutboxAdmin(admin.ModelAdmin):
+    list_display = ['kind', 'recipient', 'payment', 'status', 'attempts', 'next_attempt_at', 'created_at', 'sent_at']
+    list_filter = ['status', 'kind', 'created_at']
+    search_fields = ['recipient', 'payment__reference', 'last_error']
+    readonly_fields = ['kind', 'payment', 'recipient', 'attempts', 'locked_until', 'last_error', 'created_at', 'sent_at']
+    date_hierarchy = 'created_at'
+    actions = ['retry_now']
+    
+    fieldsets = (
+        ('Email', {
+            'fields': ('kind', 'payment', 'recipient')
+        }),
+        ('Delivery', {
+            'fields': ('status', 'attempts', 'next_attempt_at', 'locked_until', 'last_error')
+        }),
+        ('Timestamps', {
+            'fields': ('created_at', 'sent_at')
+        }),
+    )
+    
+    def retry_now(self, request, queryset):
+        """Queue selected emails (e.g. dead-lettered ones) for immediate sending"""
+        from . import outbox
+        
+        count = queryset.exclude(status='sent').update(
+            status='pending', attempts=0, next_attempt_at=timezone.now(), locked_until=None,
+        )
+        outbox.wake()
+        self.message_user(request, f'{count} email(s) queued for sending.')
+    retry_now.short_description = "Retry selected emails now"
+
+
+@admin.register(WebhookEvent)
+class WebhookEventAdmin(admin.ModelAdmin):
+    list_display = ['reference', 'payment_status', 'status', 'deliveries', 'attempts', 'received_at', 'processed_at']
+    list_filter = ['status', 'payment_status', 'received_at']
+    search_fields = ['reference', 'last_error']
+    readonly_fields = ['reference', 'payment_status', 'payload', 'deliveries', 'attempts', 'locked_until', 'last_error', 'received_at', 'processed_at']
+    date_hierarchy = 'received_at'
+    actions = ['retry_now']
+    
+    fieldsets = (
+        ('Event', {
+            'fields': ('reference', 'payment_status', 'payload', 'deliveries')
+        }),
+        ('Processing', {
+            'fields': ('status', 'attempts', 'next_attempt_at', 'locked_until', 'last_error')
+        }),
+        ('Timestamps', {
+            'fields': ('received_at', 'processed_at')
+        }),
+    )
+    
+    def retry_now(self, request, queryset):
+        """Queue selected events (e.g. dead-lettered ones) for immediate processing"""
+        from . import verification, webhooks
+        
+        queryset = queryset.exclude(status='processed')
+        for reference in queryset.values_list('reference', flat=True).distinct():
+            # Re-verify with Lahza rather than reuse the cached answer
+            verification.forget(reference)
+        count = queryset.update(
+            status='pending', attempts=0, next_attempt_at=timezone.now(), locked_until=None,
+        )
+        webhooks.queue.wake()
+        self.message_user(request, f'{count} webhook event(s) queued for processing.')
+    retry_now.short_description = "Process selected events now"
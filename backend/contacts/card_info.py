@@ -0,0 +1,124 @@
+"""
+Card details (brand, last 4 digits, expiry) from a Lahza transaction payload.
+
+Lahza, and the formats it used before, put the card in different places:
+``authorization`` itself or ``authorization.card``, ``card``,
+``payment_method.card``, ``paymentDetails.card``, or flat ``cardBrand`` /
+``last4`` / ``cardNumber`` keys on the transaction. Which container is used
+and which key wins for each field are declared in the tables below, and
+``extract()`` resolves them in a single pass over the payload.
+
+The precedence is the one ``Payment.mark_as_success`` always had: the first
+container key present decides (even when it holds no card), then the first
+non-empty key of each field.
+"""
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# Keys that mark ``authorization`` itself as the card (Lahza's current format)
+AUTHORIZATION_CARD_KEYS = ('last4', 'brand', 'card_type')
+
+# Flat keys on the transaction: (card key, transaction keys); present keys count even if empty
+FLAT_KEYS: Tuple[Tuple[str, Tuple[str, ...]], ...] = (
+    ('type', ('cardType',)),
+    ('brand', ('cardBrand',)),
+    ('last4', ('last4', 'last_4', 'lastFour')),
+)
+FLAT_TRIGGER_KEYS = ('cardType', 'cardBrand', 'cardNumber', 'last4', 'last_4', 'lastFour')
+
+
+def _pad_month(value: str) -> str:
+    return ('0' + value if len(value) == 1 else value)[:2]
+
+
+def _full_year(value: str) -> str:
+    return ('20' + value if len(value) == 2 else value)[:4]
+
+
+# (model fields, card keys in order of precedence, normalizer); the first non-empty key wins
+FIELDS: Tuple[Tuple[Tuple[str, ...], Tuple[str, ...], Callable[[str], str]], ...] = (
+    (('card_brand', 'card_type'), ('brand', 'card_type', 'type'), lambda value: value[:50]),
+    (('last_four_digits',), ('last4', 'last_4', 'last_four'), lambda value: value[:4]),
+    (('card_expiry_month',), ('exp_month', 'expiry_month', 'expMonth'), _pad_month),
+    (('card_expiry_year',), ('exp_year', 'expiry_year', 'expYear'), _full_year),
+)
+
+CARD_FIELDS = ('card_type', 'card_brand', 'last_four_digits', 'card_expiry_month', 'card_expiry_year')
+
+
+def _authorization_card(authorization: Any) -> Optional[Dict[str, Any]]:
+    if not isinstance(authorization, dict):
+        return None
+    if any(key in authorization for key in AUTHORIZATION_CARD_KEYS):
+        return authorization
+    return authorization.get('card') if 'card' in authorization else None
+
+
+def _nested_card(container: Any) -> Optional[Dict[str, Any]]:
+    return container.get('card') if isinstance(container, dict) and 'card' in container else None
+
+
+# Transaction key -> how to get the card out of it; the first key present in the payload is used
+CONTAINERS: Tuple[Tuple[str, Callable[[Any], Optional[Dict[str, Any]]]], ...] = (
+    ('authorization', _authorization_card),
+    ('card', lambda card: card),
+    ('payment_method', _nested_card),
+    ('paymentDetails', _nested_card),
+)
+
+
+def _card_number_last4(value: Any) -> Optional[str]:
+    number = str(value)
+    return number[-4:] if len(number) >= 4 else None
+
+
+def _flat_card(transaction_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    if not any(key in transaction_data for key in FLAT_TRIGGER_KEYS):
+        return None
+    card = {}
+    for card_key, keys in FLAT_KEYS:
+        for key in keys:
+            if key in transaction_data:
+                card[card_key] = transaction_data[key]
+                break
+    if 'last4' not in card and 'cardNumber' in transaction_data:
+        last4 = _card_number_last4(transaction_data['cardNumber'])
+        if last4:
+            card['last4'] = last4
+    return card
+
+
+def find_card(transaction_data: Any) -> Optional[Dict[str, Any]]:
+    """The dict holding the card details in ``transaction_data``, if any."""
+    if not isinstance(transaction_data, dict):
+        return None
+    card = None
+    for key, getter in CONTAINERS:
+        if key in transaction_data:
+            card = getter(transaction_data[key])
+            break
+    if not card:
+        card = _flat_card(transaction_data)
+    return card if card and isinstance(card, dict) else None
+
+
+def extract(transaction_data: Any) -> Dict[str, str]:
+    """Card model fields (see ``CARD_FIELDS``) found in ``transaction_data``; absent ones are left out."""
+    card = find_card(transaction_data)
+    if card is None:
+        return {}
+    values = {}
+    for fields, keys, normalize in FIELDS:
+        for key in keys:
+            value = card.get(key)
+            if value:
+                normalized = normalize(str(value))
+                for field in fields:
+                    values[field] = normalized
+                break
+    if 'last_four_digits' not in values and 'cardNumber' in card:
+        last4 = _card_number_last4(card['cardNumber'])
+        if last4:
+            values['last_four_digits'] = last4
+    return values
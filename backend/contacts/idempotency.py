@@ -0,0 +1,103 @@
+"""
+Idempotent payment initialization.
+
+Double-clicks and mobile retries on the pay buttons used to create a new
+``Payment`` and a new Lahza transaction per request. ``initialize_lahza_payment``
+now keys each submission:
+
+- by the client's ``Idempotency-Key`` header when it sends one;
+- otherwise by a hash of the submitted form (customer, amount, offer) and the
+  endpoint, so an identical resubmission maps to the same key.
+
+The first request for a key claims it (``cache.add``) and does the work; its
+successful response is stored for ``PAYMENT_IDEMPOTENCY_TTL`` seconds and
+replayed to repeats without a database insert or a Lahza call. A repeat that
+arrives while the first is still running waits for its response. Failed
+attempts aren't stored, so the customer can simply retry.
+
+A form-derived key is only replayed while its payment is still pending: once
+that payment is paid or failed, the same form starts a new one.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import time
+import uuid
+from typing import Any, Dict, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Payment
+
+logger = logging.getLogger(__name__)
+
+HEADER = 'HTTP_IDEMPOTENCY_KEY'
+
+# Form fields that identify a submission (a fresh reCAPTCHA token doesn't make it a new one)
+FORM_FIELDS = ('email', 'amount', 'currency', 'firstName', 'lastName', 'fullName', 'mobile', 'address', 'offerType', 'offerName', 'source')
+
+POLL_INTERVAL = 0.05
+
+
+def _setting(name: str, default):
+    return getattr(settings, name, default)
+
+
+def request_key(request, data: Dict[str, Any]) -> Tuple[str, bool]:
+    """``(key, explicit)``: the key of this submission and whether the client sent it."""
+    header = request.META.get(HEADER, '').strip()
+    if header:
+        material, explicit = f'{request.path}\n{header[:255]}', True
+    else:
+        form = {name: str(data.get(name, '')).strip().lower() for name in FORM_FIELDS}
+        material, explicit = f'{request.path}\n{json.dumps(form, sort_keys=True)}', False
+    return hashlib.sha256(material.encode('utf-8')).hexdigest(), explicit
+
+
+def _result_key(key: str) -> str:
+    return f'payment_idempotency:result:{key}'
+
+
+def _lock_key(key: str) -> str:
+    return f'payment_idempotency:lock:{key}'
+
+
+async def _still_pending(response: Dict[str, Any]) -> bool:
+    return await Payment.objects.filter(reference=response.get('reference'), status='pending').aexists()
+
+
+async def aclaim(key: str, *, explicit: bool) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    """
+    ``(stored response, None)`` for a repeat, ``(None, token)`` when this
+    request should initialize the payment, ``(None, None)`` when the first
+    request for the key is still running after ``PAYMENT_IDEMPOTENCY_LOCK_SECONDS``.
+    """
+    lock_seconds = _setting('PAYMENT_IDEMPOTENCY_LOCK_SECONDS', 30)
+    deadline = time.monotonic() + lock_seconds
+    while True:
+        stored = await cache.aget(_result_key(key))
+        if stored is not None:
+            if explicit or await _still_pending(stored):
+                return stored, None
+            await cache.adelete(_result_key(key))
+        token = uuid.uuid4().hex
+        if await cache.aadd(_lock_key(key), token, lock_seconds):
+            return None, token
+        if time.monotonic() >= deadline:
+            return None, None
+        await asyncio.sleep(POLL_INTERVAL)
+
+
+async def astore(key: str, token: str, response: Dict[str, Any]) -> None:
+    """Keep the successful response of the claiming request for its repeats."""
+    await cache.aset(_result_key(key), response, _setting('PAYMENT_IDEMPOTENCY_TTL', 600))
+    await arelease(key, token)
+
+
+async def arelease(key: str, token: str) -> None:
+    if await cache.aget(_lock_key(key)) == token:
+        await cache.adelete(_lock_key(key))
@@ -0,0 +1,39 @@
+"""
+Django management command to pre-render landing pages to static HTML.
+Usage: python manage.py export_landing_snapshots [--force] [--publish-dir PATH]
+"""
+from django.core.management.base import BaseCommand
+
+from config.snapshots import export_snapshots, snapshot_root
+
+
+class Command(BaseCommand):
+    help = 'Render every active landing page and the marketing pages to static HTML for Caddy to serve'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Re-render every page even if its inputs did not change',
+        )
+        parser.add_argument(
+            '--publish-dir',
+            default=None,
+            help='Output directory (defaults to SNAPSHOT_ROOT)',
+        )
+
+    def handle(self, *args, **options):
+        root = options['publish_dir'] or snapshot_root()
+        result = export_snapshots(force=options['force'], root=root)
+
+        for path in result['exported']:
+            self.stdout.write(f'✅ Exported: {path}')
+        for path in result['removed']:
+            self.stdout.write(self.style.WARNING(f'🗑️  Removed: {path}'))
+        for path in result['failed']:
+            self.stdout.write(self.style.ERROR(f'❌ Failed: {path}'))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"\n✅ {len(result['exported'])} exported, {len(result['skipped'])} unchanged, "
+            f"{len(result['removed'])} removed, {len(result['failed'])} failed → {root}"
+        ))
@@ -0,0 +1,184 @@
+"""
+Django management command to load-test the payment flow end to end against a local fake Lahza.
+Usage: python manage.py loadtest_payments [--payments 200] [--concurrency 20] [--latency 0.15] [--jitter 0.05] [--error-rate 0.02] [--decline-rate 0.1] [--no-webhook]
+
+Each virtual customer goes initialize -> callback verify -> webhook through the
+real views (in-process ASGI requests, every middleware included), against a
+``config.fake_lahza`` server started on a free port. Runs on a throwaway copy
+of the database (created and migrated like the test runner does) with the
+locmem email backend, so nothing reaches the real database, Lahza or
+customers. Reports p50/p95/p99 latency per step, throughput, and database
+writes per payment, counted after the webhook inbox and receipt outbox drained.
+"""
+import asyncio
+import json
+import os
+import re
+import statistics
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict
+
+from django.core.management.base import BaseCommand
+from django.db import connection, connections
+from django.db.backends.signals import connection_created
+from django.test import AsyncClient, override_settings
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from config.fake_lahza import FakeLahzaServer
+
+WRITE_RE = re.compile(r'^\s*(INSERT\s+INTO|UPDATE|DELETE\s+FROM)\s+"?(\w+)"?', re.IGNORECASE)
+
+
+class WriteCounter:
+    """``execute_wrapper`` counting INSERT/UPDATE/DELETE statements per table, across threads."""
+
+    def __init__(self):
+        self.counts = Counter()
+        self._lock = threading.Lock()
+
+    def __call__(self, execute, sql, params, many, context):
+        match = WRITE_RE.match(sql)
+        if match:
+            with self._lock:
+                self.counts[(match.group(1).split()[0].upper(), match.group(2))] += 1
+        return execute(sql, params, many, context)
+
+    def install(self, sender=None, connection=None, **kwargs):
+        if self not in connection.execute_wrappers:
+            connection.execute_wrappers.append(self)
+
+
+def _percentiles(samples):
+    if len(samples) < 2:
+        value = samples[0] if samples else 0.0
+        return value, value, value
+    cuts = statistics.quantiles(samples, n=100, method='inclusive')
+    return cuts[49], cuts[94], cuts[98]
+
+
+class Command(BaseCommand):
+    help = 'Drive initialize -> verify -> webhook through the real payment views against a fake Lahza and report latency, throughput and DB writes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--payments', type=int, default=200, help='Virtual customers (default: 200)')
+        parser.add_argument('--concurrency', type=int, default=20, help='Customers in flight at once (default: 20)')
+        parser.add_argument('--latency', type=float, default=0.15, help='Fake Lahza response time in seconds (default: 0.15)')
+        parser.add_argument('--jitter', type=float, default=0.05, help='Random ± seconds around --latency (default: 0.05)')
+        parser.add_argument('--error-rate', type=float, default=0.0, help='Share of Lahza requests failing with a 503 (0-1)')
+        parser.add_argument('--decline-rate', type=float, default=0.1, help='Share of declined transactions (default: 0.1)')
+        parser.add_argument('--no-webhook', action='store_true', help='Skip the webhook step (callback verification only)')
+        parser.add_argument('--drain-timeout', type=float, default=60.0, help='Seconds to wait for the webhook inbox and receipt outbox')
+
+    def handle(self, *args, **options):
+        server = FakeLahzaServer(
+            latency=options['latency'],
+            jitter=options['jitter'],
+            error_rate=options['error_rate'],
+            decline_rate=options['decline_rate'],
+            seed=1,
+        ).start()
+        setup_test_environment()  # locmem email backend, 'testserver' allowed
+        test_db = os.path.join(tempfile.mkdtemp(prefix='loadtest-'), 'db.sqlite3')
+        if connection.vendor == 'sqlite':
+            # A file, not the shared in-memory default: the drain threads write concurrently
+            connection.settings_dict.setdefault('TEST', {})['NAME'] = test_db
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            with override_settings(LAHZA_BASE_URL=server.url, LAHZA_SECRET_KEY='sk_test_loadtest'):
+                self._run(server, options)
+        finally:
+            connections.close_all()
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+            server.stop()
+
+    def _run(self, server, options):
+        from config import lahza_service
+        from contacts import outbox, webhooks
+        from contacts.models import EmailOutbox, Payment, WebhookEvent
+
+        lahza_service._client = None  # Built from the overridden settings on first use
+        counter = WriteCounter()
+        connection_created.connect(counter.install)
+        for conn in connections.all():
+            if conn.connection is not None:
+                counter.install(connection=conn)
+
+        timings = defaultdict(list)
+        failures = Counter()
+
+        async def step(name, request):
+            started = time.perf_counter()
+            response = await request
+            timings[name].append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                failures[f'{name} {response.status_code}'] += 1
+            return response
+
+        async def customer(client, semaphore, number):
+            async with semaphore:
+                started = time.perf_counter()
+                response = await step('initialize', client.post(
+                    '/checkout/payment/initialize/',
+                    json.dumps({
+                        'email': f'load{number}@example.com', 'firstName': 'Load', 'lastName': f'Test{number}',
+                        'mobile': '0599000000', 'amount': 49, 'currency': 'usd',
+                    }),
+                    content_type='application/json',
+                ))
+                if response.status_code != 200:
+                    return
+                reference = response.json()['reference']
+                await step('verify', client.get(f'/checkout/payment/verify/?reference={reference}'))
+                if not options['no_webhook']:
+                    await step('webhook', client.post(
+                        '/api/lahza/webhook/', json.dumps(server.webhook_payload(reference)), content_type='application/json',
+                    ))
+                timings['end to end'].append(time.perf_counter() - started)
+
+        async def run():
+            client = AsyncClient()
+            semaphore = asyncio.Semaphore(options['concurrency'])
+            await asyncio.gather(*(customer(client, semaphore, n) for n in range(options['payments'])))
+
+        self.stdout.write(
+            f"🏋️ {options['payments']} payment(s), {options['concurrency']} concurrent, Lahza {options['latency'] * 1000:.0f}"
+            f"±{options['jitter'] * 1000:.0f}ms, {options['error_rate']:.0%} errors, {options['decline_rate']:.0%} declined"
+        )
+        started = time.perf_counter()
+        asyncio.run(run())
+        elapsed = time.perf_counter() - started
+
+        # Let the background drains finish before counting writes
+        deadline = time.monotonic() + options['drain_timeout']
+        while time.monotonic() < deadline and (
+            WebhookEvent.objects.filter(status__in=['pending', 'processing']).exists()
+            or EmailOutbox.objects.filter(status__in=['pending', 'sending']).exists()
+        ):
+            webhooks.process_due()
+            outbox.process_due()
+            time.sleep(0.2)
+        connection_created.disconnect(counter.install)
+
+        self.stdout.write(f"\n{'step':>12}  {'count':>6}  {'p50 ms':>8}  {'p95 ms':>8}  {'p99 ms':>8}")
+        for name in ('initialize', 'verify', 'webhook', 'end to end'):
+            samples = timings.get(name)
+            if samples:
+                p50, p95, p99 = _percentiles(samples)
+                self.stdout.write(f'{name:>12}  {len(samples):>6}  {p50 * 1000:>8.1f}  {p95 * 1000:>8.1f}  {p99 * 1000:>8.1f}')
+
+        completed = len(timings['end to end'])
+        statuses = Counter(Payment.objects.values_list('status', flat=True))
+        self.stdout.write(f'\nThroughput: {completed / elapsed:.1f} payments/s ({completed} completed in {elapsed:.1f}s)')
+        self.stdout.write(f'Payments: {dict(statuses)}; receipts: {dict(Counter(EmailOutbox.objects.values_list("status", flat=True)))}')
+        self.stdout.write(f'Lahza requests: {dict(server.stats)}')
+        if failures:
+            self.stdout.write(self.style.WARNING(f'HTTP errors: {dict(failures)}'))
+
+        total_writes = sum(counter.counts.values())
+        per_payment = total_writes / max(sum(statuses.values()), 1)
+        self.stdout.write(self.style.SUCCESS(f'\nDB writes: {total_writes} ({per_payment:.1f} per payment)'))
+        for (kind, table), count in sorted(counter.counts.items(), key=lambda item: -item[1]):
+            self.stdout.write(f'   {kind:<6} {table:<28} {count:>6}')
@@ -0,0 +1,34 @@
+"""
+Django management command to send queued transactional emails (payment receipts).
+Usage: python manage.py process_email_outbox [--loop] [--interval 5] [--concurrency 4] [--batch-size 50]
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from contacts import outbox
+from contacts.models import EmailOutbox
+
+
+class Command(BaseCommand):
+    help = 'Send due rows of the email outbox, retrying failures with backoff and dead-lettering exhausted ones'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help='Keep polling the outbox instead of exiting when it is drained')
+        parser.add_argument('--interval', type=float, default=5.0, help='Seconds between polls with --loop (default: 5)')
+        parser.add_argument('--concurrency', type=int, default=None, help='Parallel SMTP sends (default: EMAIL_OUTBOX_CONCURRENCY)')
+        parser.add_argument('--batch-size', type=int, default=50, help='Rows claimed per round (default: 50)')
+
+    def handle(self, *args, **options):
+        while True:
+            result = outbox.process_due(batch_size=options['batch_size'], concurrency=options['concurrency'])
+            if result['succeeded'] or result['failed'] or not options['loop']:
+                self.stdout.write(self.style.SUCCESS(
+                    f"📧 Sent {result['succeeded']} email(s), {result['failed']} failed "
+                    f"({EmailOutbox.objects.filter(status='dead').count()} dead-lettered in total)"
+                ))
+            if not options['loop']:
+                break
+            close_old_connections()
+            time.sleep(options['interval'])
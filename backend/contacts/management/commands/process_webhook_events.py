@@ -0,0 +1,34 @@
+"""
+Django management command to process stored Lahza webhook events.
+Usage: python manage.py process_webhook_events [--loop] [--interval 5] [--concurrency 4] [--batch-size 50]
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from contacts import webhooks
+from contacts.models import WebhookEvent
+
+
+class Command(BaseCommand):
+    help = 'Apply pending Lahza webhook events to their payments, retrying failures and dead-lettering exhausted ones'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help='Keep polling the inbox instead of exiting when it is drained')
+        parser.add_argument('--interval', type=float, default=5.0, help='Seconds between polls with --loop (default: 5)')
+        parser.add_argument('--concurrency', type=int, default=None, help='Events processed in parallel (default: WEBHOOK_INBOX_CONCURRENCY)')
+        parser.add_argument('--batch-size', type=int, default=50, help='Events claimed per round (default: 50)')
+
+    def handle(self, *args, **options):
+        while True:
+            result = webhooks.process_due(batch_size=options['batch_size'], concurrency=options['concurrency'])
+            if result['succeeded'] or result['failed'] or not options['loop']:
+                self.stdout.write(self.style.SUCCESS(
+                    f"🔔 Processed {result['succeeded']} webhook event(s), {result['failed']} failed "
+                    f"({WebhookEvent.objects.filter(status='dead').count()} dead-lettered in total)"
+                ))
+            if not options['loop']:
+                break
+            close_old_connections()
+            time.sleep(options['interval'])
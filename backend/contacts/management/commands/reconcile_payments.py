@@ -0,0 +1,73 @@
+"""
+Django management command to settle payments that stayed pending (no webhook, no callback).
+Usage: python manage.py reconcile_payments [--dry-run] [--min-age 15] [--max-age 72] [--concurrency 4] [--rate 5] [--batch-size 100] [--reset] [--loop --interval 300]
+"""
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from contacts import reconciliation
+
+
+class Command(BaseCommand):
+    help = 'Verify stale pending payments with Lahza and apply the settled results, resuming from a checkpoint'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Verify and report what would change, without writing anything')
+        parser.add_argument('--min-age', type=float, default=settings.PAYMENT_RECONCILE_MIN_AGE_MINUTES,
+                            help='Only payments pending for at least this many minutes (default: PAYMENT_RECONCILE_MIN_AGE_MINUTES)')
+        parser.add_argument('--max-age', type=float, default=settings.PAYMENT_RECONCILE_MAX_AGE_HOURS,
+                            help='Skip payments created more than this many hours ago (default: PAYMENT_RECONCILE_MAX_AGE_HOURS)')
+        parser.add_argument('--concurrency', type=int, default=settings.PAYMENT_RECONCILE_CONCURRENCY,
+                            help='Verifications in flight at once (default: PAYMENT_RECONCILE_CONCURRENCY)')
+        parser.add_argument('--rate', type=float, default=settings.PAYMENT_RECONCILE_RATE,
+                            help='Max Lahza verifications per second, 0 for unlimited (default: PAYMENT_RECONCILE_RATE)')
+        parser.add_argument('--batch-size', type=int, default=100, help='Payments per page (default: 100)')
+        parser.add_argument('--max-pages', type=int, default=None, help='Stop after this many pages; the next run resumes from the checkpoint')
+        parser.add_argument('--checkpoint', default=settings.PAYMENT_RECONCILE_CHECKPOINT_FILE,
+                            help='Checkpoint file (default: PAYMENT_RECONCILE_CHECKPOINT_FILE)')
+        parser.add_argument('--reset', action='store_true', help='Ignore the saved checkpoint and start from the oldest payment')
+        parser.add_argument('--loop', action='store_true', help='Run again every --interval seconds')
+        parser.add_argument('--interval', type=float, default=300.0, help='Seconds between runs with --loop (default: 300)')
+
+    def handle(self, *args, **options):
+        if options['reset']:
+            reconciliation.clear_checkpoint(options['checkpoint'])
+        while True:
+            self._run(options)
+            if not options['loop']:
+                break
+            close_old_connections()
+            time.sleep(options['interval'])
+
+    def _run(self, options):
+        dry_run = options['dry_run']
+
+        def on_page(number, counts):
+            self.stdout.write(
+                f"   Page {number}: {counts['checked']} checked, {counts['success']} paid, {counts['failed']} failed, "
+                f"{counts['pending']} still pending, {counts['skipped']} already settled, {counts['errors']} errors"
+            )
+
+        started = time.monotonic()
+        summary = reconciliation.reconcile(
+            min_age=timedelta(minutes=options['min_age']),
+            max_age=timedelta(hours=options['max_age']),
+            batch_size=options['batch_size'],
+            concurrency=options['concurrency'],
+            rate=options['rate'],
+            checkpoint=options['checkpoint'],
+            dry_run=dry_run,
+            max_pages=options['max_pages'],
+            on_page=on_page if options['verbosity'] > 1 or dry_run else None,
+        )
+        verb = 'Would mark' if dry_run else 'Marked'
+        style = self.style.WARNING if summary['errors'] else self.style.SUCCESS
+        self.stdout.write(style(
+            f"{'🔎 [dry run] ' if dry_run else '💳 '}Checked {summary['checked']} pending payment(s) in {time.monotonic() - started:.1f}s: "
+            f"{verb} {summary['success']} paid and {summary['failed']} failed, {summary['pending']} still pending, "
+            f"{summary['skipped']} settled meanwhile, {summary['errors']} could not be verified"
+        ))
@@ -0,0 +1,86 @@
+"""
+Django management command to resend payment receipts over one reused SMTP connection.
+Usage: python manage.py resend_receipts --since 2024-11-28 [--until 2024-12-01] [--status success] [--reference REF ...] [--email user@example.com] [--limit 500] [--dry-run]
+
+Payments are streamed from the database in primary-key order (``iterator()``,
+so a large selection isn't loaded at once) and sent through one
+``config.mailer.PooledMailer``. The receipt outbox isn't touched: this is a
+manual resend, e.g. after an SMTP outage or a template fix.
+"""
+import time
+from datetime import datetime, time as dt_time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from config.mailer import PooledMailer
+from contacts.models import Payment
+
+
+def _day(value, end=False):
+    try:
+        day = datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        raise CommandError(f'Invalid date {value!r}, expected YYYY-MM-DD')
+    return timezone.make_aware(datetime.combine(day, dt_time.max if end else dt_time.min))
+
+
+class Command(BaseCommand):
+    help = 'Resend payment receipt emails for a selection of payments, reusing one SMTP connection'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--since', help='Payments created on or after this day (YYYY-MM-DD)')
+        parser.add_argument('--until', help='Payments created on or before this day (YYYY-MM-DD)')
+        parser.add_argument('--status', default='success', help="Payment status to select (default: success; 'any' for all)")
+        parser.add_argument('--reference', nargs='+', default=None, help='Only these payment references')
+        parser.add_argument('--email', default=None, help='Only payments of this customer email')
+        parser.add_argument('--limit', type=int, default=None, help='Send at most this many receipts')
+        parser.add_argument('--chunk-size', type=int, default=200, help='Rows fetched per database round trip (default: 200)')
+        parser.add_argument('--dry-run', action='store_true', help='List the selected payments without sending anything')
+
+    def handle(self, *args, **options):
+        from config.views.instructions import send_payment_receipt_email
+
+        if not (options['since'] or options['reference'] or options['email']):
+            raise CommandError('Select payments with --since, --reference or --email')
+
+        payments = Payment.objects.order_by('pk')
+        if options['status'] != 'any':
+            payments = payments.filter(status=options['status'])
+        if options['since']:
+            payments = payments.filter(created_at__gte=_day(options['since']))
+        if options['until']:
+            payments = payments.filter(created_at__lte=_day(options['until'], end=True))
+        if options['reference']:
+            payments = payments.filter(reference__in=options['reference'])
+        if options['email']:
+            payments = payments.filter(customer_email__iexact=options['email'])
+        if options['limit']:
+            payments = payments[:options['limit']]
+
+        if options['dry_run']:
+            count = 0
+            for payment in payments.iterator(chunk_size=options['chunk_size']):
+                count += 1
+                self.stdout.write(f'   {payment.reference}  {payment.customer_email}  {payment.created_at:%Y-%m-%d %H:%M}')
+            self.stdout.write(self.style.WARNING(f'🔍 Dry run: {count} receipt(s) would be resent'))
+            return
+
+        sent = failed = 0
+        started = time.perf_counter()
+        with PooledMailer() as mailer:
+            for payment in payments.iterator(chunk_size=options['chunk_size']):
+                try:
+                    send_payment_receipt_email(payment, mailer=mailer)
+                    sent += 1
+                except Exception as exc:
+                    failed += 1
+                    self.stderr.write(self.style.ERROR(f'   ❌ {payment.reference} ({payment.customer_email}): {exc}'))
+                if (sent + failed) % 100 == 0:
+                    self.stdout.write(f'   … {sent + failed} processed')
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(self.style.SUCCESS(
+            f'📧 Resent {sent} receipt(s), {failed} failed in {elapsed:.1f}s '
+            f'({sent / elapsed if elapsed else 0:.1f} emails/s over {mailer.connections_opened} SMTP connection(s))'
+        ))
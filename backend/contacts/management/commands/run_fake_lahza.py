@@ -0,0 +1,41 @@
+"""
+Django management command to run a local stand-in for the Lahza API.
+Usage: python manage.py run_fake_lahza [--port 8765] [--latency 0.15] [--jitter 0.05] [--error-rate 0.02] [--decline-rate 0.1] [--settle-delay 2] [--webhook-url http://localhost:8000/api/lahza/webhook/]
+"""
+from django.core.management.base import BaseCommand
+
+from config.fake_lahza import FakeLahzaServer
+
+
+class Command(BaseCommand):
+    help = 'Serve a fake Lahza API (initialize, verify, webhooks) with configurable latency and failure rates'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=8765)
+        parser.add_argument('--latency', type=float, default=0.1, help='Seconds added to every response (default: 0.1)')
+        parser.add_argument('--jitter', type=float, default=0.0, help='Random ± seconds around --latency')
+        parser.add_argument('--error-rate', type=float, default=0.0, help='Share of requests answered with a 503 (0-1)')
+        parser.add_argument('--decline-rate', type=float, default=0.0, help='Share of transactions that end up failed (0-1)')
+        parser.add_argument('--settle-delay', type=float, default=0.0, help='Seconds a transaction stays pending after initialize')
+        parser.add_argument('--webhook-url', default=None, help='POST a webhook here when each transaction settles')
+
+    def handle(self, *args, **options):
+        server = FakeLahzaServer(
+            options['host'], options['port'],
+            latency=options['latency'],
+            jitter=options['jitter'],
+            error_rate=options['error_rate'],
+            decline_rate=options['decline_rate'],
+            settle_delay=options['settle_delay'],
+            webhook_url=options['webhook_url'],
+        )
+        self.stdout.write(self.style.SUCCESS(f'🧪 Fake Lahza API listening on {server.url}'))
+        self.stdout.write(f'   Run the site with: LAHZA_BASE_URL={server.url} LAHZA_SECRET_KEY=sk_test_fake')
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.stop()
+            self.stdout.write(f"\n{dict(server.stats)}")
@@ -0,0 +1,41 @@
+# Generated by Django 4.2.10 on 2026-10-18 07:53
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contacts', '0017_ramadancontact'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmailOutbox',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('payment_receipt', 'Payment Receipt')], default='payment_receipt', max_length=30, verbose_name='Kind')),
+                ('recipient', models.EmailField(max_length=254, verbose_name='Recipient')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('sending', 'Sending'), ('sent', 'Sent'), ('dead', 'Dead Letter')], default='pending', max_length=10, verbose_name='Status')),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='Attempts')),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Next Attempt At')),
+                ('locked_until', models.DateTimeField(blank=True, help_text='Lease of the worker currently sending it', null=True, verbose_name='Locked Until')),
+                ('last_error', models.TextField(blank=True, default='', verbose_name='Last Error')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Created At')),
+                ('sent_at', models.DateTimeField(blank=True, null=True, verbose_name='Sent At')),
+                ('payment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='emails', to='contacts.payment', verbose_name='Payment')),
+            ],
+            options={
+                'verbose_name': 'Email Outbox',
+                'verbose_name_plural': 'Email Outbox',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'next_attempt_at'], name='contacts_em_status_5c40f3_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='emailoutbox',
+            constraint=models.UniqueConstraint(fields=('payment', 'kind'), name='unique_email_per_payment_kind'),
+        ),
+    ]
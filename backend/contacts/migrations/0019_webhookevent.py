@@ -0,0 +1,41 @@
+# Generated by Django 4.2.10 on 2026-10-18 07:55
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contacts', '0018_emailoutbox'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WebhookEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('reference', models.CharField(max_length=100, verbose_name='Payment Reference')),
+                ('payment_status', models.CharField(help_text='Status reported by Lahza', max_length=50, verbose_name='Payment Status')),
+                ('payload', models.JSONField(blank=True, default=dict, verbose_name='Payload')),
+                ('deliveries', models.PositiveIntegerField(default=1, verbose_name='Deliveries')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('processing', 'Processing'), ('processed', 'Processed'), ('dead', 'Dead Letter')], default='pending', max_length=10, verbose_name='Status')),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='Attempts')),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Next Attempt At')),
+                ('locked_until', models.DateTimeField(blank=True, help_text='Lease of the worker currently processing it', null=True, verbose_name='Locked Until')),
+                ('last_error', models.TextField(blank=True, default='', verbose_name='Last Error')),
+                ('received_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Received At')),
+                ('processed_at', models.DateTimeField(blank=True, null=True, verbose_name='Processed At')),
+            ],
+            options={
+                'verbose_name': 'Webhook Event',
+                'verbose_name_plural': 'Webhook Events',
+                'ordering': ['-received_at'],
+                'indexes': [models.Index(fields=['status', 'next_attempt_at'], name='contacts_we_status_b0dcc7_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='webhookevent',
+            constraint=models.UniqueConstraint(fields=('reference', 'payment_status'), name='unique_webhook_reference_status'),
+        ),
+    ]
@@ -1,9 +1,12 @@
+import logging
 import uuid
 
 from django.db import models
 from django.urls import reverse
 from django.utils import timezone
 
+logger = logging.getLogger(__name__)
+
 
 def generate_short_code(length=8):
     """Generate a unique short code consisting of uppercase letters and digits."""
@@ -197,155 +200,50 @@ class Payment(models.Model):
     def __str__(self):
         return f"{self.reference} - {self.customer_email} - ${self.amount} ({self.status})"
     
-    def mark_as_success(self, transaction_data=None):
-        """Mark payment as successful and extract card information"""
-        from django.utils import timezone
+    def mark_as_success(self, transaction_data=None, extra_fields=()):
+        """
+        Mark payment as successful and extract card information.
+        
+        Only the fields this changes (plus ``extra_fields``, ones the caller
+        already set) are written.
+        """
+        from .card_info import CARD_FIELDS, extract
+        
+        update_fields = {'status', 'updated_at', *extra_fields}
         self.status = 'success'
         if not self.paid_at:
             self.paid_at = timezone.now()
+            update_fields.add('paid_at')
         if transaction_data:
             # Don't overwrite lahza_response if it's already set (might have more data)
             if not self.lahza_response or not isinstance(self.lahza_response, dict):
                 self.lahza_response = {}
             if isinstance(transaction_data, dict):
                 self.lahza_response.update(transaction_data)
+                update_fields.add('lahza_response')
             if 'id' in transaction_data:
                 self.transaction_id = str(transaction_data['id'])
+                update_fields.add('transaction_id')
             
-            # Extract card information from transaction data
-            # Lahza API may return card info in different formats
-            import logging
-            logger = logging.getLogger(__name__)
-            
-            # Log the full transaction_data structure for debugging
-            logger.info(f"[Payment] Extracting card info from transaction_data. Keys: {list(transaction_data.keys()) if isinstance(transaction_data, dict) else 'Not a dict'}")
-            
-            card_info = None
-            
-            # Try multiple possible locations for card info
-            # Lahza returns card info directly in 'authorization' object
-            if 'authorization' in transaction_data:
-                auth = transaction_data.get('authorization', {})
-                if isinstance(auth, dict):
-                    # Check if card info is directly in authorization (Lahza format)
-                    if 'last4' in auth or 'brand' in auth or 'card_type' in auth:
-                        card_info = auth
-                        logger.info(f"[Payment] Found card info directly in 'authorization': {card_info}")
-                    # Or check if there's a nested 'card' object
-                    elif 'card' in auth:
-                        card_info = auth.get('card', {})
-                        logger.info(f"[Payment] Found card info in 'authorization.card': {card_info}")
-            elif 'card' in transaction_data:
-                card_info = transaction_data.get('card', {})
-                logger.info(f"[Payment] Found card info in 'card' key: {card_info}")
-            elif 'payment_method' in transaction_data:
-                pm = transaction_data.get('payment_method', {})
-                if isinstance(pm, dict) and 'card' in pm:
-                    card_info = pm.get('card', {})
-                    logger.info(f"[Payment] Found card info in 'payment_method.card': {card_info}")
-            elif 'paymentDetails' in transaction_data:
-                pd = transaction_data.get('paymentDetails', {})
-                if isinstance(pd, dict) and 'card' in pd:
-                    card_info = pd.get('card', {})
-                    logger.info(f"[Payment] Found card info in 'paymentDetails.card': {card_info}")
-            
-            # Also check if card info is directly in transaction_data with different key names
-            if not card_info:
-                # Check for direct card fields
-                if any(key in transaction_data for key in ['cardType', 'cardBrand', 'cardNumber', 'last4', 'last_4', 'lastFour']):
-                    card_info = {}
-                    if 'cardType' in transaction_data:
-                        card_info['type'] = transaction_data.get('cardType')
-                    if 'cardBrand' in transaction_data:
-                        card_info['brand'] = transaction_data.get('cardBrand')
-                    if 'last4' in transaction_data:
-                        card_info['last4'] = transaction_data.get('last4')
-                    elif 'last_4' in transaction_data:
-                        card_info['last4'] = transaction_data.get('last_4')
-                    elif 'lastFour' in transaction_data:
-                        card_info['last4'] = transaction_data.get('lastFour')
-                    elif 'cardNumber' in transaction_data:
-                        card_num = str(transaction_data.get('cardNumber', ''))
-                        if len(card_num) >= 4:
-                            card_info['last4'] = card_num[-4:]
-                    logger.info(f"[Payment] Constructed card info from direct fields: {card_info}")
-            
-            if card_info and isinstance(card_info, dict):
-                logger.info(f"[Payment] Processing card_info: {card_info}")
-                
-                # Extract card type/brand (Lahza uses 'brand' in authorization)
-                if 'brand' in card_info and card_info.get('brand'):
-                    self.card_brand = str(card_info.get('brand', ''))[:50]
-                    self.card_type = self.card_brand  # Use brand as type if type is not available
-                    logger.info(f"[Payment] Set card_brand: {self.card_brand}")
-                elif 'card_type' in card_info and card_info.get('card_type'):
-                    self.card_type = str(card_info.get('card_type', ''))[:50]
-                    self.card_brand = self.card_type  # Use type as brand if brand is not available
-                    logger.info(f"[Payment] Set card_type: {self.card_type}")
-                elif 'type' in card_info and card_info.get('type'):
-                    self.card_type = str(card_info.get('type', ''))[:50]
-                    self.card_brand = self.card_type
-                    logger.info(f"[Payment] Set card_type from type: {self.card_type}")
-                
-                # Extract last 4 digits (Lahza uses 'last4' in authorization)
-                if 'last4' in card_info and card_info.get('last4'):
-                    self.last_four_digits = str(card_info.get('last4', ''))[:4]
-                    logger.info(f"[Payment] Set last_four_digits: {self.last_four_digits}")
-                elif 'last_4' in card_info and card_info.get('last_4'):
-                    self.last_four_digits = str(card_info.get('last_4', ''))[:4]
-                    logger.info(f"[Payment] Set last_four_digits from last_4: {self.last_four_digits}")
-                elif 'last_four' in card_info and card_info.get('last_four'):
-                    self.last_four_digits = str(card_info.get('last_four', ''))[:4]
-                    logger.info(f"[Payment] Set last_four_digits from last_four: {self.last_four_digits}")
-                elif 'cardNumber' in card_info:
-                    card_num = str(card_info.get('cardNumber', ''))
-                    if len(card_num) >= 4:
-                        self.last_four_digits = card_num[-4:]
-                        logger.info(f"[Payment] Set last_four_digits from cardNumber: {self.last_four_digits}")
-                
-                # Extract expiry information (Lahza uses 'exp_month' and 'exp_year' in authorization)
-                if 'exp_month' in card_info and card_info.get('exp_month'):
-                    exp_month = str(card_info.get('exp_month', ''))
-                    # Ensure 2 digits with leading zero if needed
-                    if len(exp_month) == 1:
-                        exp_month = '0' + exp_month
-                    self.card_expiry_month = exp_month[:2]
-                    logger.info(f"[Payment] Set card_expiry_month: {self.card_expiry_month}")
-                elif 'expiry_month' in card_info and card_info.get('expiry_month'):
-                    exp_month = str(card_info.get('expiry_month', ''))
-                    if len(exp_month) == 1:
-                        exp_month = '0' + exp_month
-                    self.card_expiry_month = exp_month[:2]
-                    logger.info(f"[Payment] Set card_expiry_month from expiry_month: {self.card_expiry_month}")
-                elif 'expMonth' in card_info and card_info.get('expMonth'):
-                    exp_month = str(card_info.get('expMonth', ''))
-                    if len(exp_month) == 1:
-                        exp_month = '0' + exp_month
-                    self.card_expiry_month = exp_month[:2]
-                    logger.info(f"[Payment] Set card_expiry_month from expMonth: {self.card_expiry_month}")
-                
-                if 'exp_year' in card_info and card_info.get('exp_year'):
-                    exp_year = str(card_info.get('exp_year', ''))
-                    # Handle 2-digit years (convert to 4-digit)
-                    if len(exp_year) == 2:
-                        exp_year = '20' + exp_year
-                    self.card_expiry_year = exp_year[:4]
-                    logger.info(f"[Payment] Set card_expiry_year: {self.card_expiry_year}")
-                elif 'expiry_year' in card_info and card_info.get('expiry_year'):
-                    exp_year = str(card_info.get('expiry_year', ''))
-                    if len(exp_year) == 2:
-                        exp_year = '20' + exp_year
-                    self.card_expiry_year = exp_year[:4]
-                    logger.info(f"[Payment] Set card_expiry_year from expiry_year: {self.card_expiry_year}")
-                elif 'expYear' in card_info and card_info.get('expYear'):
-                    exp_year = str(card_info.get('expYear', ''))
-                    if len(exp_year) == 2:
-                        exp_year = '20' + exp_year
-                    self.card_expiry_year = exp_year[:4]
-                    logger.info(f"[Payment] Set card_expiry_year from expYear: {self.card_expiry_year}")
+            card = extract(transaction_data)
+            for field, value in card.items():
+                if getattr(self, field) != value:
+                    setattr(self, field, value)
+                    update_fields.add(field)
+            if card:
+                logger.info(
+                    "[Payment] Card info for %s: %s %s, exp %s/%s", self.reference,
+                    *(card.get(field) for field in CARD_FIELDS[1:]),
+                )
             else:
-                logger.warning(f"[Payment] No card info found in transaction_data. Available keys: {list(transaction_data.keys()) if isinstance(transaction_data, dict) else 'Not a dict'}")
-        self.save()
+                logger.warning(
+                    "[Payment] No card info found in transaction_data. Available keys: %s",
+                    list(transaction_data.keys()) if isinstance(transaction_data, dict) else 'Not a dict',
+                )
+        if self._state.adding:
+            self.save()
+        else:
+            self.save(update_fields=update_fields)
     
     def mark_as_failed(self, error_message=None):
         """Mark payment as failed"""
@@ -487,3 +385,90 @@ class BlackFridayContact(models.Model):
     
     def __str__(self):
         return f"{self.name} - {self.form_type} ({self.created_at.strftime('%Y-%m-%d %H:%M')})"
+
+
+class EmailOutbox(models.Model):
+    """Transactional email waiting to be sent by the outbox worker (contacts/outbox.py)"""
+    
+    KIND_CHOICES = [
+        ('payment_receipt', 'Payment Receipt'),
+    ]
+    
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('sending', 'Sending'),
+        ('sent', 'Sent'),
+        ('dead', 'Dead Letter'),
+    ]
+    
+    kind = models.CharField(max_length=30, choices=KIND_CHOICES, default='payment_receipt', verbose_name="Kind")
+    payment = models.ForeignKey(Payment, on_delete=models.CASCADE, related_name='emails', verbose_name="Payment")
+    recipient = models.EmailField(verbose_name="Recipient")
+    
+    # Delivery state
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending', verbose_name="Status")
+    attempts = models.PositiveIntegerField(default=0, verbose_name="Attempts")
+    next_attempt_at = models.DateTimeField(default=timezone.now, verbose_name="Next Attempt At")
+    locked_until = models.DateTimeField(blank=True, null=True, verbose_name="Locked Until", help_text="Lease of the worker currently sending it")
+    last_error = models.TextField(blank=True, default='', verbose_name="Last Error")
+    
+    # Timestamps
+    created_at = models.DateTimeField(default=timezone.now, verbose_name="Created At")
+    sent_at = models.DateTimeField(blank=True, null=True, verbose_name="Sent At")
+    
+    class Meta:
+        verbose_name = "Email Outbox"
+        verbose_name_plural = "Email Outbox"
+        ordering = ['-created_at']
+        constraints = [
+            # One receipt per payment, however many verifications/webhooks mark it paid
+            models.UniqueConstraint(fields=['payment', 'kind'], name='unique_email_per_payment_kind'),
+        ]
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.get_kind_display()} → {self.recipient} ({self.status})"
+
+
+class WebhookEvent(models.Model):
+    """Raw Lahza webhook delivery, processed after the webhook is acknowledged (contacts/webhooks.py)"""
+    
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('processing', 'Processing'),
+        ('processed', 'Processed'),
+        ('dead', 'Dead Letter'),
+    ]
+    
+    # Event identity: a redelivery of the same reference/status is the same event
+    reference = models.CharField(max_length=100, verbose_name="Payment Reference")
+    payment_status = models.CharField(max_length=50, verbose_name="Payment Status", help_text="Status reported by Lahza")
+    payload = models.JSONField(default=dict, blank=True, verbose_name="Payload")
+    deliveries = models.PositiveIntegerField(default=1, verbose_name="Deliveries")
+    
+    # Processing state
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending', verbose_name="Status")
+    attempts = models.PositiveIntegerField(default=0, verbose_name="Attempts")
+    next_attempt_at = models.DateTimeField(default=timezone.now, verbose_name="Next Attempt At")
+    locked_until = models.DateTimeField(blank=True, null=True, verbose_name="Locked Until", help_text="Lease of the worker currently processing it")
+    last_error = models.TextField(blank=True, default='', verbose_name="Last Error")
+    
+    # Timestamps
+    received_at = models.DateTimeField(default=timezone.now, verbose_name="Received At")
+    processed_at = models.DateTimeField(blank=True, null=True, verbose_name="Processed At")
+    
+    class Meta:
+        verbose_name = "Webhook Event"
+        verbose_name_plural = "Webhook Events"
+        ordering = ['-received_at']
+        constraints = [
+            models.UniqueConstraint(fields=['reference', 'payment_status'], name='unique_webhook_reference_status'),
+        ]
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.reference} {self.payment_status} ({self.status})"
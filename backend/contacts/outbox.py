@@ -0,0 +1,101 @@
+"""
+Durable outbox for transactional emails (payment receipts).
+
+Instead of sending SMTP mail inside the payment views, a successful payment
+writes an ``EmailOutbox`` row in the same transaction that marks it paid
+(``mark_success_and_enqueue_receipt``). The row is sent afterwards by:
+
+- an in-process drain started once the transaction commits (``wake()``), so a
+  single container still delivers receipts within seconds;
+- ``python manage.py process_email_outbox --loop``, which also retries failed
+  sends with exponential backoff and moves rows that exhaust
+  ``EMAIL_OUTBOX_MAX_ATTEMPTS`` to the ``dead`` status for the admin to retry.
+
+Claiming, leases, retries and the drain thread come from
+``contacts.work_queue.LeasedQueue``, so any number of workers can run side by
+side without sending a receipt twice. Each sender thread reuses an SMTP
+connection from ``config.mailer.pool`` across rows; they are closed once the
+queue is drained.
+"""
+from __future__ import annotations
+
+import logging
+from typing import Callable, Dict
+
+from django.db import transaction
+
+from .models import EmailOutbox, Payment
+from .work_queue import LeasedQueue
+
+logger = logging.getLogger(__name__)
+
+
+def _send_payment_receipt(item: EmailOutbox) -> None:
+    from config.views.instructions import send_payment_receipt_email
+
+    send_payment_receipt_email(item.payment)
+
+
+# kind -> sender; a sender raises to signal a failed attempt
+SENDERS: Dict[str, Callable[[EmailOutbox], None]] = {
+    'payment_receipt': _send_payment_receipt,
+}
+
+
+def enqueue_receipt(payment: Payment) -> bool:
+    """
+    Queue the receipt of ``payment``; a no-op if it was already queued.
+
+    Call it inside the transaction that marks the payment paid: the row only
+    becomes visible (and the in-process drain only starts) once it commits.
+    """
+    _item, created = EmailOutbox.objects.get_or_create(
+        payment=payment,
+        kind='payment_receipt',
+        defaults={'recipient': payment.customer_email},
+    )
+    if created:
+        logger.info("[Outbox] Receipt queued for %s (%s)", payment.reference, payment.customer_email)
+        transaction.on_commit(wake)
+    return created
+
+
+def mark_success_and_enqueue_receipt(payment: Payment, transaction_data=None, extra_fields=()) -> None:
+    """``Payment.mark_as_success`` and the receipt enqueue, committed together."""
+    with transaction.atomic():
+        payment.mark_as_success(transaction_data, extra_fields=extra_fields)
+        enqueue_receipt(payment)
+
+
+def save_and_enqueue_receipt(payment: Payment) -> None:
+    """Save an already updated ``payment`` and queue its receipt in one transaction."""
+    with transaction.atomic():
+        payment.save()
+        enqueue_receipt(payment)
+
+
+queue = LeasedQueue(
+    EmailOutbox,
+    lambda item: SENDERS[item.kind](item),
+    name='Outbox',
+    settings_prefix='EMAIL_OUTBOX',
+    in_flight='sending',
+    done='sent',
+    done_timestamp='sent_at',
+    select_related=('payment',),
+)
+
+
+def process_due(batch_size: int = 50, concurrency: int = None) -> Dict[str, int]:
+    """Send due rows, ``concurrency`` SMTP sends at a time, until none are left."""
+    from config.mailer import pool
+
+    try:
+        return queue.process_due(batch_size=batch_size, concurrency=concurrency)
+    finally:
+        pool.close()
+
+
+def wake() -> None:
+    """Send newly queued rows from a background thread of this process."""
+    queue.wake()
@@ -0,0 +1,153 @@
+"""
+Push notifications of settled payments to the checkout pages.
+
+While Lahza's popup is open the checkout pages used to poll
+``verify_lahza_payment`` every few seconds, each poll a gateway call and a
+database write. They now open an ``EventSource`` on ``payment_status_stream``
+(``stream()`` below), which sends the verification response once, as soon as
+the payment settles, and closes. While the stream is open the page still
+calls the verify endpoint every 20 seconds, so a payment whose webhook and
+callback never arrive settles within a check or two rather than at the
+stream's timeout.
+
+``publish(payment)`` runs after commit whenever a ``Payment`` is saved with a
+settled status (``contacts.signals``), whoever settled it (a verification, the
+webhook processor or the admin):
+
+- streams in this process are woken straight away through their
+  ``asyncio.Queue`` (an in-process stand-in for a pub/sub channel);
+- the event is also written to the cache, which streams check every
+  ``PAYMENT_EVENTS_CHECK_SECONDS``; this is how events published by another
+  process (e.g. the ``webhook-worker`` container) reach them.
+
+An open stream costs no gateway call and no database query. Streams are only
+served by the ASGI application (``config.asgi``); under WSGI the view refuses
+them and the pages fall back to polling.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import threading
+from typing import Any, AsyncIterator, Dict, Optional, Set, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+
+from . import verification
+
+logger = logging.getLogger(__name__)
+
+_Subscriber = Tuple[asyncio.AbstractEventLoop, asyncio.Queue]
+
+_subscribers: Dict[str, Set[_Subscriber]] = {}
+_subscribers_lock = threading.Lock()
+
+
+def _setting(name: str, default):
+    return getattr(settings, name, default)
+
+
+def _event_key(reference: str) -> str:
+    return f'payment_events:settled:{reference}'
+
+
+def event_payload(payment) -> Optional[Dict[str, Any]]:
+    """The ``verify_lahza_payment`` response of a settled payment, ``None`` while it isn't settled."""
+    settled = verification.settled_status(payment)
+    if settled is None:
+        return None
+    if settled == 'success':
+        try:
+            amount_value = float(payment.amount) if payment.amount else 0.0
+        except (TypeError, ValueError):
+            amount_value = 0.0
+        return {
+            'success': True,
+            'status': 'success',
+            'message': 'Payment verified successfully',
+            'transaction_id': payment.transaction_id or '',
+            'reference': payment.reference,
+            'amount': amount_value,
+            'currency': payment.currency or 'USD',
+            'email': payment.customer_email or '',
+        }
+    status = verification.transaction_status(payment.lahza_response or {})
+    return {
+        'success': False,
+        'status': status,
+        'error': f'Payment status: {status}',
+        'reference': payment.reference,
+    }
+
+
+def publish(payment) -> None:
+    """Notify the streams of ``payment`` that it settled (a no-op while it hasn't)."""
+    payload = event_payload(payment)
+    if payload is None:
+        return
+    # Cache first: a stream that subscribes right now finds it there
+    cache.set(_event_key(payment.reference), payload, _setting('PAYMENT_EVENTS_CACHE_TTL', 600))
+    with _subscribers_lock:
+        subscribers = list(_subscribers.get(payment.reference, ()))
+    for loop, queue in subscribers:
+        try:
+            loop.call_soon_threadsafe(queue.put_nowait, payload)
+        except RuntimeError:
+            pass  # That stream's event loop is already closed
+    if subscribers:
+        logger.info("[Payment Events] %s %s pushed to %d stream(s)", payment.reference, payload['status'], len(subscribers))
+
+
+def _subscribe(reference: str, subscriber: _Subscriber) -> None:
+    with _subscribers_lock:
+        _subscribers.setdefault(reference, set()).add(subscriber)
+
+
+def _unsubscribe(reference: str, subscriber: _Subscriber) -> None:
+    with _subscribers_lock:
+        subscribers = _subscribers.get(reference)
+        if subscribers is not None:
+            subscribers.discard(subscriber)
+            if not subscribers:
+                del _subscribers[reference]
+
+
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    return f'event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n'
+
+
+async def stream(reference: str, initial: Optional[Dict[str, Any]] = None) -> AsyncIterator[str]:
+    """
+    Server-Sent Events for ``reference``: one ``status`` event with the
+    settled payment's verification response, or a ``timeout`` event after
+    ``PAYMENT_EVENTS_MAX_SECONDS`` (the page then verifies right away).
+
+    ``initial`` is the payload of a payment that was already settled when the
+    stream was requested.
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+    subscriber = (loop, queue)
+    _subscribe(reference, subscriber)
+    try:
+        yield f"retry: {_setting('PAYMENT_EVENTS_RETRY_MS', 3000)}\n\n"
+        payload = initial or await cache.aget(_event_key(reference))
+        check_seconds = _setting('PAYMENT_EVENTS_CHECK_SECONDS', 2)
+        deadline = loop.time() + _setting('PAYMENT_EVENTS_MAX_SECONDS', 300)
+        while payload is None:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                yield _sse('timeout', {'success': False, 'status': 'pending', 'reference': reference})
+                return
+            try:
+                payload = await asyncio.wait_for(queue.get(), min(check_seconds, remaining))
+            except asyncio.TimeoutError:
+                payload = await cache.aget(_event_key(reference))
+                if payload is None:
+                    # Comment line: keeps proxies from timing out the idle connection
+                    yield ': keepalive\n\n'
+        yield _sse('status', payload)
+    finally:
+        _unsubscribe(reference, subscriber)
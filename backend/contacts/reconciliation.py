@@ -0,0 +1,206 @@
+"""
+Reconciliation of payments that stayed ``pending``.
+
+A payment whose webhook never arrived and whose customer never came back
+through the callback stays ``pending`` until someone checks it in the admin.
+``reconcile()`` (``python manage.py reconcile_payments``) walks the stale
+pending payments, created between ``max_age`` and ``min_age`` ago, oldest
+first, a page at a time:
+
+- each page is verified on a bounded thread pool, through
+  ``contacts.verification`` and behind a ``RateLimiter`` so a campaign backlog
+  can't flood Lahza;
+- the settled results of a page are applied in one transaction, only to rows
+  that are still pending then (a webhook may have won the race); rows Lahza
+  still reports as pending aren't written at all;
+- after each page the keyset cursor ``(created_at, pk)`` is saved to a JSON
+  checkpoint file, so an interrupted run resumes where it stopped; a run that
+  reaches the end of the window clears it.
+
+When the circuit breaker is open (``LahzaUnavailableError``) the run stops at
+the last completed page instead of burning through the backlog.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from django.db import close_old_connections, transaction
+from django.db.models import Q, QuerySet
+from django.utils import timezone
+
+from config.lahza_service import LahzaAPIError, LahzaUnavailableError
+from . import outbox, verification
+from .models import Payment
+
+logger = logging.getLogger(__name__)
+
+Cursor = Tuple[datetime, int]
+
+
+class RateLimiter:
+    """Spaces calls ``1 / rate`` seconds apart across threads; ``rate <= 0`` means unlimited."""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def load_checkpoint(path: str) -> Optional[Cursor]:
+    try:
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        return datetime.fromisoformat(data['created_at']), int(data['pk'])
+    except FileNotFoundError:
+        return None
+    except (ValueError, KeyError, TypeError) as exc:
+        logger.warning("[Reconcile] Ignoring unreadable checkpoint %s: %s", path, exc)
+        return None
+
+
+def save_checkpoint(path: str, cursor: Cursor) -> None:
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'created_at': cursor[0].isoformat(), 'pk': cursor[1], 'saved_at': timezone.now().isoformat()}, f)
+    os.replace(tmp_path, path)  # Atomic: a crash never leaves half a checkpoint
+
+
+def clear_checkpoint(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def stale_payments(min_age: timedelta, max_age: timedelta, after: Optional[Cursor] = None) -> QuerySet:
+    """Pending payments created between ``max_age`` and ``min_age`` ago, in cursor order."""
+    now = timezone.now()
+    payments = Payment.objects.filter(
+        status='pending',
+        created_at__lte=now - min_age,
+        created_at__gte=now - max_age,
+    )
+    if after is not None:
+        created_at, pk = after
+        payments = payments.filter(Q(created_at__gt=created_at) | Q(created_at=created_at, pk__gt=pk))
+    return payments.order_by('created_at', 'pk')
+
+
+def outcome(transaction_data: Dict[str, Any]) -> str:
+    """``'success'``, ``'failed'`` or ``'pending'`` (anything Lahza hasn't settled yet)."""
+    status = verification.transaction_status(transaction_data)
+    if status in verification.SUCCESS_STATUSES:
+        return 'success'
+    if status in verification.FAILURE_STATUSES:
+        return 'failed'
+    return 'pending'
+
+
+def _verify(payment: Payment, limiter: RateLimiter) -> Tuple[Payment, Optional[Dict[str, Any]], Optional[Exception]]:
+    limiter.wait()
+    try:
+        return payment, verification.verify(payment.reference), None
+    except LahzaAPIError as exc:
+        return payment, None, exc
+
+
+def apply_results(results: List[Tuple[Payment, Dict[str, Any]]]) -> Dict[str, int]:
+    """Apply settled verification results in one transaction, skipping rows that are no longer pending."""
+    applied = {'success': 0, 'failed': 0, 'skipped': 0}
+    by_pk = {payment.pk: transaction_data for payment, transaction_data in results}
+    with transaction.atomic():
+        for payment in Payment.objects.select_for_update().filter(pk__in=by_pk, status='pending'):
+            transaction_data = by_pk[payment.pk]
+            if outcome(transaction_data) == 'success':
+                outbox.mark_success_and_enqueue_receipt(payment, transaction_data)
+                applied['success'] += 1
+            else:
+                payment.lahza_response = transaction_data
+                payment.mark_as_failed(f'Reconciled: Lahza status {verification.transaction_status(transaction_data)}')
+                applied['failed'] += 1
+    applied['skipped'] = len(by_pk) - applied['success'] - applied['failed']
+    return applied
+
+
+def reconcile(
+    *,
+    min_age: timedelta,
+    max_age: timedelta,
+    batch_size: int = 100,
+    concurrency: int = 4,
+    rate: float = 5.0,
+    checkpoint: Optional[str] = None,
+    dry_run: bool = False,
+    max_pages: Optional[int] = None,
+    on_page: Optional[Callable[[int, Dict[str, int]], None]] = None,
+) -> Dict[str, int]:
+    """
+    Verify and settle stale pending payments; returns the counts of the run.
+
+    With ``dry_run`` results are only counted (as what would be applied):
+    nothing is written and the checkpoint is neither read nor saved.
+    """
+    summary = {'checked': 0, 'success': 0, 'failed': 0, 'pending': 0, 'skipped': 0, 'errors': 0, 'pages': 0}
+    cursor = load_checkpoint(checkpoint) if checkpoint and not dry_run else None
+    if cursor is not None:
+        logger.info("[Reconcile] Resuming after %s (pk %s)", cursor[0].isoformat(), cursor[1])
+    limiter = RateLimiter(rate)
+    completed = False
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='reconcile') as executor:
+        while max_pages is None or summary['pages'] < max_pages:
+            page = list(stale_payments(min_age, max_age, after=cursor)[:batch_size])
+            if not page:
+                completed = True
+                break
+            counts = {'checked': len(page), 'success': 0, 'failed': 0, 'pending': 0, 'skipped': 0, 'errors': 0}
+            settled = []
+            unavailable = None
+            for payment, transaction_data, error in executor.map(lambda p: _verify(p, limiter), page):
+                if error is not None:
+                    counts['errors'] += 1
+                    logger.warning("[Reconcile] Could not verify %s: %s", payment.reference, error)
+                    if isinstance(error, LahzaUnavailableError):
+                        unavailable = error
+                elif outcome(transaction_data) == 'pending':
+                    counts['pending'] += 1
+                else:
+                    settled.append((payment, transaction_data))
+            if dry_run:
+                for _payment, transaction_data in settled:
+                    counts[outcome(transaction_data)] += 1
+            elif settled:
+                for key, value in apply_results(settled).items():
+                    counts[key] += value
+            for key, value in counts.items():
+                summary[key] += value
+            summary['pages'] += 1
+            if on_page is not None:
+                on_page(summary['pages'], counts)
+            if unavailable is not None:
+                # The page isn't checkpointed: its unverified rows are retried by the next run
+                logger.error("[Reconcile] Lahza unavailable, stopping: %s", unavailable)
+                break
+            cursor = (page[-1].created_at, page[-1].pk)
+            if checkpoint and not dry_run:
+                save_checkpoint(checkpoint, cursor)
+            close_old_connections()
+    if completed and checkpoint and not dry_run:
+        clear_checkpoint(checkpoint)
+    return summary
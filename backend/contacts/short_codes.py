@@ -0,0 +1,82 @@
+"""
+Resolver for landing page short codes.
+
+Every active ``LandingPage`` is loaded in one query into a map keyed by short
+code. The map is shared between workers through the cache and kept in process
+memory, tagged with a version that ``contacts/signals.py`` bumps once a
+landing page save or delete is committed (bumping inside the transaction would
+let another worker reload the old rows under the new version). Both copies
+also expire after ``SHORT_CODE_MAP_TIMEOUT`` seconds, so a lost bump can't
+keep a stale map around for good.
+
+Because the map holds every active page, it is authoritative both ways: a hit
+is a positive entry and a miss is a negative one, so the scanners and bots
+probing random 8-character paths get a 404 without touching the database.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from typing import Dict, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import LandingPage
+
+logger = logging.getLogger(__name__)
+
+VERSION_KEY = 'short_codes:version'
+
+_lock = threading.Lock()
+_local: Dict[str, object] = {'version': None, 'pages': {}, 'loaded_at': 0.0}
+
+
+def _timeout() -> int:
+    return getattr(settings, 'SHORT_CODE_MAP_TIMEOUT', 300)
+
+
+def _current_version() -> int:
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, int(time.time() * 1000), timeout=None)
+        version = cache.get(VERSION_KEY) or int(time.time() * 1000)
+    return version
+
+
+def invalidate() -> None:
+    """Force every worker to reload the short code map on its next lookup."""
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, int(time.time() * 1000), timeout=None)
+
+
+def _load(version: int) -> Dict[str, LandingPage]:
+    key = f'short_codes:map:{version}'
+    pages = cache.get(key)
+    if pages is None:
+        pages = {page.short_code: page for page in LandingPage.objects.filter(is_active=True)}
+        cache.set(key, pages, _timeout())
+        logger.info("[Short Codes] Loaded %d active landing page(s)", len(pages))
+    return pages
+
+
+def warm() -> None:
+    """Load the short code map up front (called when the WSGI/ASGI application starts)."""
+    resolve(None)
+
+
+def resolve(short_code: Optional[str]) -> Optional[LandingPage]:
+    """Return the active ``LandingPage`` for ``short_code``, or ``None`` if there is none."""
+    version = _current_version()
+    if _local['version'] != version or time.monotonic() - _local['loaded_at'] > _timeout():
+        with _lock:
+            if _local['version'] != version or time.monotonic() - _local['loaded_at'] > _timeout():
+                _local['pages'] = _load(version)
+                _local['version'] = version
+                _local['loaded_at'] = time.monotonic()
+    if not short_code:
+        return None
+    return _local['pages'].get(short_code.upper())
@@ -0,0 +1,37 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from config.landing_cache import bump_landing_version
+from config.snapshots import schedule_export
+from . import payment_events, short_codes
+from .models import BlackFridaySettings, LandingPage, Payment
+
+
+@receiver([post_save, post_delete], sender=LandingPage)
+@receiver([post_save, post_delete], sender=BlackFridaySettings)
+def invalidate_landing_cache(sender, **kwargs):
+    """Drop cached landing context and pages whenever landing content changes, once the change is committed"""
+    transaction.on_commit(bump_landing_version)
+
+
+@receiver([post_save, post_delete], sender=LandingPage)
+def invalidate_short_codes(sender, **kwargs):
+    """Reload the short code map in every worker once the change is committed"""
+    transaction.on_commit(short_codes.invalidate)
+
+
+@receiver([post_save, post_delete], sender=LandingPage)
+@receiver([post_save, post_delete], sender=BlackFridaySettings)
+def refresh_snapshots(sender, **kwargs):
+    """Re-export static landing snapshots once the change is committed"""
+    if getattr(settings, 'SNAPSHOT_EXPORT_ON_SAVE', True):
+        transaction.on_commit(schedule_export)
+
+
+@receiver(post_save, sender=Payment)
+def push_payment_status(sender, instance, update_fields=None, **kwargs):
+    """Tell open payment status streams once the payment settles"""
+    if instance.status in ('success', 'failed') and (update_fields is None or 'status' in update_fields):
+        transaction.on_commit(lambda: payment_events.publish(instance))
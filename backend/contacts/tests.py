@@ -1,3 +1,750 @@
-from django.test import TestCase
+import asyncio
+import json
+import socketserver
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from io import StringIO
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.core.mail import EmailMessage
+from django.core.management import CommandError, call_command
+from django.db import IntegrityError, transaction
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from config import instructions_pdf, lahza_service
+from config.fake_lahza import FakeLahzaServer
+from config.lahza_service import LahzaAPIError
+from config.mailer import PooledMailer
+from contacts import outbox, verification, webhooks
+from contacts.models import EmailOutbox, Payment, WebhookEvent
+
+
+class SMTPSink:
+    """
+    Minimal SMTP server on a free local port that accepts every message.
+
+    Counts connections and records each message's recipients; with
+    ``drop_after`` set, it closes a connection after that many messages, like a
+    server dropping a client.
+    """
+
+    def __init__(self, drop_after=None):
+        self.drop_after = drop_after
+        self.connections = 0
+        self.recipients = []
+        self._lock = threading.Lock()
+        self._server = socketserver.ThreadingTCPServer(('127.0.0.1', 0), self._handler_class())
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+
+    def start(self):
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    @property
+    def messages(self):
+        return len(self.recipients)
+
+    def _handler_class(self):
+        sink = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def reply(self, line):
+                self.wfile.write(line.encode() + b'\r\n')
+
+            def handle(self):
+                with sink._lock:
+                    sink.connections += 1
+                sent, rcpt = 0, []
+                self.reply('220 sink ESMTP')
+                for line in self.rfile:
+                    command = line.decode('utf-8', 'replace').strip()
+                    verb = command.split(' ', 1)[0].upper()
+                    if verb in ('EHLO', 'HELO'):
+                        self.reply('250 sink')
+                    elif verb == 'RCPT':
+                        rcpt.append(command.split(':', 1)[1].strip(' <>'))
+                        self.reply('250 ok')
+                    elif verb == 'DATA':
+                        self.reply('354 end with .')
+                        for data in self.rfile:
+                            if data in (b'.\r\n', b'.\n'):
+                                break
+                        with sink._lock:
+                            sink.recipients.append(rcpt)
+                        sent, rcpt = sent + 1, []
+                        self.reply('250 queued')
+                        if sink.drop_after and sent >= sink.drop_after:
+                            return
+                    elif verb == 'QUIT':
+                        self.reply('221 bye')
+                        return
+                    else:
+                        self.reply('250 ok')
+
+        return Handler
+
+
+class LahzaPaymentFlowTests(TestCase):
+    """Initialize, verify and callback through the real async views, against ``config.fake_lahza``."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = FakeLahzaServer(latency=0, seed=1).start()
+        cls.settings_override = override_settings(
+            LAHZA_BASE_URL=cls.server.url,
+            LAHZA_SECRET_KEY='sk_test_contacts',
+            LAHZA_VERIFY_RETRIES=0,
+            WEBHOOK_INBOX_INLINE_WORKER=False,
+        )
+        cls.settings_override.enable()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.settings_override.disable()
+        cls.server.stop()
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+        self.server.stats.clear()
+        self.server.decline_rate = 0.0
+        self.server.error_rate = 0.0
+        self.server.settle_delay = 0.0
+        # Fresh breaker and clients, built from the overridden settings
+        lahza_service._breaker = None
+        lahza_service._client = None
+
+    async def initialize(self, path='/checkout/payment/initialize/', headers=None, **data):
+        payload = {
+            'email': 'customer@example.com', 'firstName': 'Test', 'lastName': 'Customer',
+            'mobile': '0599000000', 'amount': 49, 'currency': 'usd',
+        }
+        payload.update(data)
+        return await self.async_client.post(path, json.dumps(payload), content_type='application/json', headers=headers)
+
+    async def test_initialize_creates_pending_payment(self):
+        response = await self.initialize()
+
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertTrue(body['success'])
+        self.assertTrue(body['reference'].startswith('CK-'))
+        self.assertTrue(body['authorization_url'].startswith(self.server.url))
+        payment = await Payment.objects.aget(reference=body['reference'])
+        self.assertEqual(payment.status, 'pending')
+        self.assertEqual(payment.source, 'checkout')
+        self.assertEqual(payment.mobile, '+970599000000')
+        self.assertEqual(payment.transaction_id, str(self.server.transactions[body['reference']]['id']))
+        self.assertEqual(self.server.stats['initialize'], 1)
+
+    async def test_initialize_requires_email_without_calling_lahza(self):
+        response = await self.initialize(email='')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(await Payment.objects.aexists())
+        self.assertEqual(self.server.stats['initialize'], 0)
+
+    async def test_repeated_initialize_returns_the_same_payment(self):
+        first = await self.initialize()
+        second = await self.initialize()
+
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second['Idempotent-Replayed'], 'true')
+        self.assertEqual(second.json()['reference'], first.json()['reference'])
+        self.assertEqual(await Payment.objects.acount(), 1)
+        self.assertEqual(self.server.stats['initialize'], 1)
+
+    async def test_idempotency_key_replays_the_stored_response(self):
+        first = await self.initialize(headers={'Idempotency-Key': 'order-1'})
+        # Same key, different form: still the first request's payment, even once it is paid
+        await Payment.objects.filter(reference=first.json()['reference']).aupdate(status='success')
+        second = await self.initialize(amount=99, headers={'Idempotency-Key': 'order-1'})
+
+        self.assertEqual(second['Idempotent-Replayed'], 'true')
+        self.assertEqual(second.json(), first.json())
+        self.assertEqual(await Payment.objects.acount(), 1)
+        self.assertEqual(self.server.stats['initialize'], 1)
+
+        other = await self.initialize(headers={'Idempotency-Key': 'order-2'})
+        self.assertNotEqual(other.json()['reference'], first.json()['reference'])
+
+    async def test_form_key_replays_only_while_payment_is_pending(self):
+        first = (await self.initialize()).json()['reference']
+        await self.async_client.get(f'/checkout/payment/verify/?reference={first}')
+
+        second = await self.initialize()
+
+        self.assertFalse(second.has_header('Idempotent-Replayed'))
+        self.assertNotEqual(second.json()['reference'], first)
+        self.assertEqual(await Payment.objects.acount(), 2)
+        self.assertEqual(self.server.stats['initialize'], 2)
+
+    async def test_failed_initialize_releases_the_claim(self):
+        self.server.error_rate = 1.0
+        self.assertEqual((await self.initialize()).status_code, 400)
+
+        self.server.error_rate = 0.0
+        response = await self.initialize()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header('Idempotent-Replayed'))
+        payment = await Payment.objects.aget(reference=response.json()['reference'])
+        self.assertEqual(payment.status, 'pending')
+
+    async def test_initialize_error_releases_the_claim(self):
+        with mock.patch('config.views.payments._initialize_lahza_payment', side_effect=RuntimeError('boom')):
+            with self.assertRaises(RuntimeError):
+                await self.initialize(headers={'Idempotency-Key': 'order-3'})
+
+        response = await self.initialize(headers={'Idempotency-Key': 'order-3'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header('Idempotent-Replayed'))
+        self.assertEqual(await Payment.objects.acount(), 1)
+
+    async def test_initialize_when_lahza_is_down(self):
+        self.server.error_rate = 1.0
+
+        response = await self.initialize()
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(response.json()['success'])
+
+    async def test_verify_marks_payment_successful_and_queues_receipt(self):
+        reference = (await self.initialize()).json()['reference']
+
+        response = await self.async_client.get(f'/checkout/payment/verify/?reference={reference}')
+
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertTrue(body['success'])
+        self.assertEqual(body['status'], 'success')
+        payment = await Payment.objects.aget(reference=reference)
+        self.assertEqual(payment.status, 'success')
+        self.assertIsNotNone(payment.paid_at)
+        self.assertTrue(payment.card_brand)
+        self.assertEqual(await EmailOutbox.objects.filter(payment=payment, status='pending').acount(), 1)
+
+    async def test_verify_of_settled_payment_answers_from_database(self):
+        reference = (await self.initialize()).json()['reference']
+        await self.async_client.get(f'/checkout/payment/verify/?reference={reference}')
+        cache.clear()
+
+        response = await self.async_client.get(f'/checkout/payment/verify/?reference={reference}')
+
+        self.assertEqual(response.json()['status'], 'success')
+        self.assertEqual(self.server.stats['verify'], 1)
+        self.assertEqual(await EmailOutbox.objects.acount(), 1)
+
+    async def test_verify_pending_payment(self):
+        self.server.settle_delay = 60
+        reference = (await self.initialize()).json()['reference']
+
+        response = await self.async_client.get(f'/checkout/payment/verify/?reference={reference}')
+
+        self.assertEqual(response.json()['status'], 'pending')
+        payment = await Payment.objects.aget(reference=reference)
+        self.assertEqual(payment.status, 'pending')
+        self.assertFalse(await EmailOutbox.objects.aexists())
+
+    async def test_verify_declined_payment(self):
+        self.server.decline_rate = 1.0
+        reference = (await self.initialize()).json()['reference']
+
+        response = await self.async_client.get(f'/checkout/payment/verify/?reference={reference}')
+
+        body = response.json()
+        self.assertFalse(body['success'])
+        self.assertEqual(body['status'], 'failed')
+        payment = await Payment.objects.aget(reference=reference)
+        self.assertEqual(payment.status, 'failed')
+        self.assertFalse(await EmailOutbox.objects.aexists())
+
+    async def test_verify_keeps_payment_pending_when_lahza_is_down(self):
+        reference = (await self.initialize()).json()['reference']
+        self.server.error_rate = 1.0
+
+        response = await self.async_client.get(f'/checkout/payment/verify/?reference={reference}')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['status'], 'pending')
+        payment = await Payment.objects.aget(reference=reference)
+        self.assertEqual(payment.status, 'pending')
+
+    async def test_verify_requires_reference(self):
+        response = await self.async_client.get('/checkout/payment/verify/')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.server.stats['verify'], 0)
+
+    async def test_black_friday_callback(self):
+        response = await self.initialize(path='/black-friday/payment/initialize/', source='black_friday')
+        reference = response.json()['reference']
+        self.assertTrue(reference.startswith('BF-'))
+
+        response = await self.async_client.get(f'/black-friday/payment/callback/?reference={reference}')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['status'], 'success')
+        payment = await Payment.objects.aget(reference=reference)
+        self.assertEqual(payment.status, 'success')
+        self.assertEqual(payment.source, 'black_friday')
+
+    async def webhook(self, payload):
+        return await self.async_client.post('/api/lahza/webhook/', json.dumps(payload), content_type='application/json')
+
+    def process_webhooks(self):
+        """Run due inbox rows one at a time in this thread (what the webhook worker does)."""
+        outcomes = []
+        for event in webhooks.queue.claim(10):
+            outcomes.append(webhooks.queue.run(event))
+        return outcomes
+
+    async def test_webhook_redelivery_is_recorded_once(self):
+        reference = (await self.initialize()).json()['reference']
+        payload = self.server.webhook_payload(reference)
+
+        first = await self.webhook(payload)
+        second = await self.webhook(payload)
+
+        self.assertEqual(first.json()['message'], 'Webhook received')
+        self.assertEqual(second.json()['message'], 'Webhook already received')
+        event = await WebhookEvent.objects.aget()
+        self.assertEqual((event.reference, event.payment_status), (reference, 'success'))
+        self.assertEqual(event.deliveries, 2)
+        self.assertEqual(event.status, 'pending')
+
+    async def test_webhook_marks_payment_paid_and_replay_is_a_no_op(self):
+        reference = (await self.initialize()).json()['reference']
+        await self.webhook(self.server.webhook_payload(reference))
+
+        self.assertEqual(await sync_to_async(self.process_webhooks)(), [True])
+
+        payment = await Payment.objects.aget(reference=reference)
+        self.assertEqual(payment.status, 'success')
+        self.assertEqual(self.server.stats['verify'], 1)
+        self.assertEqual(await EmailOutbox.objects.filter(payment=payment).acount(), 1)
+
+        # Replayed by Lahza (or by hand): acknowledged, not processed again
+        response = await self.webhook(self.server.webhook_payload(reference))
+        self.assertEqual(response.json()['message'], 'Webhook already received')
+        self.assertEqual(await sync_to_async(self.process_webhooks)(), [])
+        event = await WebhookEvent.objects.aget()
+        await sync_to_async(webhooks.process_event)(event)
+        self.assertEqual(self.server.stats['verify'], 1)
+        self.assertEqual(await EmailOutbox.objects.acount(), 1)
+        self.assertEqual(event.status, 'processed')
+
+    @override_settings(WEBHOOK_INBOX_MAX_ATTEMPTS=2)
+    async def test_webhook_is_trusted_once_verify_retries_run_out(self):
+        reference = (await self.initialize()).json()['reference']
+        self.server.error_rate = 1.0
+        await self.webhook({'data': {'reference': reference, 'status': 'success'}})
+
+        self.assertEqual(await sync_to_async(self.process_webhooks)(), [False])
+        event = await WebhookEvent.objects.aget()
+        self.assertEqual((event.status, event.attempts), ('pending', 1))
+        self.assertEqual((await Payment.objects.aget(reference=reference)).status, 'pending')
+
+        await WebhookEvent.objects.aupdate(next_attempt_at=timezone.now())
+        self.assertEqual(await sync_to_async(self.process_webhooks)(), [True])
+
+        payment = await Payment.objects.aget(reference=reference)
+        self.assertEqual(payment.status, 'success')
+        self.assertIsNotNone(payment.paid_at)
+        self.assertEqual(await EmailOutbox.objects.filter(payment=payment).acount(), 1)
+        event = await WebhookEvent.objects.aget()
+        self.assertEqual((event.status, event.attempts), ('processed', 2))
+
+    async def test_status_stream_sends_settled_payment(self):
+        reference = (await self.initialize()).json()['reference']
+        await self.async_client.get(f'/checkout/payment/verify/?reference={reference}')
+
+        response = await self.async_client.get(f'/api/payments/{reference}/events/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        events = ''.join([chunk.decode() if isinstance(chunk, bytes) else chunk
+                          async for chunk in response.streaming_content])
+        self.assertIn('event: status', events)
+        self.assertIn('"status": "success"', events)
+
+    def test_status_stream_is_refused_under_wsgi(self):
+        payment = Payment.objects.create(
+            reference='CK-WSGI', customer_name='Test Customer', customer_email='customer@example.com', amount=49,
+        )
+
+        response = self.client.get(f'/api/payments/{payment.reference}/events/')
+
+        self.assertEqual(response.status_code, 503)
+
+
+class SMTPSinkTestCase(TestCase):
+    drop_after = None
+
+    def setUp(self):
+        self.sink = SMTPSink(drop_after=self.drop_after).start()
+        self.addCleanup(self.sink.stop)
+        override = override_settings(
+            EMAIL_BACKEND='django.core.mail.backends.smtp.EmailBackend',
+            EMAIL_HOST='127.0.0.1',
+            EMAIL_PORT=self.sink.port,
+            EMAIL_USE_TLS=False,
+            EMAIL_USE_SSL=False,
+            EMAIL_HOST_USER='',
+            EMAIL_HOST_PASSWORD='',
+        )
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def message(self, number):
+        return EmailMessage(f'Message {number}', 'Body', 'info@example.com', [f'customer{number}@example.com'])
+
+
+class PooledMailerTests(SMTPSinkTestCase):
+    def test_reuses_one_connection(self):
+        with PooledMailer() as mailer:
+            for number in range(5):
+                mailer.send(self.message(number))
+
+        self.assertEqual(self.sink.messages, 5)
+        self.assertEqual(self.sink.connections, 1)
+        self.assertEqual(mailer.connections_opened, 1)
+        self.assertEqual(mailer.messages_sent, 5)
+
+    def test_reconnects_after_max_messages(self):
+        with PooledMailer(max_messages=2) as mailer:
+            for number in range(5):
+                mailer.send(self.message(number))
+
+        self.assertEqual(self.sink.messages, 5)
+        self.assertEqual(self.sink.connections, 3)
+
+    def test_reconnects_after_idle_time(self):
+        with PooledMailer(idle_seconds=0) as mailer:
+            mailer.send(self.message(1))
+            mailer._last_used -= 1
+            mailer.send(self.message(2))
+
+        self.assertEqual(self.sink.connections, 2)
+
+
+class PooledMailerDropTests(SMTPSinkTestCase):
+    drop_after = 2
+
+    def test_reconnects_when_server_drops_connection(self):
+        with PooledMailer() as mailer:
+            for number in range(5):
+                mailer.send(self.message(number))
+
+        self.assertEqual(self.sink.messages, 5)
+        self.assertEqual(self.sink.connections, 3)
+        self.assertEqual(mailer.messages_sent, 5)
+        self.assertEqual(self.sink.recipients, [[f'customer{number}@example.com'] for number in range(5)])
+
+
+class ResendReceiptsTests(SMTPSinkTestCase):
+    def payment(self, reference, *, status='success', email=None, day=2):
+        return Payment.objects.create(
+            reference=reference,
+            customer_name='Test Customer',
+            customer_email=email or f'{reference.lower()}@example.com',
+            amount=49,
+            currency='USD',
+            status=status,
+            created_at=timezone.make_aware(datetime(2024, 11, day, 12)),
+        )
+
+    def setUp(self):
+        super().setUp()
+        self.payment('OLD', day=1)
+        self.payment('PAID1')
+        self.payment('PAID2', day=3)
+        self.payment('PENDING', status='pending')
+        self.payment('FAILED', status='failed')
+        self.payment('LATE', day=20)
+
+    def resend(self, *args, **options):
+        stdout = StringIO()
+        call_command('resend_receipts', *args, stdout=stdout, stderr=StringIO(), **options)
+        return stdout.getvalue()
+
+    def sent_to(self):
+        return [recipients[0] for recipients in self.sink.recipients]
+
+    def test_resends_successful_payments_in_range_over_one_connection(self):
+        output = self.resend(since='2024-11-02', until='2024-11-10')
+
+        self.assertEqual(self.sent_to(), ['paid1@example.com', 'paid2@example.com'])
+        self.assertEqual(self.sink.connections, 1)
+        self.assertIn('Resent 2 receipt(s), 0 failed', output)
+
+    def test_any_status(self):
+        self.resend(since='2024-11-02', until='2024-11-02', status='any')
+
+        self.assertEqual(self.sent_to(), ['paid1@example.com', 'pending@example.com', 'failed@example.com'])
+
+    def test_reference_email_and_limit(self):
+        self.resend(reference=['PAID2', 'LATE', 'PENDING'])
+        self.assertEqual(self.sent_to(), ['paid2@example.com', 'late@example.com'])
+
+        self.sink.recipients.clear()
+        self.resend(email='PAID1@example.com')
+        self.assertEqual(self.sent_to(), ['paid1@example.com'])
+
+        self.sink.recipients.clear()
+        self.resend(since='2024-11-01', limit=2)
+        self.assertEqual(self.sent_to(), ['old@example.com', 'paid1@example.com'])
+
+    def test_dry_run_sends_nothing(self):
+        output = self.resend(since='2024-11-01', dry_run=True)
+
+        self.assertEqual(self.sink.connections, 0)
+        self.assertIn('4 receipt(s) would be resent', output)
+        self.assertIn('PAID1', output)
+        self.assertNotIn('PENDING', output)
+
+    def test_requires_a_selection(self):
+        with self.assertRaises(CommandError):
+            self.resend()
+        self.assertEqual(self.sink.connections, 0)
+
+
+class VerificationSingleFlightTests(TestCase):
+    """``contacts.verification``: one Lahza call per reference, however many callers."""
+
+    def setUp(self):
+        cache.clear()
+        self.calls = 0
+
+    def verify_transaction(self, result=None, error=None, release=None):
+        def verify_transaction(reference):
+            self.calls += 1
+            if release is not None:
+                release.wait(5)
+            if error is not None:
+                raise error
+            return result
+        return mock.patch.object(verification, 'verify_transaction', side_effect=verify_transaction)
+
+    def averify_transaction(self, result=None, error=None):
+        async def averify_transaction(reference):
+            self.calls += 1
+            await asyncio.sleep(0.05)
+            if error is not None:
+                raise error
+            return result
+        return mock.patch.object(verification, 'averify_transaction', side_effect=averify_transaction)
+
+    def run_in_threads(self, count):
+        outcomes = []
+
+        def target():
+            try:
+                outcomes.append(verification.verify('CK-VERIFY'))
+            except Exception as exc:
+                outcomes.append(exc)
+
+        threads = [threading.Thread(target=target) for _ in range(count)]
+        for thread in threads:
+            thread.start()
+        return threads, outcomes
+
+    async def test_concurrent_averify_calls_lahza_once(self):
+        with self.averify_transaction({'status': 'success'}):
+            results = await asyncio.gather(*[verification.averify('CK-VERIFY') for _ in range(5)])
+
+        self.assertEqual(results, [{'status': 'success'}] * 5)
+        self.assertEqual(self.calls, 1)
+
+    def test_concurrent_verify_calls_lahza_once(self):
+        release = threading.Event()
+        with self.verify_transaction({'status': 'success'}, release=release):
+            threads, outcomes = self.run_in_threads(5)
+            time.sleep(0.2)  # Let every thread join the leader's call
+            release.set()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(outcomes, [{'status': 'success'}] * 5)
+        self.assertEqual(self.calls, 1)
+
+    def test_terminal_result_is_cached(self):
+        with self.verify_transaction({'status': 'failed'}):
+            verification.verify('CK-VERIFY')
+            with mock.patch('time.time', return_value=time.time() + 3600):
+                self.assertEqual(verification.verify('CK-VERIFY'), {'status': 'failed'})
+
+        self.assertEqual(self.calls, 1)
+
+    def test_pending_result_expires_after_three_seconds(self):
+        with self.verify_transaction({'status': 'pending'}):
+            verification.verify('CK-VERIFY')
+            with mock.patch('time.time', return_value=time.time() + 2):
+                verification.verify('CK-VERIFY')
+            self.assertEqual(self.calls, 1)
+
+            with mock.patch('time.time', return_value=time.time() + 4):
+                verification.verify('CK-VERIFY')
+
+        self.assertEqual(self.calls, 2)
+
+    def test_leader_failure_reaches_the_waiters(self):
+        release = threading.Event()
+        with self.verify_transaction(error=LahzaAPIError('Lahza returned HTTP 503'), release=release):
+            threads, outcomes = self.run_in_threads(3)
+            time.sleep(0.2)
+            release.set()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(len(outcomes), 3)
+        self.assertTrue(all(isinstance(outcome, LahzaAPIError) for outcome in outcomes))
+        self.assertEqual(self.calls, 1)
+        self.assertIsNone(cache.get(verification._result_key('CK-VERIFY')))
+
+    async def test_async_leader_failure_reaches_the_waiters(self):
+        with self.averify_transaction(error=LahzaAPIError('Lahza returned HTTP 503')):
+            outcomes = await asyncio.gather(
+                *[verification.averify('CK-VERIFY') for _ in range(3)], return_exceptions=True,
+            )
+
+        self.assertTrue(all(isinstance(outcome, LahzaAPIError) for outcome in outcomes))
+        self.assertEqual(self.calls, 1)
+
+
+@override_settings(EMAIL_OUTBOX_INLINE_WORKER=False, EMAIL_OUTBOX_MAX_ATTEMPTS=3, EMAIL_OUTBOX_LEASE_SECONDS=300)
+class EmailOutboxTests(TestCase):
+    """Enqueue, claim, lease, backoff and dead-lettering of ``contacts.outbox``."""
+
+    def setUp(self):
+        self.payment = Payment.objects.create(
+            reference='CK-OUTBOX', customer_name='Test Customer', customer_email='customer@example.com',
+            amount=49, status='success',
+        )
+        self.sent = []
+        senders = mock.patch.dict(outbox.SENDERS, {'payment_receipt': lambda item: self.sent.append(item.pk)})
+        senders.start()
+        self.addCleanup(senders.stop)
+
+    def failing_sender(self, item):
+        raise ConnectionRefusedError('SMTP down')
+
+    def test_double_enqueue_queues_one_receipt(self):
+        self.assertTrue(outbox.enqueue_receipt(self.payment))
+        self.assertFalse(outbox.enqueue_receipt(self.payment))
+
+        self.assertEqual(EmailOutbox.objects.count(), 1)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            EmailOutbox.objects.create(payment=self.payment, kind='payment_receipt', recipient='x@example.com')
+
+    def test_claimed_row_is_leased_to_one_worker(self):
+        outbox.enqueue_receipt(self.payment)
+
+        claimed = outbox.queue.claim(10)
+
+        self.assertEqual(len(claimed), 1)
+        self.assertEqual(claimed[0].status, 'sending')
+        self.assertGreater(claimed[0].locked_until, timezone.now())
+        self.assertEqual(outbox.queue.claim(10), [])
+
+    def test_expired_lease_is_reclaimed(self):
+        outbox.enqueue_receipt(self.payment)
+        item = outbox.queue.claim(10)[0]
+        EmailOutbox.objects.filter(pk=item.pk).update(locked_until=timezone.now() - timedelta(seconds=1))
+
+        reclaimed = outbox.queue.claim(10)
+
+        self.assertEqual([row.pk for row in reclaimed], [item.pk])
+        self.assertTrue(outbox.queue.run(reclaimed[0]))
+        item.refresh_from_db()
+        self.assertEqual(item.status, 'sent')
+        self.assertEqual(item.attempts, 1)
+        self.assertIsNotNone(item.sent_at)
+        self.assertEqual(self.sent, [item.pk])
+
+    def test_failed_send_backs_off(self):
+        outbox.enqueue_receipt(self.payment)
+        outbox.SENDERS['payment_receipt'] = self.failing_sender
+
+        self.assertFalse(outbox.queue.run(outbox.queue.claim(10)[0]))
+
+        item = EmailOutbox.objects.get()
+        self.assertEqual(item.status, 'pending')
+        self.assertEqual(item.attempts, 1)
+        self.assertIsNone(item.locked_until)
+        self.assertIn('SMTP down', item.last_error)
+        self.assertGreater(item.next_attempt_at, timezone.now())
+        self.assertEqual(outbox.queue.claim(10), [])
+
+    def test_dead_lettered_after_max_attempts(self):
+        outbox.enqueue_receipt(self.payment)
+        outbox.SENDERS['payment_receipt'] = self.failing_sender
+
+        for _attempt in range(3):
+            EmailOutbox.objects.filter(status='pending').update(next_attempt_at=timezone.now())
+            outbox.queue.run(outbox.queue.claim(10)[0])
+
+        item = EmailOutbox.objects.get()
+        self.assertEqual(item.status, 'dead')
+        self.assertEqual(item.attempts, 3)
+        self.assertEqual(outbox.queue.claim(10), [])
+
+    def test_sqlite_lock_holder_is_the_only_claimer(self):
+        outbox.enqueue_receipt(self.payment)
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        lock_path = str(Path(directory.name) / 'db.sqlite3.email_outbox.lock')
+
+        with mock.patch.object(outbox.queue, '_sqlite_lock_path', return_value=lock_path), \
+                mock.patch.object(outbox.queue, '_process_due', return_value={'succeeded': 1, 'failed': 0}) as process:
+            with outbox.queue._single_claimer(lock_path) as holder:
+                self.assertTrue(holder)
+                # Another claimer (e.g. a web worker's drain) leaves the rows alone
+                self.assertEqual(outbox.queue.process_due(), {'succeeded': 0, 'failed': 0})
+                process.assert_not_called()
+
+            self.assertEqual(outbox.queue.process_due(batch_size=20), {'succeeded': 1, 'failed': 0})
+            process.assert_called_once_with(20, 1)
+
+        self.assertEqual(EmailOutbox.objects.get().status, 'pending')
+
+
+class InstructionsPDFCacheTests(TestCase):
+    """Per-order PDFs are cached under ``INSTRUCTIONS_PDF_CACHE_DIR``, here a temporary directory."""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.cache_dir = Path(directory.name)
+        override = override_settings(INSTRUCTIONS_PDF_CACHE_DIR=directory.name)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def test_rendered_pdf_is_cached_and_reused(self):
+        pdf = instructions_pdf.render('CK-PDF1')
+
+        path = self.cache_dir / instructions_pdf.TEMPLATE_VERSION / 'CK-PDF1.pdf'
+        self.assertTrue(pdf.startswith(b'%PDF'))
+        self.assertIn(b'CK-PDF1', pdf)
+        self.assertEqual(path.read_bytes(), pdf)
+
+        path.write_bytes(b'%PDF cached')
+        self.assertEqual(instructions_pdf.render('CK-PDF1'), b'%PDF cached')
+
+    def test_unsafe_reference_is_not_cached(self):
+        instructions_pdf.render('../CK-PDF2')
+
+        self.assertEqual(list(self.cache_dir.rglob('*.pdf')), [])
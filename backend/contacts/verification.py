@@ -0,0 +1,212 @@
+"""
+Single-flight coordination of Lahza transaction verifications.
+
+One reference is verified from several places at once: the browser callback,
+frontend polling and the webhook processor. ``verify``/``averify`` wrap
+``verify_transaction`` so that:
+
+- concurrent calls for the same reference in one process share a single
+  in-flight call (a thread/coroutine leads, the others wait for its result);
+- across workers, the leader takes a short shared-cache lock (``cache.add``)
+  and publishes its result; other workers wait for that result instead of
+  calling Lahza themselves;
+- terminal results (paid or failed) stay cached for
+  ``PAYMENT_VERIFY_TERMINAL_TTL``, and non-terminal ones for
+  ``PAYMENT_VERIFY_RESULT_TTL`` seconds, which absorbs bursts of polling.
+
+``settled_status(payment)`` tells callers when the ``Payment`` row already
+holds a final, gateway-confirmed outcome, in which case Lahza isn't called at
+all.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+import uuid
+import weakref
+from typing import Any, Dict, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+
+from config.lahza_service import averify_transaction, verify_transaction
+
+logger = logging.getLogger(__name__)
+
+# Lahza may report a transaction's outcome as any of these
+SUCCESS_STATUSES = ('success', 'completed', 'paid', 'approved', 'successful')
+FAILURE_STATUSES = ('failed', 'declined', 'rejected', 'cancelled')
+
+POLL_INTERVAL = 0.05
+
+
+def _setting(name: str, default):
+    return getattr(settings, name, default)
+
+
+def _result_key(reference: str) -> str:
+    return f'payment_verification:result:{reference}'
+
+
+def _lock_key(reference: str) -> str:
+    return f'payment_verification:lock:{reference}'
+
+
+def transaction_status(transaction_data: Dict[str, Any]) -> str:
+    status = transaction_data.get('status') if isinstance(transaction_data, dict) else ''
+    if not status and isinstance(transaction_data, dict) and isinstance(transaction_data.get('data'), dict):
+        status = transaction_data['data'].get('status', '')
+    return str(status or '').lower()
+
+
+def is_terminal(transaction_data: Dict[str, Any]) -> bool:
+    return transaction_status(transaction_data) in SUCCESS_STATUSES + FAILURE_STATUSES
+
+
+def settled_status(payment) -> Optional[str]:
+    """``'success'``/``'failed'`` when ``payment`` already holds Lahza's final answer, else ``None``."""
+    if payment.status == 'success':
+        return 'success'
+    if payment.status == 'failed' and transaction_status(payment.lahza_response or {}) in FAILURE_STATUSES:
+        # Only a failure Lahza reported; internal errors also mark payments failed
+        return 'failed'
+    return None
+
+
+def _result_ttl(transaction_data: Dict[str, Any]) -> int:
+    if is_terminal(transaction_data):
+        return _setting('PAYMENT_VERIFY_TERMINAL_TTL', 86400)
+    return _setting('PAYMENT_VERIFY_RESULT_TTL', 3)
+
+
+def _publish(reference: str, transaction_data: Dict[str, Any]) -> None:
+    ttl = _result_ttl(transaction_data)
+    if ttl > 0:
+        cache.set(_result_key(reference), transaction_data, ttl)
+
+
+def _release(reference: str, token: str) -> None:
+    if cache.get(_lock_key(reference)) == token:
+        cache.delete(_lock_key(reference))
+
+
+def forget(reference: str) -> None:
+    """Drop the cached result (e.g. after an admin changes the payment by hand)."""
+    cache.delete(_result_key(reference))
+
+
+# Sync callers (webhook processor, management commands)
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[BaseException] = None
+
+
+_calls: Dict[str, _Call] = {}
+_calls_lock = threading.Lock()
+
+
+def _verify_across_workers(reference: str) -> Dict[str, Any]:
+    lock_seconds = _setting('PAYMENT_VERIFY_LOCK_SECONDS', 30)
+    deadline = time.monotonic() + lock_seconds
+    while True:
+        cached = cache.get(_result_key(reference))
+        if cached is not None:
+            return cached
+        token = uuid.uuid4().hex
+        if cache.add(_lock_key(reference), token, lock_seconds):
+            try:
+                transaction_data = verify_transaction(reference)
+                _publish(reference, transaction_data)
+                return transaction_data
+            finally:
+                _release(reference, token)
+        if time.monotonic() >= deadline:
+            logger.warning("[Verification] Gave up waiting for another worker on %s, verifying directly", reference)
+            return verify_transaction(reference)
+        time.sleep(POLL_INTERVAL)
+
+
+def verify(reference: str) -> Dict[str, Any]:
+    """``verify_transaction(reference)``, coalesced with concurrent verifications of the same reference."""
+    cached = cache.get(_result_key(reference))
+    if cached is not None:
+        return cached
+    with _calls_lock:
+        call = _calls.get(reference)
+        leader = call is None
+        if leader:
+            call = _calls[reference] = _Call()
+    if not leader:
+        call.done.wait()
+        if call.error is not None:
+            raise call.error
+        return call.result
+    try:
+        call.result = _verify_across_workers(reference)
+        return call.result
+    except BaseException as exc:
+        call.error = exc
+        raise
+    finally:
+        with _calls_lock:
+            _calls.pop(reference, None)
+        call.done.set()
+
+
+# Async callers (payment views); in-flight calls are per event loop
+
+_async_calls: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Future]]" = weakref.WeakKeyDictionary()
+
+
+async def _averify_across_workers(reference: str) -> Dict[str, Any]:
+    lock_seconds = _setting('PAYMENT_VERIFY_LOCK_SECONDS', 30)
+    deadline = time.monotonic() + lock_seconds
+    while True:
+        cached = await cache.aget(_result_key(reference))
+        if cached is not None:
+            return cached
+        token = uuid.uuid4().hex
+        if await cache.aadd(_lock_key(reference), token, lock_seconds):
+            try:
+                transaction_data = await averify_transaction(reference)
+                ttl = _result_ttl(transaction_data)
+                if ttl > 0:
+                    await cache.aset(_result_key(reference), transaction_data, ttl)
+                return transaction_data
+            finally:
+                if await cache.aget(_lock_key(reference)) == token:
+                    await cache.adelete(_lock_key(reference))
+        if time.monotonic() >= deadline:
+            logger.warning("[Verification] Gave up waiting for another worker on %s, verifying directly", reference)
+            return await averify_transaction(reference)
+        await asyncio.sleep(POLL_INTERVAL)
+
+
+async def averify(reference: str) -> Dict[str, Any]:
+    """Async ``verify``: concurrent requests for a reference await one upstream call."""
+    cached = await cache.aget(_result_key(reference))
+    if cached is not None:
+        return cached
+    loop = asyncio.get_running_loop()
+    calls = _async_calls.setdefault(loop, {})
+    future = calls.get(reference)
+    if future is not None:
+        # shield: a cancelled follower (client went away) must not cancel the shared call
+        return await asyncio.shield(future)
+    future = calls[reference] = loop.create_future()
+    try:
+        result = await _averify_across_workers(reference)
+    except BaseException as exc:
+        future.set_exception(exc)
+        future.exception()  # Mark retrieved: there may be no follower to see it
+        raise
+    else:
+        future.set_result(result)
+        return result
+    finally:
+        calls.pop(reference, None)
@@ -0,0 +1,134 @@
+"""
+Inbox for Lahza webhook deliveries.
+
+``lahza_webhook`` only stores the raw event (``record_event``) and answers
+200 straight away, so a slow verification or database never makes Lahza time
+out and redeliver. Events are unique per ``(reference, payment_status)``: a
+redelivery or replay only bumps ``deliveries`` and is never processed again.
+
+``process_event`` applies an event to its ``Payment``; it runs from the
+in-process drain started after the event is stored and from
+``python manage.py process_webhook_events --loop``, with the retries and
+dead-lettering of ``contacts.work_queue.LeasedQueue``. It is idempotent as
+well: a paid payment is never re-verified, re-saved or re-emailed, and a
+failure is only recorded once. On SQLite only one process at a time claims
+inbox rows (see ``contacts.work_queue``); ``record_event`` inserts from the
+web workers meanwhile wait for the write lock (``SQLITE_TIMEOUT``).
+"""
+from __future__ import annotations
+
+import logging
+from typing import Any, Dict, Optional, Tuple
+
+from django.db.models import F
+from django.utils import timezone
+
+from config.lahza_service import LahzaAPIError
+from . import outbox, verification
+from .models import Payment, WebhookEvent
+from .verification import FAILURE_STATUSES, SUCCESS_STATUSES
+from .work_queue import LeasedQueue
+
+logger = logging.getLogger(__name__)
+
+
+def _nested(payload: Dict[str, Any], key: str) -> Optional[Any]:
+    # Lahza may send different formats, check common fields
+    for container in (payload, payload.get('data'), payload.get('transaction'), payload.get('payment')):
+        if isinstance(container, dict) and container.get(key):
+            return container[key]
+    return None
+
+
+def parse_event(payload: Dict[str, Any]) -> Tuple[Optional[str], str]:
+    """``(reference, status)`` of a webhook payload; the status is lowercased, ``'unknown'`` if absent."""
+    reference = _nested(payload, 'reference')
+    status = _nested(payload, 'status') or 'unknown'
+    return (str(reference) if reference else None), str(status).lower()[:50]
+
+
+async def record_event(payload: Dict[str, Any], reference: str, status: str) -> Tuple[WebhookEvent, bool]:
+    """Store a delivery; returns the event and whether it is new (and was queued for processing)."""
+    event, created = await WebhookEvent.objects.aget_or_create(
+        reference=reference,
+        payment_status=status,
+        defaults={'payload': payload},
+    )
+    if created:
+        queue.wake()
+        return event, True
+    await WebhookEvent.objects.filter(pk=event.pk).aupdate(deliveries=F('deliveries') + 1)
+    if event.status == 'dead':
+        # Lahza redelivered an event we had given up on: give it a fresh set of attempts
+        await WebhookEvent.objects.filter(pk=event.pk, status='dead').aupdate(
+            status='pending', attempts=0, next_attempt_at=timezone.now(),
+        )
+        queue.wake()
+    return event, False
+
+
+def _create_payment_from_gateway(reference: str) -> Payment:
+    """Payment record for a reference we never initialized, built from the verification data."""
+    transaction_data = verification.verify(reference)
+    amount = transaction_data.get('amount', 0)
+    payment, _created = Payment.objects.get_or_create(
+        reference=reference,
+        defaults={
+            'customer_email': transaction_data.get('customer', {}).get('email', 'unknown@example.com'),
+            'customer_name': transaction_data.get('customer', {}).get('name', 'Unknown'),
+            'amount': amount / 100 if amount > 1000 else amount,
+            'currency': transaction_data.get('currency', 'ILS'),
+            'status': 'pending',
+            'lahza_response': transaction_data,
+        },
+    )
+    return payment
+
+
+def process_event(event: WebhookEvent) -> None:
+    """Apply ``event`` to its payment; raises to have it retried later."""
+    payment = Payment.objects.filter(reference=event.reference).first()
+    if payment is None:
+        logger.warning("[Lahza Webhook] Payment record not found for reference: %s", event.reference)
+        payment = _create_payment_from_gateway(event.reference)
+
+    if payment.status == 'success' or (payment.status == 'failed' and event.payment_status not in SUCCESS_STATUSES):
+        logger.info("[Lahza Webhook] %s is already %s, ignoring %s event", payment.reference, payment.status, event.payment_status)
+        return
+
+    if event.payment_status in SUCCESS_STATUSES:
+        # Verify transaction with Lahza API to get full details
+        try:
+            transaction_data = verification.verify(event.reference)
+        except LahzaAPIError:
+            if event.attempts + 1 < queue.setting('MAX_ATTEMPTS'):
+                raise
+            # Out of retries: trust the webhook, as before the inbox existed
+            logger.error("[Lahza Webhook] Could not verify %s, marking it paid from the webhook", event.reference)
+            payment.status = 'success'
+            if not payment.paid_at:
+                payment.paid_at = timezone.now()
+            outbox.save_and_enqueue_receipt(payment)
+            return
+        outbox.mark_success_and_enqueue_receipt(payment, transaction_data)
+        logger.info("[Lahza Webhook] Payment marked as success: %s", event.reference)
+    elif event.payment_status in FAILURE_STATUSES:
+        payment.mark_as_failed(f'Webhook status: {event.payment_status}')
+        logger.info("[Lahza Webhook] Payment marked as failed: %s, status: %s", event.reference, event.payment_status)
+    else:
+        # Keep as pending, with the latest webhook data
+        payment.lahza_response = event.payload
+        payment.save(update_fields=['lahza_response', 'updated_at'])
+        logger.info("[Lahza Webhook] Payment status updated: %s, status: %s", event.reference, event.payment_status)
+
+
+queue = LeasedQueue(
+    WebhookEvent,
+    process_event,
+    name='Webhook Inbox',
+    settings_prefix='WEBHOOK_INBOX',
+)
+
+
+def process_due(batch_size: int = 50, concurrency: int = None) -> Dict[str, int]:
+    return queue.process_due(batch_size=batch_size, concurrency=concurrency)
@@ -0,0 +1,214 @@
+"""
+DB-backed work queue shared by the email outbox and the webhook inbox.
+
+A queue is a model with ``status``, ``attempts``, ``next_attempt_at``,
+``locked_until`` and ``last_error`` fields, plus a handler that processes one
+row and raises to signal a failed attempt. ``LeasedQueue`` provides:
+
+- claiming with a conditional ``UPDATE`` and a lease, so any number of workers
+  can run side by side without handling a row twice, and rows of a worker that
+  died mid-way are picked up again once the lease expires;
+- jittered exponential backoff between attempts and dead-lettering after
+  ``<PREFIX>_MAX_ATTEMPTS``;
+- ``process_due()`` on a bounded thread pool (management commands) and
+  ``wake()``, a coalescing in-process drain started right after commit.
+
+SQLite allows one writer at a time, and claims from several processes (the
+web workers' drains, ``mail-worker``, ``webhook-worker``) would keep failing
+with "database is locked". On SQLite a queue therefore has a single claimer:
+``process_due()`` takes an exclusive lock file next to the database
+(``<db>.<prefix>.lock``) and handles rows one at a time, and a process that
+finds the lock taken leaves the rows to its holder. On PostgreSQL any number
+of claimers run side by side.
+
+Settings are read as ``<PREFIX>_INLINE_WORKER``, ``_CONCURRENCY``,
+``_MAX_ATTEMPTS``, ``_RETRY_BASE_SECONDS``, ``_RETRY_MAX_SECONDS`` and
+``_LEASE_SECONDS``.
+"""
+from __future__ import annotations
+
+import logging
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import timedelta
+from typing import Callable, Dict, Iterator, List
+
+from django.conf import settings
+from django.db import close_old_connections, connections
+from django.db.models import Q
+from django.utils import timezone
+
+try:
+    import fcntl
+except ImportError:  # Windows development machines: a single process there anyway
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'INLINE_WORKER': True,
+    'CONCURRENCY': 4,
+    'MAX_ATTEMPTS': 8,
+    'RETRY_BASE_SECONDS': 30,
+    'RETRY_MAX_SECONDS': 3600,
+    'LEASE_SECONDS': 300,
+}
+
+
+class LeasedQueue:
+    """Claim/retry/drain policy for the rows of ``model``, handled by ``handler``."""
+
+    def __init__(
+        self,
+        model,
+        handler: Callable,
+        *,
+        name: str,
+        settings_prefix: str,
+        in_flight: str = 'processing',
+        done: str = 'processed',
+        done_timestamp: str = 'processed_at',
+        select_related: tuple = (),
+    ):
+        self.model = model
+        self.handler = handler
+        self.name = name
+        self.settings_prefix = settings_prefix
+        self.in_flight = in_flight
+        self.done = done
+        self.done_timestamp = done_timestamp
+        self.select_related = select_related
+        self._wake_event = threading.Event()
+        self._drain_lock = threading.Lock()
+
+    def setting(self, name: str):
+        return getattr(settings, f'{self.settings_prefix}_{name}', DEFAULTS[name])
+
+    def _due(self, now) -> Q:
+        # Pending rows whose backoff elapsed, and rows whose worker lost its lease
+        return Q(status='pending', next_attempt_at__lte=now) | Q(status=self.in_flight, locked_until__lt=now)
+
+    def claim(self, limit: int) -> List:
+        """Lease up to ``limit`` due rows to this worker."""
+        now = timezone.now()
+        lease = now + timedelta(seconds=self.setting('LEASE_SECONDS'))
+        candidates = list(
+            self.model.objects.filter(self._due(now)).order_by('next_attempt_at').values_list('pk', flat=True)[:limit]
+        )
+        claimed = [
+            pk for pk in candidates
+            # Conditional update: only one worker wins each row
+            if self.model.objects.filter(self._due(now), pk=pk).update(status=self.in_flight, locked_until=lease)
+        ]
+        return list(self.model.objects.filter(pk__in=claimed).select_related(*self.select_related))
+
+    def _retry_delay(self, attempts: int) -> float:
+        delay = self.setting('RETRY_BASE_SECONDS') * (2 ** (attempts - 1))
+        return min(self.setting('RETRY_MAX_SECONDS'), delay) * random.uniform(0.5, 1.0)
+
+    def _record_failure(self, item, attempts: int, exc: Exception) -> None:
+        error = f'{exc.__class__.__name__}: {exc}'
+        if attempts >= self.setting('MAX_ATTEMPTS'):
+            self.model.objects.filter(pk=item.pk).update(
+                status='dead', attempts=attempts, locked_until=None, last_error=error,
+            )
+            logger.error("[%s] %s dead-lettered after %d attempts: %s", self.name, item, attempts, error)
+            return
+        delay = self._retry_delay(attempts)
+        self.model.objects.filter(pk=item.pk).update(
+            status='pending', attempts=attempts, locked_until=None, last_error=error,
+            next_attempt_at=timezone.now() + timedelta(seconds=delay),
+        )
+        logger.warning("[%s] %s failed (attempt %d), retrying in %.0fs: %s", self.name, item, attempts, delay, error)
+
+    def run(self, item) -> bool:
+        """Handle one claimed row and record the outcome; returns whether it succeeded."""
+        attempts = item.attempts + 1
+        try:
+            try:
+                self.handler(item)
+            except Exception as exc:
+                self._record_failure(item, attempts, exc)
+                return False
+            self.model.objects.filter(pk=item.pk).update(
+                status=self.done, attempts=attempts, locked_until=None, last_error='',
+                **{self.done_timestamp: timezone.now()},
+            )
+            logger.info("[%s] %s done", self.name, item)
+            return True
+        finally:
+            # Runs on a pool thread: don't keep its connection past this row
+            close_old_connections()
+
+    def _sqlite_lock_path(self):
+        """The claimer lock file when the queue lives in an SQLite file, else ``None``."""
+        connection = connections[self.model.objects.db]
+        if connection.vendor != 'sqlite':
+            return None
+        if connection.is_in_memory_db() or fcntl is None:
+            return None
+        return f"{connection.settings_dict['NAME']}.{self.settings_prefix.lower()}.lock"
+
+    @contextmanager
+    def _single_claimer(self, path) -> Iterator[bool]:
+        """Yield whether this process holds the queue's lock file (released on exit)."""
+        with open(path, 'a') as lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def process_due(self, batch_size: int = 50, concurrency: int = None) -> Dict[str, int]:
+        """Claim and handle due rows, ``concurrency`` at a time, until none are left."""
+        lock_path = self._sqlite_lock_path()
+        if lock_path is None:
+            return self._process_due(batch_size, concurrency or self.setting('CONCURRENCY'))
+        with self._single_claimer(lock_path) as claimer:
+            if not claimer:
+                logger.debug("[%s] Another process is claiming rows (SQLite), skipping", self.name)
+                return {'succeeded': 0, 'failed': 0}
+            return self._process_due(batch_size, 1)
+
+    def _process_due(self, batch_size: int, concurrency: int) -> Dict[str, int]:
+        succeeded = failed = 0
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix=self.name.lower().replace(' ', '-')) as executor:
+            while True:
+                items = self.claim(batch_size)
+                if not items:
+                    break
+                for ok in executor.map(self.run, items):
+                    succeeded += ok
+                    failed += not ok
+        return {'succeeded': succeeded, 'failed': failed}
+
+    def _drain(self) -> None:
+        try:
+            while self._wake_event.is_set():
+                self._wake_event.clear()
+                try:
+                    self.process_due()
+                except Exception as exc:
+                    logger.error("[%s] In-process drain failed: %s", self.name, exc, exc_info=True)
+        finally:
+            close_old_connections()
+            self._drain_lock.release()
+        if self._wake_event.is_set():
+            self.wake()  # Woken between the last pass and releasing the lock
+
+    def wake(self) -> None:
+        """Drain the queue in a background thread, coalescing bursts of new rows."""
+        if not self.setting('INLINE_WORKER'):
+            return
+        self._wake_event.set()
+        if not self._drain_lock.acquire(blocking=False):
+            return  # The running drain picks up the new rows
+        thread = threading.Thread(target=self._drain, name=f'{self.name} drain')
+        thread.daemon = True
+        thread.start()
@@ -1,8 +1,23 @@
 #!/bin/sh
 
-# Run Django's collectstatic command
-python manage.py collectstatic 
+# Worker processes; the system checks (config.E002) need the same number
+WEB_CONCURRENCY="${WEB_CONCURRENCY:-4}"
+export WEB_CONCURRENCY
 
-# Start the application using Gunicorn and Uvicorn
-gunicorn -w 4 -k uvicorn.workers.UvicornWorker config.wsgi:application --bind 0.0.0.0:8000
+# Workers coordinate (page cache, payment locks, payment events) through the cache: refuse to
+# start several of them on per-process memory caches
+if [ "$WEB_CONCURRENCY" -gt 1 ] && [ -z "$REDIS_URL" ]; then
+    echo "REDIS_URL is not set: set it for a shared cache or run a single worker (WEB_CONCURRENCY=1)" >&2
+    exit 1
+fi
 
+# Run Django's collectstatic command (hashed static names; fails on unhashed template references)
+python manage.py collectstatic --noinput || exit 1
+
+# Re-export the static landing snapshots Caddy serves, for the deployed templates and assets
+python manage.py export_landing_snapshots || exit 1
+
+# Start the application using Gunicorn and Uvicorn, on the ASGI application: the async payment views
+# keep their pooled Lahza clients on the worker's event loop and the payment status stream (SSE) is
+# sent as it goes (under WSGI each request would get a fresh loop and the stream would be buffered)
+gunicorn -w "$WEB_CONCURRENCY" -k uvicorn.workers.UvicornWorker config.asgi:application --bind 0.0.0.0:8000
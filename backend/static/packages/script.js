@@ -400,75 +400,122 @@ function startIframeMonitoring(iframe) {
   
   console.log('Starting payment monitoring for reference:', reference);
   
-  // Poll payment status every 3 seconds
-  let pollCount = 0;
-  const maxPolls = 60; // 3 minutes max (60 * 3 seconds)
-  const pollInterval = setInterval(async () => {
-    pollCount++;
-    
+  // The payment status is pushed by the server (Server-Sent Events) as soon as
+  // Lahza's webhook or callback settles it; polling is only a fallback
+  let eventSource = null;
+  let pollInterval = null;
+  let verifyInterval = null;
+
+  const stopMonitoring = () => {
+    if (eventSource) {
+      eventSource.close();
+    }
+    clearInterval(pollInterval);
+    clearInterval(verifyInterval);
+  };
+
+  // Returns true once the payment reached a final status
+  const handlePaymentStatus = (data) => {
+    if (data.success && data.status === 'success') {
+      stopMonitoring();
+      console.log('Payment successful! Redirecting to success page...');
+      closeLahzaPopup();
+      window.location.href = `/packages/payment/success/${reference}/`;
+      return true;
+    }
+    if (['failed', 'cancelled', 'declined', 'rejected'].includes(data.status)) {
+      stopMonitoring();
+      console.log('Payment failed or cancelled');
+      closeLahzaPopup();
+      alert('تم إلغاء الدفع أو فشل المعاملة.');
+      return true;
+    }
+    return false;
+  };
+
+  // Ask the backend (and through it Lahza) for the current status
+  const checkPaymentStatus = async () => {
     try {
-      // Check payment status via backend
       const response = await fetch(`/packages/payment/verify/?reference=${reference}`, {
         method: 'GET',
         headers: {
           'X-CSRFToken': getCsrfToken(),
         },
       });
-      
       if (response.ok) {
         const data = await response.json();
-        
-        console.log(`[Payment Poll] Status check ${pollCount}/${maxPolls}:`, data);
-        
-        // If payment is successful or failed, stop polling
-        if (data.success && data.status === 'success') {
-          clearInterval(pollInterval);
-          console.log('Payment successful! Redirecting to success page...');
-          closeLahzaPopup();
-          // Redirect to success page
-          if (reference) {
-            window.location.href = `/packages/payment/success/${reference}/`;
-          } else {
-            window.location.href = '/packages/payment/success/';
-          }
-          return;
-        } else if (data.status === 'failed' || data.status === 'cancelled') {
-          clearInterval(pollInterval);
-          console.log('Payment failed or cancelled');
-          closeLahzaPopup();
-          alert('تم إلغاء الدفع أو فشل المعاملة.');
-          return;
-        } else if (data.status === 'pending') {
-          // Payment is still pending, continue polling
-          console.log(`[Payment Poll] Payment still pending (${pollCount}/${maxPolls})`);
-        } else {
-          // Unknown status, log it
+        if (!handlePaymentStatus(data) && data.status !== 'pending') {
           console.warn(`[Payment Poll] Unknown status: ${data.status}`, data);
         }
       } else {
-        // Response not OK - log the error but continue polling
         const errorText = await response.text().catch(() => 'Unknown error');
         console.warn(`[Payment Poll] HTTP error ${response.status}:`, errorText);
       }
     } catch (error) {
       console.warn('[Payment Poll] Network error:', error);
-      // Continue polling even on network errors (might be temporary)
     }
-    
-    // Stop polling after max attempts
-    if (pollCount >= maxPolls) {
-      clearInterval(pollInterval);
-      console.log('Payment monitoring timeout');
-      // Don't close popup, let user handle it manually
-    }
-  }, 3000); // Check every 3 seconds
+  };
+
+  // Polling every 3 seconds, for 3 minutes at most
+  const startPolling = () => {
+    let pollCount = 0;
+    const maxPolls = 60;
+    pollInterval = setInterval(async () => {
+      pollCount++;
+      await checkPaymentStatus();
+      if (pollCount >= maxPolls) {
+        clearInterval(pollInterval);
+        console.log('Payment monitoring timeout');
+      }
+    }, 3000);
+  };
+
+  // While the stream is open, still verify every 20 seconds (for 10 minutes at most):
+  // a lost webhook or callback would otherwise leave the page waiting for the stream's timeout
+  const startVerifyFallback = () => {
+    let verifyCount = 0;
+    const maxVerifies = 30;
+    verifyInterval = setInterval(async () => {
+      verifyCount++;
+      if (verifyCount >= maxVerifies) {
+        clearInterval(verifyInterval);
+      }
+      await checkPaymentStatus();
+    }, 20000);
+  };
+
+  if (window.EventSource) {
+    eventSource = new EventSource(`/api/payments/${encodeURIComponent(reference)}/events/`);
+    startVerifyFallback();
+    eventSource.addEventListener('status', (event) => {
+      const data = JSON.parse(event.data);
+      console.log('[Payment Events] Status received:', data);
+      eventSource.close();
+      handlePaymentStatus(data);
+    });
+    eventSource.addEventListener('timeout', () => {
+      // Nothing settled the payment in time: check with Lahza now (the slow checks go on)
+      eventSource.close();
+      checkPaymentStatus();
+    });
+    eventSource.onerror = () => {
+      // The browser reconnects by itself, unless the stream was refused
+      if (eventSource.readyState === EventSource.CLOSED) {
+        console.warn('[Payment Events] Stream unavailable, falling back to polling');
+        clearInterval(verifyInterval);
+        startPolling();
+      }
+    };
+  } else {
+    startPolling();
+  }
   
-  // Clear interval when popup closes
+  // Stop monitoring when popup closes
   const overlay = document.getElementById('lahza-popup-overlay');
   if (overlay) {
     const observer = new MutationObserver(() => {
       if (!overlay.classList.contains('active')) {
-        clearInterval(pollInterval);
+        stopMonitoring();
         observer.disconnect();
       }
     });
@@ -489,7 +536,7 @@ function startIframeMonitoring(iframe) {
       )) {
         const msgReference = event.data.reference || event.data.ref || reference;
         if (msgReference) {
-          clearInterval(pollInterval);
+          stopMonitoring();
           window.removeEventListener('message', messageHandler);
           closeLahzaPopup();
           setTimeout(() => {
@@ -386,11 +386,41 @@ function startIframeMonitoring(iframe) {
     
     console.log('Starting payment monitoring for reference:', reference);
     
-    let pollCount = 0;
-    const maxPolls = 60;
-    const pollInterval = setInterval(async () => {
-        pollCount++;
-        
+    // The payment status is pushed by the server (Server-Sent Events) as soon as
+    // Lahza's webhook or callback settles it; polling is only a fallback
+    let eventSource = null;
+    let pollInterval = null;
+    let verifyInterval = null;
+
+    const stopMonitoring = () => {
+        if (eventSource) {
+            eventSource.close();
+        }
+        clearInterval(pollInterval);
+        clearInterval(verifyInterval);
+    };
+
+    // Returns true once the payment reached a final status
+    const handlePaymentStatus = (data) => {
+        if (data.success && data.status === 'success') {
+            stopMonitoring();
+            console.log('Payment successful! Redirecting to success page...');
+            closeLahzaPopup();
+            window.location.href = `/payment/payment/success/${reference}/`;
+            return true;
+        }
+        if (['failed', 'cancelled', 'declined', 'rejected'].includes(data.status)) {
+            stopMonitoring();
+            console.log('Payment failed or cancelled');
+            closeLahzaPopup();
+            alert('تم إلغاء الدفع أو فشل المعاملة.');
+            return true;
+        }
+        return false;
+    };
+
+    // Ask the backend (and through it Lahza) for the current status
+    const checkPaymentStatus = async () => {
         try {
             const response = await fetch(`/payment/payment/verify/?reference=${reference}`, {
                 method: 'GET',
@@ -398,43 +428,79 @@ function startIframeMonitoring(iframe) {
                     'X-CSRFToken': getCsrfToken(),
                 },
             });
-            
             if (response.ok) {
                 const data = await response.json();
-                
-                if (data.success && data.status === 'success') {
-                    clearInterval(pollInterval);
-                    console.log('Payment successful! Redirecting to success page...');
-                    closeLahzaPopup();
-                    if (reference) {
-                        window.location.href = `/payment/payment/success/${reference}/`;
-                    } else {
-                        window.location.href = '/payment/payment/success/';
-                    }
-                    return;
-                } else if (data.status === 'failed' || data.status === 'cancelled') {
-                    clearInterval(pollInterval);
-                    console.log('Payment failed or cancelled');
-                    closeLahzaPopup();
-                    alert('تم إلغاء الدفع أو فشل المعاملة.');
-                    return;
+                if (!handlePaymentStatus(data) && data.status !== 'pending') {
+                    console.warn(`[Payment Poll] Unknown status: ${data.status}`, data);
                 }
+            } else {
+                const errorText = await response.text().catch(() => 'Unknown error');
+                console.warn(`[Payment Poll] HTTP error ${response.status}:`, errorText);
             }
         } catch (error) {
             console.warn('[Payment Poll] Network error:', error);
         }
-        
-        if (pollCount >= maxPolls) {
-            clearInterval(pollInterval);
-            console.log('Payment monitoring timeout');
-        }
-    }, 3000);
+    };
+
+    // Polling every 3 seconds, for 3 minutes at most
+    const startPolling = () => {
+        let pollCount = 0;
+        const maxPolls = 60;
+        pollInterval = setInterval(async () => {
+            pollCount++;
+            await checkPaymentStatus();
+            if (pollCount >= maxPolls) {
+                clearInterval(pollInterval);
+                console.log('Payment monitoring timeout');
+            }
+        }, 3000);
+    };
+
+    // While the stream is open, still verify every 20 seconds (for 10 minutes at most):
+    // a lost webhook or callback would otherwise leave the page waiting for the stream's timeout
+    const startVerifyFallback = () => {
+        let verifyCount = 0;
+        const maxVerifies = 30;
+        verifyInterval = setInterval(async () => {
+            verifyCount++;
+            if (verifyCount >= maxVerifies) {
+                clearInterval(verifyInterval);
+            }
+            await checkPaymentStatus();
+        }, 20000);
+    };
+
+    if (window.EventSource) {
+        eventSource = new EventSource(`/api/payments/${encodeURIComponent(reference)}/events/`);
+        startVerifyFallback();
+        eventSource.addEventListener('status', (event) => {
+            const data = JSON.parse(event.data);
+            console.log('[Payment Events] Status received:', data);
+            eventSource.close();
+            handlePaymentStatus(data);
+        });
+        eventSource.addEventListener('timeout', () => {
+            // Nothing settled the payment in time: check with Lahza now (the slow checks go on)
+            eventSource.close();
+            checkPaymentStatus();
+        });
+        eventSource.onerror = () => {
+            // The browser reconnects by itself, unless the stream was refused
+            if (eventSource.readyState === EventSource.CLOSED) {
+                console.warn('[Payment Events] Stream unavailable, falling back to polling');
+                clearInterval(verifyInterval);
+                startPolling();
+            }
+        };
+    } else {
+        startPolling();
+    }
     
     const overlay = document.getElementById('lahza-popup-overlay');
     if (overlay) {
         const observer = new MutationObserver(() => {
             if (!overlay.classList.contains('active')) {
-                clearInterval(pollInterval);
+                stopMonitoring();
                 observer.disconnect();
             }
         });
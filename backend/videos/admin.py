@@ -8,7 +8,7 @@ class VideoAdmin(admin.ModelAdmin):
     list_filter = ['is_active', 'position', 'created_at']
     search_fields = ['title', 'description']
     list_editable = ['is_active', 'order']
-    readonly_fields = ['created_at', 'updated_at']
+    readonly_fields = ['created_at', 'updated_at', 'hls_status', 'hls_playlist', 'hls_error']
     
     fieldsets = (
         ('Basic Information', {
@@ -18,6 +18,11 @@ class VideoAdmin(admin.ModelAdmin):
             'fields': ('video_file', 'vimeo_id', 'video_url'),
             'description': 'Upload a video file OR provide Vimeo ID OR video URL. Only one is required.'
         }),
+        ('Adaptive Streaming (HLS)', {
+            'fields': ('hls_status', 'hls_playlist', 'hls_error'),
+            'classes': ('collapse',),
+            'description': 'Generated automatically from the uploaded file (python manage.py transcode_videos).'
+        }),
         ('Display Settings', {
             'fields': ('position', 'order', 'badge_label', 'is_active'),
             'description': 'Select where this video should appear on the website. Badge label is used for testimonials (e.g., وحش الشهر، طبيب ناجح، طالب طموح).'
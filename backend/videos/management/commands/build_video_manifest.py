@@ -0,0 +1,26 @@
+"""
+Django management command to index media/videos/ into the video manifest.
+Usage: python manage.py build_video_manifest
+"""
+from django.core.management.base import BaseCommand
+
+from videos import media_manifest
+
+
+class Command(BaseCommand):
+    help = 'Index video files in MEDIA_ROOT/videos into the manifest used by the landing pages'
+
+    def handle(self, *args, **options):
+        manifest = media_manifest.build_manifest()
+        videos = manifest['videos']
+
+        if manifest['directory_mtime'] is None:
+            self.stdout.write(self.style.WARNING(f'⚠️  Media videos directory not found: {media_manifest.videos_dir()}'))
+
+        for entry in videos:
+            badge = f", badge: {entry['badge_label']}" if entry['badge_label'] else ''
+            self.stdout.write(f"📹 {entry['name']} ({entry['role']}, {entry['size']} bytes{badge})")
+
+        self.stdout.write(self.style.SUCCESS(
+            f'\n✅ Indexed {len(videos)} video(s) into {media_manifest.manifest_path()}'
+        ))
@@ -0,0 +1,67 @@
+"""
+Django management command to transcode uploaded videos into adaptive HLS renditions.
+Usage: python manage.py transcode_videos [--force] [--id 3 --id 5] [--loop] [--interval 30]
+
+With ``--loop`` it keeps watching for new uploads (the ``transcode-worker``
+compose service). A video whose transcode failed is then only retried once it
+is saved again (e.g. a new file uploaded); run without ``--loop`` to retry
+failed ones right away.
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+
+from videos import transcoding
+from videos.models import Video
+
+
+class Command(BaseCommand):
+    help = 'Transcode uploaded video files into multi-bitrate HLS renditions with ffmpeg'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Re-transcode videos that already have renditions')
+        parser.add_argument('--id', type=int, action='append', dest='ids', help='Only transcode the given video id(s)')
+        parser.add_argument('--loop', action='store_true', help='Keep watching for new uploads instead of exiting')
+        parser.add_argument('--interval', type=float, default=30.0, help='Seconds between checks with --loop (default: 30)')
+
+    def handle(self, *args, **options):
+        if not transcoding.is_available():
+            raise CommandError(
+                f'ffmpeg/ffprobe not found ({transcoding.ffmpeg_binary()}, {transcoding.ffprobe_binary()})'
+            )
+
+        while True:
+            done, skipped, failed = self._transcode(options)
+            if done or failed or not options['loop']:
+                self.stdout.write(self.style.SUCCESS(
+                    f'\n✅ Transcoded {done} video(s), {skipped} already up to date, {failed} failed'
+                ))
+            if not options['loop']:
+                break
+            close_old_connections()
+            time.sleep(options['interval'])
+
+    def _transcode(self, options):
+        videos = Video.objects.exclude(video_file='').exclude(video_file__isnull=True)
+        if options['ids']:
+            videos = videos.filter(pk__in=options['ids'])
+
+        done = failed = skipped = 0
+        for video in videos:
+            if not options['force'] and not transcoding.needs_transcode(video):
+                skipped += 1
+                continue
+            if options['loop'] and video.hls_status == 'failed':
+                skipped += 1  # Retried once the video is saved again
+                continue
+            self.stdout.write(f'🎬 Transcoding: {video.title} ({video.video_file.name})')
+            try:
+                playlist = transcoding.transcode(video)
+            except transcoding.TranscodeError as exc:
+                failed += 1
+                self.stdout.write(self.style.ERROR(f'   ❌ {exc}'))
+                continue
+            done += 1
+            self.stdout.write(self.style.SUCCESS(f'   ✅ {playlist}'))
+        return done, skipped, failed
@@ -0,0 +1,164 @@
+"""
+Persisted manifest of the video files in ``MEDIA_ROOT/videos``.
+
+The landing pages fall back to these files when the database has no hero video
+or fewer than three testimonials. Instead of globbing the directory on every
+request, the files are indexed once into a JSON manifest (name, inferred role,
+badge label, size) which is rebuilt when the directory mtime changes.
+
+Build it explicitly with ``python manage.py build_video_manifest``.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from django.conf import settings
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_VERSION = 1
+VIDEO_EXTENSIONS = ('.mp4', '.mov')
+
+# Same precedence the landing page used when globbing for the hero video
+HERO_PATTERNS = ('orizontal', 'Momen')
+# Any of these in the filename excludes the video from the testimonials
+HERO_NAMES = ('Momen', 'orizontal', 'Horizontal')
+
+DEFAULT_BADGE_LABEL = 'طالب طموح'
+
+_lock = threading.Lock()
+_state: Dict[str, Any] = {'manifest': None, 'checked_at': 0.0}
+
+
+def videos_dir() -> Path:
+    return Path(settings.MEDIA_ROOT) / 'videos'
+
+
+def manifest_path() -> Path:
+    return Path(getattr(settings, 'VIDEO_MANIFEST_PATH', Path(settings.MEDIA_ROOT) / 'video_manifest.json'))
+
+
+def _title_from_filename(path: Path) -> str:
+    return path.stem.replace('_', ' ').replace('-', ' ')
+
+
+def _infer_badge_label(path: Path) -> str:
+    title = _title_from_filename(path)
+    if 'دكتور' in title or 'Doctor' in path.name:
+        return 'طبيب ناجح'
+    return DEFAULT_BADGE_LABEL
+
+
+def _hero_priority(path: Path) -> Optional[int]:
+    """Rank hero candidates: pattern first, then ``.mp4`` before ``.mov``."""
+    for pattern_index, pattern in enumerate(HERO_PATTERNS):
+        if pattern in path.name:
+            return pattern_index * len(VIDEO_EXTENSIONS) + VIDEO_EXTENSIONS.index(path.suffix)
+    return None
+
+
+def _directory_mtime(directory: Path) -> Optional[float]:
+    try:
+        return directory.stat().st_mtime
+    except FileNotFoundError:
+        return None
+
+
+def build_manifest() -> Dict[str, Any]:
+    """Scan the media videos directory and write the manifest to disk."""
+    directory = videos_dir()
+    entries: List[Dict[str, Any]] = []
+    directory_mtime = _directory_mtime(directory)
+
+    if directory_mtime is not None:
+        with os.scandir(directory) as it:
+            for dir_entry in it:
+                path = Path(dir_entry.path)
+                if not dir_entry.is_file() or path.suffix not in VIDEO_EXTENSIONS:
+                    continue
+                stat = dir_entry.stat()
+                is_hero_name = any(name in path.name for name in HERO_NAMES)
+                entries.append({
+                    'name': path.name,
+                    'title': _title_from_filename(path),
+                    'role': 'hero' if is_hero_name else 'testimonial',
+                    'hero_priority': _hero_priority(path),
+                    'badge_label': None if is_hero_name else _infer_badge_label(path),
+                    'size': stat.st_size,
+                    'mtime': stat.st_mtime,
+                })
+
+    entries.sort(key=lambda e: (e['hero_priority'] is None, e['hero_priority'] or 0, e['name']))
+
+    manifest = {
+        'version': MANIFEST_VERSION,
+        'generated_at': timezone.now().isoformat(),
+        'directory_mtime': directory_mtime,
+        'videos': entries,
+    }
+
+    path = manifest_path()
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix('.tmp')
+        tmp_path.write_text(json.dumps(manifest, ensure_ascii=False, indent=2), encoding='utf-8')
+        os.replace(tmp_path, path)
+    except OSError as exc:
+        # Still usable in memory even if the manifest cannot be persisted
+        logger.warning("[Video Manifest] Could not write manifest to %s: %s", path, exc)
+
+    logger.info("[Video Manifest] Indexed %d media video(s)", len(entries))
+    return manifest
+
+
+def _read_manifest() -> Optional[Dict[str, Any]]:
+    try:
+        manifest = json.loads(manifest_path().read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return None
+    if manifest.get('version') != MANIFEST_VERSION:
+        return None
+    return manifest
+
+
+def get_manifest() -> Dict[str, Any]:
+    """
+    Return the current manifest.
+
+    The directory mtime is compared against the manifest at most once every
+    ``VIDEO_MANIFEST_CHECK_INTERVAL`` seconds; the directory is only rescanned
+    when a file was added, removed or renamed.
+    """
+    interval = getattr(settings, 'VIDEO_MANIFEST_CHECK_INTERVAL', 30)
+    now = time.monotonic()
+    manifest = _state['manifest']
+    if manifest is not None and now - _state['checked_at'] < interval:
+        return manifest
+
+    with _lock:
+        manifest = _state['manifest'] or _read_manifest()
+        if manifest is None or manifest.get('directory_mtime') != _directory_mtime(videos_dir()):
+            manifest = build_manifest()
+        _state['manifest'] = manifest
+        _state['checked_at'] = now
+    return manifest
+
+
+def get_hero_video() -> Optional[Dict[str, Any]]:
+    for entry in get_manifest()['videos']:
+        if entry['role'] == 'hero':
+            return entry
+    return None
+
+
+def get_testimonial_videos(limit: int) -> List[Dict[str, Any]]:
+    if limit <= 0:
+        return []
+    return [entry for entry in get_manifest()['videos'] if entry['role'] == 'testimonial'][:limit]
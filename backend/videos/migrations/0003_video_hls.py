@@ -0,0 +1,33 @@
+# Generated by Django 4.2.10 on 2026-10-18 07:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('videos', '0002_video_badge_label_alter_video_position'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='video',
+            name='hls_error',
+            field=models.TextField(blank=True, default=''),
+        ),
+        migrations.AddField(
+            model_name='video',
+            name='hls_playlist',
+            field=models.CharField(blank=True, default='', help_text='Master playlist path relative to MEDIA_ROOT', max_length=500, verbose_name='قائمة تشغيل HLS'),
+        ),
+        migrations.AddField(
+            model_name='video',
+            name='hls_source',
+            field=models.CharField(blank=True, default='', help_text='video_file name the renditions were generated from', max_length=500),
+        ),
+        migrations.AddField(
+            model_name='video',
+            name='hls_status',
+            field=models.CharField(blank=True, choices=[('', 'Not transcoded'), ('pending', 'Pending'), ('processing', 'Processing'), ('ready', 'Ready'), ('failed', 'Failed')], default='', max_length=20, verbose_name='حالة HLS'),
+        ),
+    ]
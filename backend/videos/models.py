@@ -47,6 +47,30 @@ class Video(models.Model):
         verbose_name="الموقع"
     )
     
+    # Adaptive HLS renditions of video_file (python manage.py transcode_videos)
+    HLS_STATUS_CHOICES = [
+        ('', 'Not transcoded'),
+        ('pending', 'Pending'),
+        ('processing', 'Processing'),
+        ('ready', 'Ready'),
+        ('failed', 'Failed'),
+    ]
+    hls_playlist = models.CharField(
+        max_length=500,
+        blank=True,
+        default='',
+        verbose_name="قائمة تشغيل HLS",
+        help_text="Master playlist path relative to MEDIA_ROOT"
+    )
+    hls_status = models.CharField(max_length=20, blank=True, default='', choices=HLS_STATUS_CHOICES, verbose_name="حالة HLS")
+    hls_source = models.CharField(
+        max_length=500,
+        blank=True,
+        default='',
+        help_text="video_file name the renditions were generated from"
+    )
+    hls_error = models.TextField(blank=True, default='')
+
     is_active = models.BooleanField(default=True, verbose_name="نشط")
     order = models.IntegerField(default=0, verbose_name="الترتيب")
     created_at = models.DateTimeField(default=timezone.now, verbose_name="تاريخ الإنشاء")
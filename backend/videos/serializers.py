@@ -1,3 +1,4 @@
+from django.conf import settings
 from rest_framework import serializers
 from .models import Video
 
@@ -16,10 +17,11 @@ class VideoSerializer(serializers.ModelSerializer):
 class VideoPublicSerializer(serializers.ModelSerializer):
     """Serializer for public video API (only active videos)"""
     video_file_url = serializers.SerializerMethodField()
+    hls_url = serializers.SerializerMethodField()
     
     class Meta:
         model = Video
-        fields = ['id', 'title', 'description', 'vimeo_id', 'video_url', 'video_file_url', 'position', 'badge_label', 'order']
+        fields = ['id', 'title', 'description', 'vimeo_id', 'video_url', 'video_file_url', 'hls_url', 'position', 'badge_label', 'order']
     
     def get_video_file_url(self, obj):
         """Get full URL for video file if it exists"""
@@ -28,4 +30,11 @@ class VideoPublicSerializer(serializers.ModelSerializer):
             if request:
                 return request.build_absolute_uri(obj.video_file.url)
         return None
-
+    
+    def get_hls_url(self, obj):
+        """Get full URL for the adaptive HLS master playlist once it is ready"""
+        if obj.hls_status == 'ready' and obj.hls_playlist and obj.hls_source == getattr(obj.video_file, 'name', None):
+            request = self.context.get('request')
+            if request:
+                return request.build_absolute_uri(f"/{settings.MEDIA_URL.strip('/')}/{obj.hls_playlist}")
+        return None
@@ -0,0 +1,47 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from config.landing_cache import bump_landing_version
+from config.snapshots import schedule_export
+from . import transcoding
+from .models import Video
+
+
+@receiver([post_save, post_delete], sender=Video)
+def invalidate_landing_cache(sender, **kwargs):
+    """Drop cached landing context and pages whenever a video changes, once the change is committed"""
+    transaction.on_commit(bump_landing_version)
+
+
+@receiver([post_save, post_delete], sender=Video)
+def refresh_snapshots(sender, **kwargs):
+    """Re-export static landing snapshots once the change is committed"""
+    if getattr(settings, 'SNAPSHOT_EXPORT_ON_SAVE', True):
+        transaction.on_commit(schedule_export)
+
+
+@receiver(post_save, sender=Video)
+def queue_hls_transcode(sender, instance, raw=False, **kwargs):
+    """Queue newly uploaded files for transcoding into HLS renditions"""
+    if raw:
+        return
+    if not instance.video_file and instance.hls_playlist:
+        # The upload was removed; fall back to the other video sources
+        Video.objects.filter(pk=instance.pk).update(hls_playlist='', hls_status='', hls_source='', hls_error='')
+        transcoding.remove_renditions(instance.pk)
+        return
+    if not transcoding.needs_transcode(instance):
+        return
+    video_id = instance.pk
+    if getattr(settings, 'HLS_TRANSCODE_ON_SAVE', False) and transcoding.is_available():
+        transaction.on_commit(lambda: transcoding.schedule_transcode(video_id))
+    else:
+        # Left to python manage.py transcode_videos --loop (the transcode-worker service)
+        transaction.on_commit(lambda: Video.objects.filter(pk=video_id).update(hls_status='pending'))
+
+
+@receiver(post_delete, sender=Video)
+def remove_hls_renditions(sender, instance, **kwargs):
+    transcoding.remove_renditions(instance.pk)
@@ -0,0 +1,232 @@
+"""
+Adaptive HLS renditions of uploaded ``Video.video_file`` files.
+
+Each video is transcoded with the local ``ffmpeg`` into a ladder of H.264/AAC
+renditions (never above the source height) plus a master playlist, written to
+``MEDIA_ROOT/hls/<video id>/``. The master playlist path is stored on the
+model and exposed to the landing pages as ``hls_url``; the original file stays
+the fallback for browsers without HLS support.
+
+Uploads are marked ``pending`` and transcoded by ``python manage.py
+transcode_videos --loop`` (the ``transcode-worker`` compose service), away
+from the web workers: ffmpeg would otherwise take their CPU for minutes per
+upload. With ``HLS_TRANSCODE_ON_SAVE`` enabled (e.g. a single-process
+development server), the upload is transcoded in a background thread of the
+web process instead.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import queue
+import shutil
+import subprocess
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+
+from config.landing_cache import bump_landing_version
+from .models import Video
+
+logger = logging.getLogger(__name__)
+
+MASTER_PLAYLIST = 'master.m3u8'
+
+# (height, video bitrate, audio bitrate)
+RENDITIONS = [
+    (360, '800k', '96k'),
+    (540, '1500k', '128k'),
+    (720, '2800k', '128k'),
+    (1080, '5000k', '160k'),
+]
+
+SEGMENT_SECONDS = 6
+
+
+class TranscodeError(Exception):
+    pass
+
+
+def ffmpeg_binary() -> str:
+    return getattr(settings, 'FFMPEG_BINARY', 'ffmpeg')
+
+
+def ffprobe_binary() -> str:
+    return getattr(settings, 'FFPROBE_BINARY', 'ffprobe')
+
+
+def is_available() -> bool:
+    return bool(shutil.which(ffmpeg_binary()) and shutil.which(ffprobe_binary()))
+
+
+def hls_root() -> Path:
+    return Path(settings.MEDIA_ROOT) / 'hls'
+
+
+def output_dir(video_id: int) -> Path:
+    return hls_root() / str(video_id)
+
+
+def needs_transcode(video: Video) -> bool:
+    if not video.video_file:
+        return False
+    return video.hls_source != video.video_file.name or video.hls_status not in ('ready', 'processing', 'pending')
+
+
+def probe(source: Path) -> Dict[str, object]:
+    """Return the height of the first video stream and whether there is an audio stream."""
+    result = subprocess.run(
+        [ffprobe_binary(), '-v', 'error', '-show_entries', 'stream=codec_type,height', '-of', 'json', str(source)],
+        capture_output=True, text=True, timeout=60,
+    )
+    if result.returncode != 0:
+        raise TranscodeError(result.stderr.strip() or 'ffprobe failed')
+    streams = json.loads(result.stdout or '{}').get('streams', [])
+    heights = [s.get('height') for s in streams if s.get('codec_type') == 'video' and s.get('height')]
+    if not heights:
+        raise TranscodeError('No video stream found')
+    return {
+        'height': heights[0],
+        'has_audio': any(s.get('codec_type') == 'audio' for s in streams),
+    }
+
+
+def select_renditions(source_height: int) -> List[tuple]:
+    renditions = [r for r in RENDITIONS if r[0] <= source_height]
+    # Always produce at least the smallest rendition, even for tiny sources
+    return renditions or RENDITIONS[:1]
+
+
+def build_command(source: Path, destination: Path, renditions: List[tuple], has_audio: bool) -> List[str]:
+    """ffmpeg invocation producing every rendition and the master playlist in one pass."""
+    count = len(renditions)
+    split = f"[0:v]split={count}" + ''.join(f'[v{i}]' for i in range(count))
+    scales = [f'[v{i}]scale=-2:{height}[v{i}out]' for i, (height, _, _) in enumerate(renditions)]
+
+    command = [
+        ffmpeg_binary(), '-hide_banner', '-loglevel', 'error', '-y', '-i', str(source),
+        '-filter_complex', ';'.join([split] + scales),
+    ]
+    stream_map = []
+    for i, (height, video_bitrate, audio_bitrate) in enumerate(renditions):
+        command += [
+            '-map', f'[v{i}out]',
+            f'-c:v:{i}', 'libx264', f'-b:v:{i}', video_bitrate,
+            f'-maxrate:v:{i}', video_bitrate, f'-bufsize:v:{i}', f'{int(video_bitrate[:-1]) * 2}k',
+        ]
+        if has_audio:
+            command += ['-map', '0:a:0', f'-c:a:{i}', 'aac', f'-b:a:{i}', audio_bitrate]
+            stream_map.append(f'v:{i},a:{i},name:{height}p')
+        else:
+            stream_map.append(f'v:{i},name:{height}p')
+
+    if has_audio:
+        command += ['-ac', '2']
+    command += [
+        '-preset', 'veryfast', '-profile:v', 'main', '-pix_fmt', 'yuv420p',
+        # Aligned keyframes so players can switch renditions at every segment boundary
+        '-force_key_frames', f'expr:gte(t,n_forced*{SEGMENT_SECONDS})', '-sc_threshold', '0',
+        '-f', 'hls', '-hls_time', str(SEGMENT_SECONDS), '-hls_playlist_type', 'vod',
+        '-hls_flags', 'independent_segments',
+        '-hls_segment_filename', str(destination / '%v' / 'segment_%03d.ts'),
+        '-master_pl_name', MASTER_PLAYLIST,
+        '-var_stream_map', ' '.join(stream_map),
+        str(destination / '%v' / 'index.m3u8'),
+    ]
+    return command
+
+
+def _update(video_id: int, **fields) -> None:
+    # update() rather than save() so the post_save handler doesn't queue another transcode
+    Video.objects.filter(pk=video_id).update(updated_at=timezone.now(), **fields)
+    bump_landing_version()
+
+
+def transcode(video: Video) -> str:
+    """Transcode ``video.video_file`` and return the master playlist path (relative to MEDIA_ROOT)."""
+    if not video.video_file:
+        raise TranscodeError('Video has no uploaded file')
+    source = Path(video.video_file.path)
+    if not source.exists():
+        raise TranscodeError(f'Source file not found: {source}')
+
+    source_name = video.video_file.name
+    _update(video.pk, hls_status='processing', hls_error='')
+
+    destination = output_dir(video.pk)
+    work_dir = destination.with_name(f'{destination.name}.tmp')
+    shutil.rmtree(work_dir, ignore_errors=True)
+    work_dir.mkdir(parents=True)
+
+    try:
+        info = probe(source)
+        renditions = select_renditions(info['height'])
+        command = build_command(source, work_dir, renditions, info['has_audio'])
+        timeout = getattr(settings, 'HLS_TRANSCODE_TIMEOUT', 3600)
+        result = subprocess.run(command, capture_output=True, text=True, timeout=timeout)
+        if result.returncode != 0 or not (work_dir / MASTER_PLAYLIST).exists():
+            raise TranscodeError(result.stderr.strip()[-2000:] or f'ffmpeg exited with {result.returncode}')
+    except (TranscodeError, OSError, subprocess.TimeoutExpired, ValueError) as exc:
+        shutil.rmtree(work_dir, ignore_errors=True)
+        logger.error("[HLS] Transcoding video %s failed: %s", video.pk, exc)
+        _update(video.pk, hls_status='failed', hls_error=str(exc))
+        raise TranscodeError(str(exc)) from exc
+
+    # Swap the new renditions in place of the previous ones
+    shutil.rmtree(destination, ignore_errors=True)
+    work_dir.rename(destination)
+
+    playlist = (destination / MASTER_PLAYLIST).relative_to(settings.MEDIA_ROOT).as_posix()
+    _update(video.pk, hls_status='ready', hls_playlist=playlist, hls_source=source_name, hls_error='')
+    logger.info(
+        "[HLS] Video %s transcoded into %s rendition(s): %s",
+        video.pk, len(renditions), ', '.join(f'{r[0]}p' for r in renditions),
+    )
+    return playlist
+
+
+def remove_renditions(video_id: int) -> None:
+    shutil.rmtree(output_dir(video_id), ignore_errors=True)
+
+
+_queue: "queue.Queue[int]" = queue.Queue()
+_queued = set()
+_worker_lock = threading.Lock()
+_worker: Optional[threading.Thread] = None
+
+
+def _work() -> None:
+    while True:
+        video_id = _queue.get()
+        with _worker_lock:
+            _queued.discard(video_id)
+        try:
+            video = Video.objects.filter(pk=video_id).first()
+            if video is not None and video.video_file:
+                transcode(video)
+        except TranscodeError:
+            pass  # Already logged and recorded on the video
+        except Exception as exc:
+            logger.error("[HLS] Background transcode of video %s failed: %s", video_id, exc, exc_info=True)
+        finally:
+            close_old_connections()
+            _queue.task_done()
+
+
+def schedule_transcode(video_id: int) -> None:
+    """Queue a background transcode; one worker thread processes videos one at a time."""
+    global _worker
+    with _worker_lock:
+        if video_id in _queued:
+            return
+        _queued.add(video_id)
+        if _worker is None or not _worker.is_alive():
+            _worker = threading.Thread(target=_work, name='hls-transcode')
+            _worker.daemon = True
+            _worker.start()
+    Video.objects.filter(pk=video_id).update(hls_status='pending')
+    _queue.put(video_id)
@@ -2,10 +2,12 @@ from rest_framework import viewsets
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny, IsAdminUser
 from rest_framework.response import Response
+from config.conditional import conditional_page, video_updates
 from .models import Video
 from .serializers import VideoSerializer, VideoPublicSerializer
 
 
+@conditional_page(video_updates)
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def get_active_videos(request):
@@ -23,6 +25,7 @@ def get_active_videos(request):
     return Response(serializer.data)
 
 
+@conditional_page(video_updates)
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def get_hero_video(request):